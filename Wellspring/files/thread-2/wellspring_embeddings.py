@@ -15,7 +15,7 @@ import struct
 import hashlib
 import numpy as np
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Mapping
 from dataclasses import dataclass
 
 # Try to load sqlite-vec, fall back to pure Python
@@ -123,7 +123,8 @@ def init_vec_db(db_path: Path = VEC_DB_PATH) -> sqlite3.Connection:
     last_error = None
     for try_path in paths_to_try:
         try:
-            conn = sqlite3.connect(try_path)
+            # Shared across the daemon's gRPC worker threads
+            conn = sqlite3.connect(try_path, check_same_thread=False)
 
             # Store embeddings as BLOBs in regular table
             conn.execute("""
@@ -145,7 +146,16 @@ def init_vec_db(db_path: Path = VEC_DB_PATH) -> sqlite3.Connection:
                     -- Trust weighting fields (Thread 1 handoff)
                     appetite_status TEXT DEFAULT 'welcomed',
                     trust_weight REAL DEFAULT 1.0,
-                    chain_depth INTEGER DEFAULT 0
+                    chain_depth INTEGER DEFAULT 0,
+                    created_by TEXT
+                )
+            """)
+
+            # Trust per creator, joined at query time (Thread 3 attestations)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS creator_trust (
+                    created_by TEXT PRIMARY KEY,
+                    trust REAL NOT NULL
                 )
             """)
 
@@ -162,9 +172,14 @@ def init_vec_db(db_path: Path = VEC_DB_PATH) -> sqlite3.Connection:
                 conn.execute("ALTER TABLE embedding_metadata ADD COLUMN chain_depth INTEGER DEFAULT 0")
             except sqlite3.OperationalError:
                 pass
+            try:
+                conn.execute("ALTER TABLE embedding_metadata ADD COLUMN created_by TEXT")
+            except sqlite3.OperationalError:
+                pass
 
             conn.execute("CREATE INDEX IF NOT EXISTS idx_cid ON embedding_metadata(cid)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_pool ON embedding_metadata(pool_cid)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_emb_created_by ON embedding_metadata(created_by)")
 
             conn.commit()
 
@@ -290,15 +305,16 @@ class EmbeddingPipeline:
 
         # Store metadata
         self.vec_conn.execute("""
-            INSERT INTO embedding_metadata (rowid, cid, pool_cid, text_content, thought_type, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO embedding_metadata (rowid, cid, pool_cid, text_content, thought_type, created_at, created_by)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (
             rowid,
             thought.cid,
             pool_cid,
             text[:500],  # Truncate for storage
             thought.type,
-            thought.created_at
+            thought.created_at,
+            thought.created_by
         ))
 
         try:
@@ -316,9 +332,9 @@ class EmbeddingPipeline:
                 (rowid, serialize_vector(embedding))
             )
             self.vec_conn.execute("""
-                INSERT INTO embedding_metadata (rowid, cid, pool_cid, text_content, thought_type, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (rowid, thought.cid, pool_cid, text[:500], thought.type, thought.created_at))
+                INSERT INTO embedding_metadata (rowid, cid, pool_cid, text_content, thought_type, created_at, created_by)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (rowid, thought.cid, pool_cid, text[:500], thought.type, thought.created_at, thought.created_by))
             self.vec_conn.commit()
 
         return rowid
@@ -366,6 +382,25 @@ class EmbeddingPipeline:
         """, (status, weight, cid))
         self.vec_conn.commit()
 
+    def set_appetites(self, cids: List[str], status: str, trust_weight: Optional[float] = None,
+                      lower_only: bool = False):
+        """
+        set_appetite for many thoughts in one transaction. With lower_only,
+        thoughts already weighted at or below the new weight keep their note.
+        """
+        if status not in self.APPETITE_STATUSES:
+            raise ValueError(f"Invalid appetite status: {status}")
+
+        weight = trust_weight if trust_weight is not None else self.APPETITE_STATUSES[status]
+        condition = " AND (trust_weight IS NULL OR trust_weight > ?)" if lower_only else ""
+        params = [(status, weight, cid) + ((weight,) if lower_only else ()) for cid in cids]
+        self.vec_conn.executemany(f"""
+            UPDATE embedding_metadata
+            SET appetite_status = ?, trust_weight = ?
+            WHERE cid = ?{condition}
+        """, params)
+        self.vec_conn.commit()
+
     def set_trust_weight(self, cid: str, weight: float):
         """Set trust weight for a thought (0.0 to 1.0+)."""
         self.vec_conn.execute("""
@@ -375,6 +410,19 @@ class EmbeddingPipeline:
         """, (weight, cid))
         self.vec_conn.commit()
 
+    def set_creator_trust(self, weights: Mapping[str, float]):
+        """
+        Record trust for each creator, in one transaction.
+
+        query() joins this table, so changing a creator's trust never touches
+        their embedded thoughts. Creators without a row count as 1.0.
+        """
+        self.vec_conn.executemany(
+            "INSERT OR REPLACE INTO creator_trust (created_by, trust) VALUES (?, ?)",
+            list(weights.items())
+        )
+        self.vec_conn.commit()
+
     def set_chain_depth(self, cid: str, depth: int):
         """Set chain depth (hops in because chain from query context)."""
         self.vec_conn.execute("""
@@ -391,7 +439,11 @@ class EmbeddingPipeline:
         pool_cid: Optional[str] = None,
         apply_trust_weighting: bool = True,
         exclude_pending: bool = True,
-        recency_decay: float = 0.0001  # Per-hour decay factor
+        recency_decay: float = 0.0001,  # Per-hour decay factor
+        min_relevance: float = 0.0,
+        after: Optional[Tuple[float, str]] = None,
+        now_ms: Optional[int] = None,
+        creator_trust: Optional[Mapping[str, float]] = None
     ) -> List[Tuple[str, float, str, Dict[str, Any]]]:
         """
         Query for similar thoughts with trust-weighted retrieval.
@@ -403,70 +455,104 @@ class EmbeddingPipeline:
             apply_trust_weighting: Apply trust/appetite weighting
             exclude_pending: Filter out pending_attestation thoughts
             recency_decay: Decay factor for older thoughts (0 = no decay)
+            min_relevance: Drop results below this relevance (pool waterline)
+            after: (relevance, cid) cursor; only return results ranked after it
+            now_ms: Scoring time for recency decay (pin it when paginating)
+            creator_trust: Viewer's trust in each creator, e.g. TrustService.vector(viewer)
+                in the daemon or BatchTrust.vector(viewer).
+                Creators missing from it score 0; rows indexed before created_by
+                was recorded score 1
 
         Returns: [(cid, relevance_score, text_snippet, metadata), ...]
         Higher relevance = more relevant (combines similarity + trust).
+        Ties on relevance are ordered by cid so cursors are stable.
         """
         import time
-        query_embedding = np.array(self.embed_text(query_text))
-        now_ms = int(time.time() * 1000)
+        query_embedding = np.array(self.embed_text(query_text), dtype=np.float32)
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
 
-        # Fetch all embeddings with trust metadata
+        # Fetch all embeddings with trust metadata. Pool scope and pending
+        # exclusion are pushed into SQL so excluded rows are never scored.
         base_query = """
             SELECT m.cid, e.embedding, m.text_content,
-                   m.appetite_status, m.trust_weight, m.chain_depth, m.created_at
+                   m.appetite_status, m.trust_weight, m.chain_depth, m.created_at, m.created_by,
+                   COALESCE(ct.trust, 1.0)
             FROM thought_embeddings e
             JOIN embedding_metadata m ON e.rowid = m.rowid
+            LEFT JOIN creator_trust ct ON ct.created_by = m.created_by
+            WHERE 1=1
         """
-
+        params = []
         if pool_cid:
-            rows = self.vec_conn.execute(base_query + " WHERE m.pool_cid = ?", (pool_cid,)).fetchall()
-        else:
-            rows = self.vec_conn.execute(base_query).fetchall()
+            base_query += " AND m.pool_cid = ?"
+            params.append(pool_cid)
+        if exclude_pending:
+            base_query += " AND m.appetite_status IS NOT 'pending_attestation'"
 
-        results = []
-        for cid, emb_bytes, text, appetite, trust_weight, chain_depth, created_at in rows:
-            # Skip pending attestation if requested
-            if exclude_pending and appetite == 'pending_attestation':
-                continue
+        rows = self.vec_conn.execute(base_query, params).fetchall()
+        if not rows:
+            return []
 
-            # Compute base similarity (convert distance to similarity)
-            emb = np.array(deserialize_vector(emb_bytes))
-            dist = cosine_distance(query_embedding, emb)
-            similarity = 1.0 - dist  # 0-1 range
+        cids, emb_blobs, texts, appetites, trust_weights, chain_depths, created_ats, creators, stored_trust = zip(*rows)
 
-            if apply_trust_weighting:
-                # Trust weight from appetite (0.0 - 1.0+)
-                trust = trust_weight if trust_weight else 1.0
+        # Score every row in one vectorized pass
+        matrix = np.frombuffer(b''.join(emb_blobs), dtype=np.float32).reshape(len(rows), -1)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_embedding)
+        dots = matrix @ query_embedding
+        similarity = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0).astype(np.float64)
 
-                # Chain proximity boost (closer = better)
-                chain_boost = 1.0 / (1.0 + (chain_depth or 0) * 0.1)
+        if apply_trust_weighting:
+            # Trust weight from appetite (0.0 - 1.0+)
+            trust = np.array([t if t else 1.0 for t in trust_weights])
 
-                # Recency decay (hours since creation)
-                if recency_decay > 0 and created_at:
-                    hours_old = (now_ms - created_at) / (1000 * 60 * 60)
-                    recency = max(0.5, 1.0 - recency_decay * hours_old)
-                else:
-                    recency = 1.0
+            # Chain proximity boost (closer = better)
+            chain_boost = 1.0 / (1.0 + np.array([d or 0 for d in chain_depths]) * 0.1)
 
-                # Combined relevance: similarity * trust * chain_boost * recency
-                relevance = similarity * trust * chain_boost * recency
+            # Recency decay (hours since creation)
+            if recency_decay > 0:
+                created = np.array([c or now_ms for c in created_ats], dtype=np.float64)
+                hours_old = (now_ms - created) / (1000 * 60 * 60)
+                recency = np.maximum(0.5, 1.0 - recency_decay * hours_old)
             else:
-                relevance = similarity
+                recency = 1.0
 
+            # Creator trust: stored per creator from attestations, and from the
+            # viewer's web of trust if given (negative trust sinks to 0)
+            creator = np.array(stored_trust, dtype=np.float64)
+            if creator_trust is not None:
+                creator *= np.maximum(0.0, np.array([creator_trust.get(c, 0.0) if c else 1.0 for c in creators]))
+
+            # Combined relevance: similarity * trust * creator * chain_boost * recency
+            relevance = similarity * trust * creator * chain_boost * recency
+        else:
+            relevance = similarity
+
+        # Waterline and cursor filtering happen before ranking
+        keep = relevance >= min_relevance
+        if after is not None:
+            after_relevance, after_cid = after
+            cid_arr = np.array(cids)
+            keep &= (relevance < after_relevance) | ((relevance == after_relevance) & (cid_arr > after_cid))
+
+        candidates = np.nonzero(keep)[0]
+        ranked = np.lexsort((np.array(cids)[candidates], -relevance[candidates]))
+        order = candidates[ranked[:top_k]]
+
+        results = []
+        for i in order:
             metadata = {
-                'appetite': appetite,
-                'trust_weight': trust_weight,
-                'chain_depth': chain_depth,
-                'similarity': round(similarity, 4),
-                'created_at': created_at
+                'appetite': appetites[i],
+                'trust_weight': trust_weights[i],
+                'chain_depth': chain_depths[i],
+                'similarity': round(float(similarity[i]), 4),
+                'created_at': created_ats[i],
+                'created_by': creators[i],
+                'creator_trust': stored_trust[i]
             }
+            results.append((cids[i], float(relevance[i]), texts[i], metadata))
 
-            results.append((cid, relevance, text, metadata))
-
-        # Sort by relevance (higher = better)
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results[:top_k]
+        return results
 
     def find_similar(self, cid: str, top_k: int = 5) -> List[Tuple[str, float]]:
         """Find thoughts similar to a given thought CID."""
@@ -581,7 +667,9 @@ class WellspringRAG:
         pool_cid: Optional[str] = None,
         include_thoughts: bool = True,
         apply_trust_weighting: bool = True,
-        exclude_pending: bool = True
+        exclude_pending: bool = True,
+        min_relevance: float = 0.0,
+        creator_trust: Optional[Mapping[str, float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant thoughts for a query with trust-weighted ranking.
@@ -593,6 +681,8 @@ class WellspringRAG:
             include_thoughts: Include full Thought objects
             apply_trust_weighting: Apply appetite/trust weighting
             exclude_pending: Filter out pending_attestation thoughts
+            min_relevance: Drop results below this relevance (pool waterline)
+            creator_trust: Viewer's trust in each creator (see EmbeddingPipeline.query)
 
         Returns list of:
         {
@@ -608,7 +698,9 @@ class WellspringRAG:
         results = self.pipeline.query(
             query, top_k, pool_cid,
             apply_trust_weighting=apply_trust_weighting,
-            exclude_pending=exclude_pending
+            exclude_pending=exclude_pending,
+            min_relevance=min_relevance,
+            creator_trust=creator_trust
         )
 
         output = []
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark stream compression on a replay of traces.jsonl.
+
+Replays every trace thought in the workspace through thought_to_payload and
+measures wire bytes and CPU (encode + decode) for each codec:
+
+    none       - uncompressed ThoughtPayload frames
+    gzip       - gRPC message compression (gzip, level 6)
+    zstd       - zstd without a dictionary
+    zstd-dict  - zstd with a dictionary trained on the first half of the
+                 replay, measured on the second half
+
+Usage:
+    python bench_compression.py
+"""
+
+import gzip
+import json
+import time
+from pathlib import Path
+
+import core
+import compression
+from peer_service import thought_to_payload
+import wot_peer_pb2 as pb
+
+WORKSPACE = Path(__file__).parent.parent
+
+
+def load_traces() -> list:
+    """Trace thoughts from every traces.jsonl in the workspace."""
+    identity = core.create_identity("bench-compression")
+    thoughts = []
+    for path in sorted(WORKSPACE.glob("**/traces.jsonl")):
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                thoughts.append(core.create_thought(
+                    content=record.get("content"),
+                    thought_type=record.get("type", "trace"),
+                    identity=identity,
+                    because=record.get("because", []),
+                    source=record.get("source")
+                ))
+    return thoughts
+
+
+def measure(name: str, payloads: list, encode, decode) -> dict:
+    """Total wire bytes and CPU seconds for encode + decode of every payload."""
+    raw = sum(p.ByteSize() for p in payloads)
+    start = time.process_time()
+    wire = [encode(p) for p in payloads]
+    encode_s = time.process_time() - start
+    start = time.process_time()
+    for w in wire:
+        decode(w)
+    decode_s = time.process_time() - start
+    total = sum(len(w) for w in wire)
+    return {
+        "codec": name,
+        "raw_bytes": raw,
+        "wire_bytes": total,
+        "ratio": raw / total if total else 0.0,
+        "encode_ms": encode_s * 1000,
+        "decode_ms": decode_s * 1000,
+    }
+
+
+def main():
+    thoughts = load_traces()
+    if len(thoughts) < 20:
+        print(f"Only {len(thoughts)} traces found; need at least 20")
+        return
+
+    payloads = [thought_to_payload(t) for t in thoughts]
+    half = len(payloads) // 2
+    train, test = thoughts[:half], payloads[half:]
+
+    print("=" * 78)
+    print(f"Compression benchmark: {len(thoughts)} traces, measured on {len(test)}")
+    print("=" * 78)
+
+    results = [
+        measure("none", test, lambda p: p.SerializeToString(), pb.ThoughtPayload.FromString),
+        measure(
+            "gzip", test,
+            lambda p: gzip.compress(p.SerializeToString(), compresslevel=6),
+            lambda w: pb.ThoughtPayload.FromString(gzip.decompress(w))
+        ),
+    ]
+
+    if compression.HAVE_ZSTD:
+        zstd = compression.zstandard
+        cctx, dctx = zstd.ZstdCompressor(level=compression.ZSTD_LEVEL), zstd.ZstdDecompressor()
+        results.append(measure(
+            "zstd", test,
+            lambda p: cctx.compress(p.SerializeToString()),
+            lambda w: pb.ThoughtPayload.FromString(dctx.decompress(w))
+        ))
+
+        start = time.process_time()
+        dictionary = compression.CompressionDictionary.train(compression.thought_samples(train))
+        train_ms = (time.process_time() - start) * 1000
+        if dictionary:
+            compression.register_dictionary(dictionary)
+            results.append(measure(
+                "zstd-dict", test,
+                lambda p: compression.encode_payload(p, dictionary).SerializeToString(),
+                lambda w: compression.decode_payload(pb.ThoughtPayload.FromString(w))
+            ))
+            print(f"Dictionary: {len(dictionary.data)} bytes, trained in {train_ms:.1f} ms on {len(train)} thoughts")
+        else:
+            print("Dictionary training failed (too few samples)")
+    else:
+        print("zstandard not installed; skipping zstd codecs")
+
+    print(f"\n{'codec':<10} {'raw':>10} {'wire':>10} {'ratio':>7} {'enc ms':>8} {'dec ms':>8}")
+    for r in results:
+        print(f"{r['codec']:<10} {r['raw_bytes']:>10} {r['wire_bytes']:>10} {r['ratio']:>7.2f} "
+              f"{r['encode_ms']:>8.1f} {r['decode_ms']:>8.1f}")
+
+    # Chunking: frames needed at the default frame limit
+    frames = sum(len(list(compression.split_payload(p))) for p in payloads)
+    largest = max(p.ByteSize() for p in payloads)
+    print(f"\nChunking at {compression.DEFAULT_MAX_FRAME_BYTES} bytes: "
+          f"{len(payloads)} thoughts → {frames} frames (largest payload {largest} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,7 @@ import sys
 import json
 import re
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Callable
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
@@ -219,9 +219,16 @@ def format_thought_context(thought: core.Thought, relevance: float = 0.0) -> str
     return '\n'.join(l for l in lines if l)
 
 
-def get_context(query: str, pool_cid: Optional[str] = None, limit: int = 10) -> Tuple[str, List[str]]:
+def get_context(
+    query: str,
+    pool_cid: Optional[str] = None,
+    limit: int = 10,
+    creator_trust: Optional[Callable[[List[str]], Dict[str, float]]] = None
+) -> Tuple[str, List[str]]:
     """
-    Get relevant context for a query.
+    Get relevant context for a query. creator_trust, given the creators of
+    the candidates, returns the viewer's trust in each; relevance is
+    weighted by it before the waterline.
     Returns: (formatted_context, list_of_cids_used)
     """
     rag = get_rag()
@@ -235,6 +242,15 @@ def get_context(query: str, pool_cid: Optional[str] = None, limit: int = 10) ->
     # Query RAG
     results = rag.retrieve(query, top_k=limit * 2, pool_cid=pool_cid, include_thoughts=True)
 
+    # Trust-weight: one batch lookup for every candidate's creator
+    if creator_trust:
+        creators = sorted({r['thought'].created_by for r in results if r.get('thought')})
+        trust = creator_trust(creators) if creators else {}
+        for r in results:
+            if r.get('thought'):
+                r['relevance'] = r.get('relevance', 0) * max(0.0, trust.get(r['thought'].created_by, 0.0))
+        results.sort(key=lambda r: -r.get('relevance', 0))
+
     # Filter by waterline
     filtered = [r for r in results if r.get('relevance', 0) >= waterline][:limit]
 
@@ -271,6 +287,8 @@ class ChatConfig:
     api_endpoint: Optional[str] = None
     api_key: Optional[str] = None
     deployment_name: Optional[str] = None  # e.g. "gpt-5.2-chat" or "claude-opus-4-5"
+    # Daemon whose trust graph weights context by creator ("host:port")
+    trust_daemon: Optional[str] = None
 
 
 class WoTChat:
@@ -310,6 +328,22 @@ class WoTChat:
         if not self.config.pool_cid:
             self.config.pool_cid = self.pool.cid
 
+        # Trust-weighted context, scored by the daemon's long-lived trust graph
+        self.trust_client = None
+        if self.config.trust_daemon:
+            from peer_service import WotPeerClient
+            client = WotPeerClient(self.config.trust_daemon, identity)
+            if client.connect():
+                self.trust_client = client
+
+    def creator_trust(self, creators: List[str]) -> Dict[str, float]:
+        """This identity's trust in each creator, from the trust daemon."""
+        return dict(zip(creators, self.trust_client.trust(creators, viewer=self.identity.cid)))
+
+    @property
+    def context_trust(self) -> Optional[Callable[[List[str]], Dict[str, float]]]:
+        return self.creator_trust if self.trust_client else None
+
     def store_message(
         self,
         content: str,
@@ -396,7 +430,8 @@ class WoTChat:
         context, context_cids = get_context(
             user_input,
             pool_cid=self.config.pool_cid,
-            limit=self.config.context_limit
+            limit=self.config.context_limit,
+            creator_trust=self.context_trust
         )
 
         # Store user message (because = context + previous in chain)
@@ -565,7 +600,7 @@ def run_chat_repl(identity: core.Identity, config: Optional[ChatConfig] = None):
                 continue
             elif cmd == '/context':
                 query = args or "recent thoughts"
-                ctx, cids = get_context(query, chat.config.pool_cid)
+                ctx, cids = get_context(query, chat.config.pool_cid, creator_trust=chat.context_trust)
                 print(f"\n{C.SYSTEM}Context for '{query}' ({len(cids)} thoughts):{C.RESET}")
                 print(f"{C.DIM}{ctx[:500]}{'...' if len(ctx) > 500 else ''}{C.RESET}")
                 print()
@@ -626,7 +661,8 @@ def run_chat_repl(identity: core.Identity, config: Optional[ChatConfig] = None):
             context, context_cids = get_context(
                 user_input,
                 pool_cid=chat.config.pool_cid,
-                limit=chat.config.context_limit
+                limit=chat.config.context_limit,
+                creator_trust=chat.context_trust
             )
 
             if debug_mode:
@@ -671,6 +707,8 @@ def main():
                         help="API key (or set WOT_API_KEY env var)")
     parser.add_argument('--deployment',
                         help="Deployment/model name for Azure")
+    parser.add_argument('--trust-daemon',
+                        help="Weight context by this daemon's trust graph (host:port)")
 
     args = parser.parse_args()
 
@@ -694,7 +732,8 @@ def main():
         provider=args.provider,
         api_endpoint=api_endpoint,
         api_key=api_key,
-        deployment_name=deployment
+        deployment_name=deployment,
+        trust_daemon=args.trust_daemon
     )
 
     run_chat_repl(identity, config)
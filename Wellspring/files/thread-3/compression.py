@@ -0,0 +1,277 @@
+"""
+Stream Compression for WoT Thread 3
+
+Negotiated compression and chunked transfer for Want/Push streams.
+
+Capabilities (offered in Hello, accepted by intersection):
+    gzip       - gRPC per-call message compression
+    zstd-dict  - zstd with a dictionary trained on the pool's own thoughts
+    chunked    - thoughts larger than max_frame_bytes are split into frames
+
+zstd is optional; without the `zstandard` package only gzip and chunked
+are offered.
+"""
+
+import json
+import threading
+from dataclasses import asdict
+from typing import Optional, List, Dict, Iterator
+
+import blake3
+
+import wot_peer_pb2 as pb
+import core
+
+try:
+    import zstandard
+    HAVE_ZSTD = True
+except ImportError:
+    zstandard = None
+    HAVE_ZSTD = False
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+CAP_GZIP = "gzip"
+CAP_ZSTD_DICT = "zstd-dict"
+CAP_CHUNKED = "chunked"
+
+DEFAULT_MAX_FRAME_BYTES = 16384   # Split thoughts above this into chunks
+DICT_SIZE = 16384                 # Trained dictionary size in bytes
+DICT_TRAIN_LIMIT = 2000           # Thoughts sampled for training
+ZSTD_LEVEL = 3
+DEFAULT_MAX_DECODED_BYTES = 4 * 1024 * 1024   # Decompressed field cap when the caller sets none
+DECODE_READ_BYTES = 65536         # Bounded zstd reads
+SHAREABLE_VISIBILITY = (None, "", "public")   # Thoughts any peer may see
+
+
+def supported_capabilities() -> List[str]:
+    """Compression capabilities this node can offer."""
+    caps = [CAP_GZIP, CAP_CHUNKED]
+    if HAVE_ZSTD:
+        caps.insert(0, CAP_ZSTD_DICT)
+    return caps
+
+
+# ============================================================================
+# ZSTD DICTIONARY
+# ============================================================================
+
+class CompressionDictionary:
+    """A zstd dictionary identified by the blake3 hash of its bytes."""
+
+    def __init__(self, data: bytes, level: int = ZSTD_LEVEL):
+        if not HAVE_ZSTD:
+            raise RuntimeError("zstandard not installed")
+        self.data = data
+        self.dict_id = blake3.blake3(data).digest()[:16]
+        self.level = level
+        self._dict = zstandard.ZstdCompressionDict(data)
+        self._local = threading.local()  # zstd contexts are not thread-safe
+
+    @property
+    def encoding(self) -> str:
+        return f"{CAP_ZSTD_DICT}:{self.dict_id.hex()}"
+
+    def _contexts(self):
+        if not hasattr(self._local, "compressor"):
+            self._local.compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self._dict)
+            self._local.decompressor = zstandard.ZstdDecompressor(dict_data=self._dict)
+        return self._local.compressor, self._local.decompressor
+
+    def compress(self, data: bytes) -> bytes:
+        return self._contexts()[0].compress(data)
+
+    def decompress(self, data: bytes, max_output_size: int = DEFAULT_MAX_DECODED_BYTES) -> bytes:
+        """Decompress at most max_output_size bytes; raises PayloadTooLarge past that.
+
+        Reads in bounded steps: ZstdDecompressor.decompress trusts the
+        frame's declared content size over max_output_size.
+        """
+        reader = self._contexts()[1].stream_reader(data)
+        out = bytearray()
+        while True:
+            block = reader.read(DECODE_READ_BYTES)
+            if not block:
+                return bytes(out)
+            out += block
+            if len(out) > max_output_size:
+                raise PayloadTooLarge(f"Decompresses past {max_output_size} bytes")
+
+    @classmethod
+    def train(cls, samples: List[bytes], size: int = DICT_SIZE) -> Optional['CompressionDictionary']:
+        """Train from samples. Returns None if zstd is missing or samples are too few."""
+        if not HAVE_ZSTD or not samples:
+            return None
+        # zstd wants roughly 10x more sample bytes than dictionary bytes
+        size = min(size, max(1024, sum(len(s) for s in samples) // 10))
+        try:
+            trained = zstandard.train_dictionary(size, samples)
+        except zstandard.ZstdError:
+            return None
+        return cls(trained.as_bytes())
+
+    @classmethod
+    def from_pool(cls, limit: int = DICT_TRAIN_LIMIT) -> Optional['CompressionDictionary']:
+        """Train on the most recent shareable thoughts in the local store.
+
+        Dictionaries keep recognisable pieces of their samples and are
+        served to peers, so private and local-only thoughts are left out.
+        """
+        thoughts = [t for t in core.query_thoughts(limit=limit) if t.visibility in SHAREABLE_VISIBILITY]
+        return cls.train(thought_samples(thoughts))
+
+
+def thought_samples(thoughts: List[core.Thought]) -> List[bytes]:
+    """Training samples shaped like the ThoughtPayload fields we compress."""
+    samples = []
+    for t in thoughts:
+        signable = {
+            "type": t.type,
+            "content": t.content,
+            "created_by": t.created_by,
+            "created_at": t.created_at,
+            "because": t.because,
+        }
+        if t.visibility:
+            signable["visibility"] = t.visibility
+        if t.source:
+            signable["source"] = t.source
+        samples.append(core.canonicalize(signable).encode())  # thought_cbor
+        samples.append(json.dumps(asdict(t)).encode())        # thought_proto
+    return samples
+
+
+# Dictionaries known to this process, by dict_id. The server registers the
+# one it trained; clients register the ones they download from peers.
+_dictionaries: Dict[bytes, CompressionDictionary] = {}
+
+
+def register_dictionary(dictionary: CompressionDictionary):
+    _dictionaries[dictionary.dict_id] = dictionary
+
+
+def get_dictionary(dict_id: bytes) -> Optional[CompressionDictionary]:
+    return _dictionaries.get(dict_id)
+
+
+# ============================================================================
+# PAYLOAD ENCODING
+# ============================================================================
+
+class PayloadTooLarge(ValueError):
+    """A compressed or chunked payload exceeds the receiver's limits."""
+
+
+def encode_payload(payload: pb.ThoughtPayload, dictionary: Optional[CompressionDictionary]) -> pb.ThoughtPayload:
+    """Compress thought_cbor and thought_proto with the dictionary (if any)."""
+    if dictionary is None:
+        return payload
+    encoded = pb.ThoughtPayload()
+    encoded.CopyFrom(payload)
+    encoded.thought_cbor = dictionary.compress(payload.thought_cbor)
+    encoded.thought_proto = dictionary.compress(payload.thought_proto)
+    encoded.encoding = dictionary.encoding
+    return encoded
+
+
+def decode_payload(payload: pb.ThoughtPayload, max_bytes: int = DEFAULT_MAX_DECODED_BYTES) -> pb.ThoughtPayload:
+    """
+    Undo encode_payload. Raises ValueError for an unknown encoding, and
+    PayloadTooLarge if thought_cbor decompresses past max_bytes (thought_proto,
+    which adds the CID, signature and looser separators, past twice that).
+    """
+    if not payload.encoding:
+        return payload
+    name, _, dict_hex = payload.encoding.partition(":")
+    dictionary = get_dictionary(bytes.fromhex(dict_hex)) if name == CAP_ZSTD_DICT else None
+    if dictionary is None:
+        raise ValueError(f"Unknown payload encoding: {payload.encoding}")
+    decoded = pb.ThoughtPayload()
+    decoded.CopyFrom(payload)
+    decoded.thought_cbor = dictionary.decompress(payload.thought_cbor, max_bytes)
+    decoded.thought_proto = dictionary.decompress(payload.thought_proto, 2 * max_bytes)
+    decoded.encoding = ""
+    return decoded
+
+
+# ============================================================================
+# CHUNKED TRANSFER
+# ============================================================================
+
+def split_payload(payload: pb.ThoughtPayload, max_frame_bytes: int = DEFAULT_MAX_FRAME_BYTES) -> Iterator[pb.ThoughtPayload]:
+    """
+    Yield the payload as-is if it fits, else as chunk frames. Each frame
+    carries the CID and a slice of the serialized payload.
+    """
+    data = payload.SerializeToString()
+    if len(data) <= max_frame_bytes:
+        yield payload
+        return
+
+    count = (len(data) + max_frame_bytes - 1) // max_frame_bytes
+    for i in range(count):
+        yield pb.ThoughtPayload(
+            cid=payload.cid,
+            chunk_index=i,
+            chunk_count=count,
+            chunk_data=data[i * max_frame_bytes:(i + 1) * max_frame_bytes]
+        )
+
+
+class ChunkAssembler:
+    """
+    Reassemble chunk frames into payloads. Incomplete thoughts are bounded
+    by max_pending_bytes; the oldest partial thought is dropped past that.
+    A frame's chunk_count comes from the peer, so it is checked against
+    what max_pending_bytes can hold in max_frame_bytes chunks before any
+    slots are allocated.
+    """
+
+    def __init__(self, max_pending_bytes: int = 4 * 1024 * 1024,
+                 max_frame_bytes: int = DEFAULT_MAX_FRAME_BYTES):
+        self.max_pending_bytes = max_pending_bytes
+        self.max_frame_bytes = max_frame_bytes or DEFAULT_MAX_FRAME_BYTES
+        self.max_chunks = max_pending_bytes // self.max_frame_bytes + 1
+        self._parts: Dict[bytes, List[Optional[bytes]]] = {}
+        self._pending_bytes = 0
+
+    def feed(self, frame: pb.ThoughtPayload) -> Optional[pb.ThoughtPayload]:
+        """Returns a complete payload, or None while chunks are outstanding.
+
+        Raises ValueError for a malformed frame and PayloadTooLarge for one
+        whose thought could never fit in max_pending_bytes.
+        """
+        if not frame.chunk_count:
+            if frame.chunk_index or frame.chunk_data:
+                raise ValueError("chunk fields on a frame with chunk_count 0")
+            return frame
+        if frame.chunk_count > self.max_chunks:
+            raise PayloadTooLarge(f"chunk_count {frame.chunk_count} over {self.max_chunks}")
+        if len(frame.chunk_data) > self.max_frame_bytes:
+            raise PayloadTooLarge(f"chunk over {self.max_frame_bytes} bytes")
+        parts = self._parts.get(frame.cid)
+        if parts is not None and len(parts) != frame.chunk_count:
+            raise ValueError(f"chunk_count {frame.chunk_count} differs from {len(parts)} already seen")
+        if frame.chunk_index >= frame.chunk_count:
+            raise ValueError("chunk_index out of range")
+        if parts is None:
+            parts = self._parts[frame.cid] = [None] * frame.chunk_count
+        if parts[frame.chunk_index] is None:
+            parts[frame.chunk_index] = frame.chunk_data
+            self._pending_bytes += len(frame.chunk_data)
+        self._evict()
+
+        if frame.cid not in self._parts or any(p is None for p in parts):
+            return None
+
+        del self._parts[frame.cid]
+        data = b''.join(parts)
+        self._pending_bytes -= len(data)
+        return pb.ThoughtPayload.FromString(data)
+
+    def _evict(self):
+        while self._pending_bytes > self.max_pending_bytes and self._parts:
+            oldest = next(iter(self._parts))
+            self._pending_bytes -= sum(len(p) for p in self._parts.pop(oldest) if p)
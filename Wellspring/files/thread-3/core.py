@@ -9,7 +9,7 @@ import json
 import time
 import sqlite3
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Tuple
 from dataclasses import dataclass, asdict
 from nacl.signing import SigningKey, VerifyKey
 from nacl.encoding import HexEncoder
@@ -220,15 +220,51 @@ def init_db(db_path: Path = DB_PATH):
         )
     """)
     conn.execute("CREATE INDEX IF NOT EXISTS idx_type ON thoughts(type)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_created_by ON thoughts(created_by)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_created_by_at ON thoughts(created_by, created_at)")
+    conn.execute("DROP INDEX IF EXISTS idx_created_by")   # A prefix of idx_created_by_at
     conn.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON thoughts(created_at)")
+
+    # Reverse because index: which thoughts cite `ref`
+    has_refs = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'because_refs'"
+    ).fetchone()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS because_refs (
+            cid TEXT NOT NULL,
+            ref TEXT NOT NULL,
+            PRIMARY KEY (cid, ref)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_because_ref ON because_refs(ref)")
+    if not has_refs:
+        for cid, because in conn.execute("SELECT cid, because FROM thoughts").fetchall():
+            conn.executemany("INSERT OR IGNORE INTO because_refs (cid, ref) VALUES (?, ?)",
+                             [(cid, ref) for ref in cited_cids(json.loads(because))])
+
+    # Thoughts flagged by a compromise window marker; the thoughts stay as signed
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS flags (
+            cid TEXT PRIMARY KEY,
+            marker TEXT NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_flags_marker ON flags(marker)")
     conn.commit()
     conn.close()
 
 
+def cited_cids(because: list) -> List[str]:
+    """CIDs a because list cites (plain CIDs or {"thought_cid": ...} entries)."""
+    refs = (b.get("thought_cid") if isinstance(b, dict) else b for b in because)
+    return [ref for ref in refs if isinstance(ref, str)]
+
+
 def store_thought(thought: Thought, db_path: Path = DB_PATH):
-    """Store thought in SQLite and append to JSONL."""
+    """Store thought in SQLite and append to JSONL. New thoughts are published to store listeners."""
     conn = sqlite3.connect(db_path)
+    is_new = conn.execute(
+        "SELECT 1 FROM thoughts WHERE cid = ?", (thought.cid,)
+    ).fetchone() is None
     conn.execute("""
         INSERT OR REPLACE INTO thoughts
         (cid, type, content, created_by, created_at, because, signature, visibility, source)
@@ -244,6 +280,8 @@ def store_thought(thought: Thought, db_path: Path = DB_PATH):
         thought.visibility,
         thought.source
     ))
+    conn.executemany("INSERT OR IGNORE INTO because_refs (cid, ref) VALUES (?, ?)",
+                     [(thought.cid, ref) for ref in cited_cids(thought.because)])
     conn.commit()
     conn.close()
 
@@ -252,18 +290,11 @@ def store_thought(thought: Thought, db_path: Path = DB_PATH):
     with open(JSONL_PATH, 'a') as f:
         f.write(json.dumps(asdict(thought)) + '\n')
 
+    if is_new:
+        _publish(thought, db_path)
 
-def get_thought(cid: str, db_path: Path = DB_PATH) -> Optional[Thought]:
-    """Retrieve thought by CID."""
-    conn = sqlite3.connect(db_path)
-    row = conn.execute(
-        "SELECT * FROM thoughts WHERE cid = ?", (cid,)
-    ).fetchone()
-    conn.close()
-
-    if not row:
-        return None
 
+def _row_to_thought(row) -> Thought:
     return Thought(
         cid=row[0],
         type=row[1],
@@ -277,6 +308,20 @@ def get_thought(cid: str, db_path: Path = DB_PATH) -> Optional[Thought]:
     )
 
 
+def get_thought(cid: str, db_path: Path = DB_PATH) -> Optional[Thought]:
+    """Retrieve thought by CID."""
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(
+        "SELECT * FROM thoughts WHERE cid = ?", (cid,)
+    ).fetchone()
+    conn.close()
+
+    if not row:
+        return None
+
+    return _row_to_thought(row)
+
+
 def query_thoughts(
     thought_type: Optional[str] = None,
     created_by: Optional[str] = None,
@@ -303,20 +348,142 @@ def query_thoughts(
     rows = conn.execute(query, params).fetchall()
     conn.close()
 
-    return [
-        Thought(
-            cid=row[0],
-            type=row[1],
-            content=json.loads(row[2]),
-            created_by=row[3],
-            created_at=row[4],
-            because=json.loads(row[5]),
-            signature=row[6],
-            visibility=row[7],
-            source=row[8]
+    return [_row_to_thought(row) for row in rows]
+
+
+def query_since(
+    created_at: int,
+    cid: str = "",
+    limit: int = 1000,
+    db_path: Path = DB_PATH
+) -> List[Thought]:
+    """
+    Thoughts strictly after the (created_at, cid) cursor, oldest first.
+    Range scan on idx_created_at; cid breaks ties within a millisecond.
+    """
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT * FROM thoughts
+        WHERE created_at > ? OR (created_at = ? AND cid > ?)
+        ORDER BY created_at ASC, cid ASC
+        LIMIT ?
+    """, (created_at, created_at, cid, limit)).fetchall()
+    conn.close()
+    return [_row_to_thought(row) for row in rows]
+
+
+def count_through(created_at: int, cid: str = "", db_path: Path = DB_PATH) -> int:
+    """Number of thoughts at or before the (created_at, cid) cursor (idx_created_at range)."""
+    conn = sqlite3.connect(db_path)
+    (count,) = conn.execute("""
+        SELECT COUNT(*) FROM thoughts
+        WHERE created_at < ? OR (created_at = ? AND cid <= ?)
+    """, (created_at, created_at, cid)).fetchone()
+    conn.close()
+    return count
+
+
+def store_head(db_path: Path = DB_PATH) -> Tuple[int, str, int]:
+    """(created_at, cid) of the newest thought and the total count. (0, "", 0) if empty."""
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(
+        "SELECT created_at, cid FROM thoughts ORDER BY created_at DESC, cid DESC LIMIT 1"
+    ).fetchone()
+    (count,) = conn.execute("SELECT COUNT(*) FROM thoughts").fetchone()
+    conn.close()
+    if row is None:
+        return 0, "", 0
+    return row[0], row[1], count
+
+
+# ============================================================================
+# COMPROMISE WINDOWS
+# ============================================================================
+#
+# A compromise window flags everything one identity signed between two
+# times. Both lookups are index range scans: idx_created_by_at for the
+# window, idx_because_ref for the thoughts citing flagged ones.
+
+def flag_window(
+    created_by: str,
+    start: int,
+    end: Optional[int],
+    marker: str,
+    db_path: Path = DB_PATH
+) -> List[str]:
+    """Flag created_by's thoughts in [start, end] (end None: open) under marker. Returns the newly flagged CIDs."""
+    conn = sqlite3.connect(db_path)
+    window = "created_by = ? AND created_at >= ?" + (" AND created_at <= ?" if end is not None else "")
+    params = [created_by, start] + ([end] if end is not None else []) + [marker]
+    cids = [row[0] for row in conn.execute(f"""
+        SELECT cid FROM thoughts WHERE {window}
+        AND cid != ? AND cid NOT IN (SELECT cid FROM flags)
+    """, params).fetchall()]
+    conn.executemany("INSERT OR IGNORE INTO flags (cid, marker) VALUES (?, ?)", [(cid, marker) for cid in cids])
+    conn.commit()
+    conn.close()
+    return cids
+
+
+def flag_thoughts(cids: List[str], marker: str, db_path: Path = DB_PATH):
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT OR IGNORE INTO flags (cid, marker) VALUES (?, ?)", [(cid, marker) for cid in cids])
+    conn.commit()
+    conn.close()
+
+
+def flagged(db_path: Path = DB_PATH) -> Dict[str, str]:
+    """Every flagged CID and the marker that flagged it."""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT cid, marker FROM flags").fetchall()
+    conn.close()
+    return dict(rows)
+
+
+def downstream(cids: List[str], db_path: Path = DB_PATH) -> List[str]:
+    """Thoughts whose because chains reach any of cids, excluding cids themselves."""
+    if not cids:
+        return []
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        WITH RECURSIVE down(cid) AS (
+            SELECT value FROM json_each(?)
+            UNION
+            SELECT r.cid FROM because_refs r JOIN down d ON r.ref = d.cid
         )
-        for row in rows
-    ]
+        SELECT cid FROM down
+    """, (json.dumps(cids),)).fetchall()
+    conn.close()
+    seeds = set(cids)
+    return [row[0] for row in rows if row[0] not in seeds]
+
+
+# ============================================================================
+# CHANGE FEED
+# ============================================================================
+#
+# Listeners are called synchronously from store_thought with each newly
+# stored thought. They must not block; see feed.ChangeFeed for fan-out.
+
+_store_listeners: List[tuple] = []  # (listener, db_path)
+
+
+def add_store_listener(listener: Callable[[Thought], None], db_path: Path = DB_PATH):
+    """Call listener(thought) whenever a new thought is stored in db_path."""
+    _store_listeners.append((listener, Path(db_path)))
+
+
+def remove_store_listener(listener: Callable[[Thought], None]):
+    _store_listeners[:] = [(l, p) for l, p in _store_listeners if l is not listener]
+
+
+def _publish(thought: Thought, db_path: Path):
+    for listener, path in list(_store_listeners):
+        if path == Path(db_path):
+            try:
+                listener(thought)
+            except Exception as e:
+                print(f"Store listener failed: {e}")
 
 
 # ============================================================================
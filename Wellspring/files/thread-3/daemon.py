@@ -14,11 +14,17 @@ Usage:
     # Connect to another peer and sync
     python daemon.py --connect localhost:50051
 
+    # Pull what we lack from several peers at once
+    python daemon.py --sync-all localhost:50051 localhost:50052 --concurrency 4
+
     # Push thoughts to peer
     python daemon.py --push localhost:50051
 
     # Query peer's index
     python daemon.py --query localhost:50051 "search terms"
+
+    # Follow a peer's live thought feed and store what arrives
+    python daemon.py --follow localhost:50051
 """
 
 # Suppress tokenizers parallelism warning - must be before any imports
@@ -38,11 +44,20 @@ import grpc
 import core
 import pool as pool_mgmt
 import wot_peer_pb2_grpc as pb_grpc
-from peer_service import WotPeerService, WotPeerClient
+from peer_service import WotPeerService, WotPeerClient, ChannelPool, SERVER_CHANNEL_OPTIONS
+from sync import SyncCoordinator, SyncMarks, DEFAULT_CONCURRENCY
+from trust import TrustService
 
 # Default configuration
 DEFAULT_PORT = 50051
+MAX_WORKERS = 64  # Each Subscribe stream holds a worker for its lifetime
 IDENTITY_PATH = Path(__file__).parent / "daemon-identity.json"
+SESSION_CACHE_PATH = Path(__file__).parent / "peer-sessions.json"
+SYNC_MARKS_PATH = Path(__file__).parent / "peer-sync-marks.json"
+
+# Shared by every client operation so repeated calls to a peer reuse the
+# channel and session instead of re-handshaking.
+channel_pool = ChannelPool(SESSION_CACHE_PATH)
 
 
 def load_or_create_identity() -> core.Identity:
@@ -58,9 +73,14 @@ def load_or_create_identity() -> core.Identity:
 
 def run_server(port: int, identity: core.Identity):
     """Run gRPC server."""
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-
-    service = WotPeerService(identity)
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=MAX_WORKERS),
+        options=SERVER_CHANNEL_OPTIONS
+    )
+
+    # One trust graph for the daemon's lifetime, kept current by the store
+    trust_service = TrustService()
+    service = WotPeerService(identity, trust_service=trust_service)
     pb_grpc.add_WotPeerServicer_to_server(service, server)
 
     address = f"[::]:{port}"
@@ -70,6 +90,7 @@ def run_server(port: int, identity: core.Identity):
     print(f"=" * 60)
     print(f"WoT Daemon started on port {port}")
     print(f"Identity: {identity.cid}")
+    print(f"Trust graph: {trust_service.stats()['edges']} edges")
     print(f"=" * 60)
     print(f"\nTo connect from another instance:")
     print(f"  python daemon.py --connect localhost:{port}")
@@ -91,7 +112,7 @@ def connect_and_sync(address: str, identity: core.Identity):
     """Connect to peer and sync thoughts."""
     print(f"Connecting to {address}...")
 
-    client = WotPeerClient(address, identity)
+    client = WotPeerClient(address, identity, pool=channel_pool)
     if not client.connect():
         return
 
@@ -102,11 +123,33 @@ def connect_and_sync(address: str, identity: core.Identity):
     client.close()
 
 
+def sync_all(addresses: list, identity: core.Identity, concurrency: int = DEFAULT_CONCURRENCY):
+    """Sync with every peer concurrently, fetching each missing thought once."""
+    print(f"Syncing with {len(addresses)} peers (concurrency {concurrency})...")
+
+    coordinator = SyncCoordinator(
+        identity, pool=channel_pool, concurrency=concurrency, marks=SyncMarks(SYNC_MARKS_PATH)
+    )
+    report = coordinator.sync(addresses)
+
+    for address, peer in report["peers"].items():
+        if peer["rtt_ms"] is None:
+            print(f"  {address}: {peer['error']}")
+            continue
+        mode = peer["mode"] + (f" ({peer['fallback']})" if peer["fallback"] else "")
+        print(f"  {address}: {mode} rtt={peer['rtt_ms']}ms missing={peer['missing']} "
+              f"assigned={peer['assigned']} fetched={peer['fetched']}"
+              + (f" error={peer['error']}" if peer["error"] else ""))
+    print(f"Fetched {report['fetched']} of {report['wanted']} wanted thoughts "
+          f"in {report['batches']} batches ({report['duplicates_avoided']} duplicate fetches avoided, "
+          f"{report['failed']} failed)")
+
+
 def push_thoughts(address: str, identity: core.Identity, limit: int = 100):
     """Push local thoughts to peer."""
     print(f"Connecting to {address}...")
 
-    client = WotPeerClient(address, identity)
+    client = WotPeerClient(address, identity, pool=channel_pool)
     if not client.connect():
         return
 
@@ -124,7 +167,7 @@ def query_peer(address: str, identity: core.Identity, query: str, top_k: int = 1
     """Query peer's thought index."""
     print(f"Connecting to {address}...")
 
-    client = WotPeerClient(address, identity)
+    client = WotPeerClient(address, identity, pool=channel_pool)
     if not client.connect():
         return
 
@@ -138,6 +181,29 @@ def query_peer(address: str, identity: core.Identity, query: str, top_k: int = 1
     client.close()
 
 
+def follow_peer(address: str, identity: core.Identity, retry_s: float = 5.0):
+    """Subscribe to a peer's change feed, storing thoughts as they arrive."""
+    cursor = ''
+    while True:
+        print(f"Connecting to {address}...")
+        client = WotPeerClient(address, identity, pool=channel_pool)
+        if client.connect():
+            print(f"Following {address} (cursor: {cursor or 'start'})")
+            try:
+                for thought, cursor in client.subscribe(since_cursor=cursor):
+                    if core.get_thought(thought.cid) is None:
+                        core.store_thought(thought)
+                        print(f"  [{thought.type}] {thought.cid[:40]}...")
+            except grpc.RpcError as e:
+                print(f"Feed interrupted: {e.code().name}")
+            except KeyboardInterrupt:
+                return
+        try:
+            time.sleep(retry_s)
+        except KeyboardInterrupt:
+            return
+
+
 def seed_data(identity: core.Identity):
     """Create default pool and seed test thoughts."""
     print("Seeding test data...")
@@ -319,10 +385,16 @@ def main():
                         help=f"Port to run server (default: {DEFAULT_PORT})")
     parser.add_argument('--connect', '-c', type=str,
                         help="Connect to peer and sync (e.g., localhost:50051)")
+    parser.add_argument('--sync-all', nargs='+', metavar='ADDRESS',
+                        help="Sync with several peers concurrently")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Peers contacted at once by --sync-all (default: {DEFAULT_CONCURRENCY})")
     parser.add_argument('--push', type=str,
                         help="Push thoughts to peer (e.g., localhost:50051)")
     parser.add_argument('--query', '-q', nargs=2, metavar=('ADDRESS', 'QUERY'),
                         help="Query peer's index")
+    parser.add_argument('--follow', type=str,
+                        help="Follow peer's live thought feed (e.g., localhost:50051)")
     parser.add_argument('--limit', '-l', type=int, default=100,
                         help="Limit for push/query operations")
     parser.add_argument('--seed', action='store_true',
@@ -387,14 +459,20 @@ def main():
         set_waterline(pool.cid, args.waterline, identity)
     elif args.connect:
         connect_and_sync(args.connect, identity)
+    elif args.sync_all:
+        sync_all(args.sync_all, identity, args.concurrency)
     elif args.push:
         push_thoughts(args.push, identity, args.limit)
+    elif args.follow:
+        follow_peer(args.follow, identity)
     elif args.query:
         address, query = args.query
         query_peer(address, identity, query, args.limit)
     else:
         run_server(args.port, identity)
 
+    channel_pool.close_all()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,176 @@
+"""
+Change Feed for WoT Thread 3
+
+In-process fan-out of newly stored thoughts to Subscribe streams.
+
+core.store_thought publishes each new thought to the feed, which copies it
+into every matching subscriber's bounded queue without blocking. A
+subscriber that falls behind is marked lagged and its queue is cleared;
+it then catches up from the store with a (created_at, cid) range scan
+instead of holding up the writer or other subscribers.
+"""
+
+import queue
+import threading
+from pathlib import Path
+from typing import Optional, List, Iterator, Tuple
+
+import core
+
+DEFAULT_QUEUE_SIZE = 256
+REPLAY_PAGE = 500
+
+
+# ============================================================================
+# CURSORS
+# ============================================================================
+
+def encode_cursor(created_at: int, cid: str) -> str:
+    """Resume cursor: position just after (created_at, cid)."""
+    return f"{created_at}:{cid}"
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    """Inverse of encode_cursor. Empty cursor means from the beginning."""
+    if not cursor:
+        return 0, ""
+    created_at, cid = cursor.split(":", 1)
+    return int(created_at), cid
+
+
+def thought_cursor(thought: core.Thought) -> Tuple[int, str]:
+    return thought.created_at, thought.cid
+
+
+# ============================================================================
+# SUBSCRIPTIONS
+# ============================================================================
+
+class Subscription:
+    """One subscriber's bounded queue and pool filter."""
+
+    def __init__(self, pool_cid: Optional[str], maxsize: int):
+        self.pool_cid = pool_cid
+        self.queue: "queue.Queue[core.Thought]" = queue.Queue(maxsize=maxsize)
+        self.lagged = False
+        self.delivered = 0
+        self.dropped = 0
+
+    def matches(self, thought: core.Thought) -> bool:
+        return self.pool_cid is None or thought.visibility == f"pool:{self.pool_cid}"
+
+    def offer(self, thought: core.Thought):
+        """Non-blocking enqueue. On overflow, flag lag and clear the queue."""
+        try:
+            self.queue.put_nowait(thought)
+        except queue.Full:
+            self.lagged = True
+            self.dropped += self.queue.qsize() + 1
+            with self.queue.mutex:
+                self.queue.queue.clear()
+
+
+class ChangeFeed:
+    """Fan-out from core.store_thought to live subscriptions."""
+
+    def __init__(self, db_path: Path = core.DB_PATH, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.db_path = db_path
+        self.queue_size = queue_size
+        self._subs: List[Subscription] = []
+        self._lock = threading.Lock()
+        self.published = 0
+        core.add_store_listener(self.publish, db_path)
+
+    def close(self):
+        core.remove_store_listener(self.publish)
+
+    def publish(self, thought: core.Thought):
+        """Called from store_thought. Never blocks on slow subscribers."""
+        with self._lock:
+            subs = list(self._subs)
+            self.published += 1
+        for sub in subs:
+            if sub.matches(thought):
+                sub.offer(thought)
+
+    def subscribe(self, pool_cid: Optional[str] = None) -> Subscription:
+        sub = Subscription(pool_cid, self.queue_size)
+        with self._lock:
+            self._subs.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+
+    def replay(self, pool_cid: Optional[str], since: Tuple[int, str]) -> Iterator[core.Thought]:
+        """Stored thoughts after `since`, oldest first, filtered by pool."""
+        created_at, cid = since
+        while True:
+            page = core.query_since(created_at, cid, limit=REPLAY_PAGE, db_path=self.db_path)
+            for thought in page:
+                if pool_cid is None or thought.visibility == f"pool:{pool_cid}":
+                    yield thought
+            if len(page) < REPLAY_PAGE:
+                return
+            created_at, cid = thought_cursor(page[-1])
+
+    def follow(
+        self,
+        pool_cid: Optional[str] = None,
+        since_cursor: str = "",
+        is_active=lambda: True,
+        poll_s: float = 1.0
+    ) -> Iterator[Tuple[core.Thought, str]]:
+        """
+        Yield (thought, resume_cursor): the backlog after since_cursor, then
+        live thoughts as they are stored.
+
+        The subscription is registered before the backlog is read, so nothing
+        stored in between is missed; anything already replayed is skipped.
+        Thoughts dropped while lagged are recovered by cursor replay, which
+        cannot see late arrivals older than the cursor; periodic Bloom sync
+        covers those.
+        """
+        sub = self.subscribe(pool_cid)
+        position = decode_cursor(since_cursor)
+        replayed = set()  # CIDs from the latest replay, which may also be queued
+        try:
+            for thought in self.replay(pool_cid, position):
+                position = thought_cursor(thought)
+                replayed.add(thought.cid)
+                yield thought, encode_cursor(*position)
+
+            while is_active():
+                if sub.lagged:
+                    sub.lagged = False
+                    replayed = set()
+                    for thought in self.replay(pool_cid, position):
+                        position = thought_cursor(thought)
+                        replayed.add(thought.cid)
+                        yield thought, encode_cursor(*position)
+                    continue
+                try:
+                    thought = sub.queue.get(timeout=poll_s)
+                except queue.Empty:
+                    continue
+                if thought.cid in replayed:
+                    continue
+                # Live order is store order. A thought synced in from another
+                # peer can carry an older created_at; it is still delivered,
+                # but must not move the resume cursor backwards.
+                position = max(position, thought_cursor(thought))
+                sub.delivered += 1
+                yield thought, encode_cursor(*position)
+        finally:
+            self.unsubscribe(sub)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "published": self.published,
+                "subscribers": len(self._subs),
+                "lagged": sum(1 for s in self._subs if s.lagged),
+                "dropped": sum(s.dropped for s in self._subs),
+            }
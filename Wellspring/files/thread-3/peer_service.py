@@ -4,10 +4,14 @@ WotPeer gRPC Service Implementation
 Handles peer-to-peer thought sharing between WoT daemon instances.
 """
 
+import sys
 import time
 import json
 import hashlib
 import struct
+import secrets
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional, List, Iterator
 from dataclasses import asdict
@@ -19,6 +23,11 @@ import wot_peer_pb2 as pb
 import wot_peer_pb2_grpc as pb_grpc
 import core
 import pool as pool_mgmt
+import compression
+from compression import CAP_GZIP, CAP_ZSTD_DICT, CAP_CHUNKED
+from feed import ChangeFeed, encode_cursor, decode_cursor
+from trust import CreatorTrust, TrustService
+from revocation import RevocationProcessor
 
 # Lazy imports for optional dependencies
 _rag = None
@@ -29,7 +38,6 @@ def get_rag():
     global _rag
     if _rag is None:
         try:
-            import sys
             sys.path.insert(0, str(Path(__file__).parent.parent / "thread-2"))
             from wellspring_embeddings import WellspringRAG
             _rag = WellspringRAG(
@@ -45,6 +53,10 @@ def get_rag():
 # BLOOM FILTER
 # ============================================================================
 
+BLOOM_SCAN_LIMIT = 10000   # Thoughts each side puts in its filter
+SINCE_MAX_LIMIT = 10000    # CIDs one Since call may return
+
+
 class BloomFilter:
     """Simple bloom filter for CID set membership."""
 
@@ -84,6 +96,293 @@ class BloomFilter:
         return bf
 
 
+# ============================================================================
+# RATE LIMITING
+# ============================================================================
+#
+# Limits advertised in GetSchemas are enforced here. Each peer gets a token
+# bucket per resource (thoughts, bytes), keyed by both session and identity so
+# a peer cannot reset its budget by re-handshaking.
+
+DEFAULT_THOUGHTS_PER_MINUTE = 100
+DEFAULT_BYTES_PER_MINUTE = 1_000_000
+DEFAULT_MAX_PAYLOAD_BYTES = 65536
+
+SESSION_METADATA_KEY = "wot-session"
+
+
+def peer_host(peer: str) -> str:
+    """gRPC peer address without its ephemeral port: 'ipv4:10.0.0.5:51234' -> 'ipv4:10.0.0.5'."""
+    if peer.startswith(("ipv4:", "ipv6:")):
+        return peer.rsplit(":", 1)[0]
+    return peer
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate_per_minute."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill(time.monotonic())
+        if self.tokens >= amount:
+            return 0.0
+        if self.rate <= 0:
+            return float('inf')
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        """Consume tokens. May drive the bucket negative (overdraft)."""
+        self._refill(time.monotonic())
+        self.tokens -= amount
+
+
+class PeerRateLimiter:
+    """
+    Per-session and per-identity token buckets with inspectable counters.
+
+    admit() returns an AckStatus:
+        ACK_ACCEPTED    - within budget (possibly after backpressure wait)
+        ACK_FLAGGED     - over budget but within overdraft; store and flag
+        ACK_QUARANTINED - over budget beyond overdraft, or oversized; drop
+    """
+
+    def __init__(
+        self,
+        thoughts_per_minute: int = DEFAULT_THOUGHTS_PER_MINUTE,
+        bytes_per_minute: int = DEFAULT_BYTES_PER_MINUTE,
+        max_payload_bytes: int = DEFAULT_MAX_PAYLOAD_BYTES,
+        max_wait_s: float = 2.0,
+        overdraft: float = 0.25
+    ):
+        self.thoughts_per_minute = thoughts_per_minute
+        self.bytes_per_minute = bytes_per_minute
+        self.max_payload_bytes = max_payload_bytes
+        self.max_wait_s = max_wait_s  # Longest backpressure stall per message
+        self.overdraft = overdraft    # Fraction of capacity allowed below zero
+        self._buckets = {}  # key -> (thought_bucket, byte_bucket)
+        self._counters = {}  # key -> counter dict
+        self._lock = threading.Lock()
+
+    def rate_limits(self) -> pb.RateLimits:
+        """Limits as advertised to peers in GetSchemas."""
+        return pb.RateLimits(
+            thoughts_per_minute=self.thoughts_per_minute,
+            bytes_per_minute=self.bytes_per_minute,
+            max_payload_bytes=self.max_payload_bytes
+        )
+
+    def _get(self, key: str):
+        if key not in self._buckets:
+            self._buckets[key] = (
+                TokenBucket(self.thoughts_per_minute),
+                TokenBucket(self.bytes_per_minute)
+            )
+            self._counters[key] = {
+                "accepted": 0,
+                "flagged": 0,
+                "quarantined": 0,
+                "oversized": 0,
+                "bytes_in": 0,
+                "bytes_out": 0,
+                "throttled_s": 0.0,
+            }
+        return self._buckets[key]
+
+    def _wait_for(self, keys: List[str], size: int) -> float:
+        """Longest wait across all keys for one thought of `size` bytes."""
+        wait = 0.0
+        for key in keys:
+            thoughts, nbytes = self._get(key)
+            wait = max(wait, thoughts.wait_time(1), nbytes.wait_time(size))
+        return wait
+
+    def _within_overdraft(self, keys: List[str], size: int) -> bool:
+        for key in keys:
+            thoughts, nbytes = self._buckets[key]
+            if thoughts.tokens - 1 < -thoughts.capacity * self.overdraft:
+                return False
+            if nbytes.tokens - size < -nbytes.capacity * self.overdraft:
+                return False
+        return True
+
+    def admit(self, keys: List[str], size: int, max_payload_bytes: Optional[int] = None) -> int:
+        """
+        Admit one inbound thought of `size` bytes for all `keys`.
+
+        Blocks for up to max_wait_s when the budget is exhausted, which stalls
+        reads from the stream and lets HTTP/2 flow control push back on the peer.
+        """
+        limit = max_payload_bytes or self.max_payload_bytes
+        if size > limit:
+            with self._lock:
+                for key in keys:
+                    self._get(key)
+                    self._counters[key]["oversized"] += 1
+                    self._counters[key]["quarantined"] += 1
+            return pb.ACK_QUARANTINED
+
+        with self._lock:
+            wait = self._wait_for(keys, size)
+        if 0 < wait <= self.max_wait_s:
+            time.sleep(wait)
+        waited = wait if wait <= self.max_wait_s else 0.0
+
+        with self._lock:
+            if wait > self.max_wait_s and not self._within_overdraft(keys, size):
+                status, counter = pb.ACK_QUARANTINED, "quarantined"
+            else:
+                status = pb.ACK_ACCEPTED if wait <= self.max_wait_s else pb.ACK_FLAGGED
+                counter = "accepted" if status == pb.ACK_ACCEPTED else "flagged"
+                for key in keys:
+                    thoughts, nbytes = self._buckets[key]
+                    thoughts.take(1)
+                    nbytes.take(size)
+                    self._counters[key]["bytes_in"] += size
+            for key in keys:
+                self._counters[key][counter] += 1
+                self._counters[key]["throttled_s"] += waited
+        return status
+
+    def throttle_out(self, keys: List[str], size: int):
+        """
+        Pace outbound streams (Want) to the byte budget. Never fails; only
+        sleeps, so a slow consumer simply receives thoughts more slowly.
+        """
+        with self._lock:
+            wait = 0.0
+            for key in keys:
+                wait = max(wait, self._get(key)[1].wait_time(size))
+        if wait > 0:
+            time.sleep(min(wait, self.max_wait_s))
+        with self._lock:
+            for key in keys:
+                self._buckets[key][1].take(size)
+                self._counters[key]["bytes_out"] += size
+                self._counters[key]["throttled_s"] += min(wait, self.max_wait_s)
+
+    def forget(self, key: str):
+        """Drop buckets and counters for a key (e.g. an evicted session)."""
+        with self._lock:
+            self._buckets.pop(key, None)
+            self._counters.pop(key, None)
+
+    def stats(self, key: Optional[str] = None) -> dict:
+        """Counters and remaining budget, for one key or all keys."""
+        with self._lock:
+            keys = [key] if key else list(self._counters)
+            out = {}
+            for k in keys:
+                if k not in self._counters:
+                    continue
+                thoughts, nbytes = self._buckets[k]
+                thoughts._refill(time.monotonic())
+                nbytes._refill(time.monotonic())
+                out[k] = dict(
+                    self._counters[k],
+                    thoughts_available=round(thoughts.tokens, 2),
+                    bytes_available=int(nbytes.tokens)
+                )
+            return out
+
+
+# ============================================================================
+# SESSIONS
+# ============================================================================
+
+DEFAULT_SESSION_TTL_S = 900
+DEFAULT_MAX_SESSIONS = 1024
+
+
+class SessionTable:
+    """
+    Thread-safe session table with idle TTL and LRU eviction.
+
+    Sessions are touched on every RPC that carries the session metadata, so
+    an active peer keeps its session (and its rate limit history) alive.
+    """
+
+    def __init__(self, ttl_s: int = DEFAULT_SESSION_TTL_S, max_sessions: int = DEFAULT_MAX_SESSIONS):
+        self.ttl_s = ttl_s
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # session_id -> info, least recent first
+        self._lock = threading.Lock()
+        self.on_evict = None  # Optional callback(session_id)
+
+    def _expired(self, info: dict, now: float) -> bool:
+        return now - info["last_seen"] > self.ttl_s
+
+    def _drop(self, session_id: str):
+        del self._sessions[session_id]
+        if self.on_evict:
+            self.on_evict(session_id)
+
+    def _evict(self, now: float):
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if self._expired(oldest, now) or len(self._sessions) > self.max_sessions:
+                self._drop(oldest_id)
+            else:
+                break
+
+    def create(self, identity_cid: str, capabilities: List[str]) -> str:
+        """Open a new session and return its ID."""
+        now = time.time()
+        with self._lock:
+            # Unguessable: the ID is both the rate limit key and the resume credential
+            session_id = f"session-{secrets.token_urlsafe(24)}"
+            self._sessions[session_id] = {
+                "identity_cid": identity_cid,
+                "capabilities": capabilities,
+                "connected_at": now,
+                "last_seen": now
+            }
+            self._evict(now)
+        return session_id
+
+    def get(self, session_id: str) -> Optional[dict]:
+        """Look up a live session and mark it as recently used."""
+        now = time.time()
+        with self._lock:
+            info = self._sessions.get(session_id)
+            if info is None:
+                return None
+            if self._expired(info, now):
+                self._drop(session_id)
+                return None
+            info["last_seen"] = now
+            self._sessions.move_to_end(session_id)
+            return info
+
+    def resume(self, session_id: str, identity_cid: str) -> Optional[dict]:
+        """Resume a live session, only for the identity that opened it."""
+        info = self.get(session_id)
+        if info and info["identity_cid"] == identity_cid:
+            return info
+        return None
+
+    def evict_expired(self) -> int:
+        """Drop idle sessions. Returns number evicted."""
+        with self._lock:
+            before = len(self._sessions)
+            self._evict(time.time())
+            return before - len(self._sessions)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
 # ============================================================================
 # SERIALIZATION
 # ============================================================================
@@ -122,6 +421,45 @@ def thought_to_payload(thought: core.Thought) -> pb.ThoughtPayload:
     )
 
 
+def cid_bytes_to_str(cid_bytes: bytes) -> str:
+    """Accept a 36-byte binary CID or a UTF-8 'cid:blake3:...' string."""
+    if len(cid_bytes) == 36 and cid_bytes[:4] == bytes([0x01, 0x71, 0x1e, 0x20]):
+        return f"cid:blake3:{cid_bytes[4:].hex()}"
+    return cid_bytes.decode()
+
+
+def cid_str_to_bytes(cid: str) -> bytes:
+    """Inverse of cid_bytes_to_str for 'cid:blake3:<hex>' CIDs."""
+    if cid.startswith("cid:blake3:"):
+        return bytes([0x01, 0x71, 0x1e, 0x20]) + bytes.fromhex(cid[len("cid:blake3:"):])
+    return cid.encode()
+
+
+def local_bloom(limit: int = BLOOM_SCAN_LIMIT, db_path: Path = core.DB_PATH) -> tuple:
+    """(BloomFilter, cid bytes) over our stored thoughts, keyed by wire CID."""
+    cids = [cid_str_to_bytes(t.cid) for t in core.query_thoughts(limit=limit, db_path=db_path)]
+    bf = BloomFilter()
+    for cid in cids:
+        bf.add(cid)
+    return bf, cids
+
+
+def encode_query_cursor(as_of_ms: int, relevance: float, cid: str) -> str:
+    """
+    Opaque Query cursor: position after (relevance, cid) in ranking order.
+    Carries the scoring time so recency decay ranks every page identically.
+    """
+    return f"{as_of_ms}|{relevance!r}|{cid}"
+
+
+def decode_query_cursor(cursor: str) -> tuple:
+    """Returns (as_of_ms, (relevance, cid)), or (now, None) for no cursor."""
+    if not cursor:
+        return int(time.time() * 1000), None
+    as_of_ms, relevance, cid = cursor.split('|', 2)
+    return int(as_of_ms), (float(relevance), cid)
+
+
 def payload_to_thought(payload: pb.ThoughtPayload) -> Optional[core.Thought]:
     """Convert wire format to Thought."""
     try:
@@ -147,36 +485,135 @@ def payload_to_thought(payload: pb.ThoughtPayload) -> Optional[core.Thought]:
 class WotPeerService(pb_grpc.WotPeerServicer):
     """gRPC service handler for WoT peer protocol."""
 
-    def __init__(self, identity: core.Identity, pool_cid: Optional[str] = None):
+    def __init__(
+        self,
+        identity: core.Identity,
+        pool_cid: Optional[str] = None,
+        limiter: Optional[PeerRateLimiter] = None,
+        sessions: Optional[SessionTable] = None,
+        dictionary: Optional[compression.CompressionDictionary] = None,
+        max_frame_bytes: int = compression.DEFAULT_MAX_FRAME_BYTES,
+        feed: Optional[ChangeFeed] = None,
+        creator_trust: Optional[CreatorTrust] = None,
+        trust_service: Optional[TrustService] = None,
+        revocations: Optional[RevocationProcessor] = None
+    ):
         self.identity = identity
         self.pool_cid = pool_cid
-        self.session_counter = 0
-        self.peers = {}  # session_id -> peer info
+        self.limiter = limiter or PeerRateLimiter()
+        self.sessions = sessions or SessionTable()
+        self.sessions.on_evict = lambda sid: self.limiter.forget(f"session:{sid}")
+
+        # Stream compression: dictionary trained on our own thoughts
+        self.max_frame_bytes = max_frame_bytes
+        self.dictionary = dictionary or compression.CompressionDictionary.from_pool()
+        if self.dictionary:
+            compression.register_dictionary(self.dictionary)
+
+        # Live propagation: store_thought publishes here, Subscribe reads
+        self.feed = feed or ChangeFeed()
+
+        # Web-of-trust graph: the Trust RPC and Query's viewer weighting
+        self.trust_service = trust_service or TrustService()
+
+        # Stored attestations, weighted by our trust in each attester, update
+        # per-creator trust, which Query ranking joins
+        self.creator_trust = creator_trust or CreatorTrust(
+            self._record_creator_trust, trust=self.trust_service, viewer=identity.cid
+        )
 
-    def Hello(self, request: pb.HelloRequest, context) -> pb.HelloResponse:
-        """Handle peer handshake."""
-        self.session_counter += 1
-        session_id = f"session-{self.session_counter}-{int(time.time())}"
+        # Compromise windows flag thoughts, and lower what cites them, in the index
+        self.revocations = revocations or RevocationProcessor(self._record_flags)
+
+    def _record_creator_trust(self, scores):
+        rag = get_rag()
+        if rag:
+            rag.pipeline.set_creator_trust(scores)
 
-        # Accept all capabilities for now
-        accepted = list(request.capabilities) or ["sync", "push", "query"]
+    def _record_flags(self, flagged, downstream):
+        rag = get_rag()
+        if rag:
+            rag.pipeline.set_appetites(flagged, 'flagged')
+            rag.pipeline.set_appetites(downstream, 'low_trust_path', lower_only=True)
+
+    def _peer_session(self, context):
+        """(session_id, info) for the caller, touching the session; info None if unknown."""
+        metadata = dict(context.invocation_metadata() or ())
+        session_id = metadata.get(SESSION_METADATA_KEY)
+        return session_id, (self.sessions.get(session_id) if session_id else None)
+
+    def _session_caps(self, context) -> set:
+        """Capabilities negotiated for the caller's session."""
+        _, peer = self._peer_session(context)
+        return set(peer["capabilities"]) if peer else set()
+
+    def _rate_keys(self, context) -> List[str]:
+        """Rate limit keys for the calling peer: session and identity, else its host."""
+        session_id, peer = self._peer_session(context)
+        if not peer:
+            # Keyed by host, not host:port, so reconnecting keeps the same buckets
+            return [f"host:{peer_host(context.peer())}"]
+        return [f"session:{session_id}", f"identity:{peer['identity_cid']}"]
+
+    def _max_payload_bytes(self) -> int:
+        """Pool's max_payload_bytes if scoped to a pool, else the advertised limit."""
+        pool = pool_mgmt.get_pool(self.pool_cid) if self.pool_cid else None
+        if pool:
+            return min(pool.rules.max_payload_bytes, self.limiter.max_payload_bytes)
+        return self.limiter.max_payload_bytes
+
+    def rate_stats(self) -> dict:
+        """Inspect per-session / per-identity rate limit counters."""
+        return self.limiter.stats()
+
+    def Hello(self, request: pb.HelloRequest, context) -> pb.HelloResponse:
+        """Handle peer handshake, resuming a live session when asked."""
+        peer_cid = request.identity_cid.hex()
+        resumed = False
+
+        session = None
+        if request.resume_session_id:
+            session = self.sessions.resume(request.resume_session_id, peer_cid)
+
+        if session:
+            session_id = request.resume_session_id
+            accepted = session["capabilities"]
+            resumed = True
+        else:
+            # Accept all protocol capabilities; compression only if we support it
+            offered = compression.supported_capabilities() if self.dictionary else \
+                [c for c in compression.supported_capabilities() if c != CAP_ZSTD_DICT]
+            accepted = [
+                c for c in (list(request.capabilities) or ["sync", "push", "query"])
+                if c not in (CAP_GZIP, CAP_ZSTD_DICT, CAP_CHUNKED) or c in offered
+            ]
+            session_id = self.sessions.create(peer_cid, accepted)
 
         # Sign response (simplified - just identity CID)
         sig = core.sign_content(session_id, self.identity)
 
-        self.peers[session_id] = {
-            "identity_cid": request.identity_cid.hex(),
-            "capabilities": accepted,
-            "connected_at": time.time()
-        }
-
-        print(f"[Hello] New peer: {request.identity_cid.hex()[:16]}... → session {session_id}")
+        verb = "Resumed" if resumed else "New peer"
+        print(f"[Hello] {verb}: {peer_cid[:16]}... → session {session_id} ({len(self.sessions)} live)")
 
         return pb.HelloResponse(
             identity_cid=self.identity.cid.encode(),
             accepted_capabilities=accepted,
             session_id=session_id,
-            signature=bytes.fromhex(sig)
+            signature=bytes.fromhex(sig),
+            session_ttl_s=self.sessions.ttl_s,
+            resumed=resumed,
+            zstd_dict_id=self.dictionary.dict_id if CAP_ZSTD_DICT in accepted else b'',
+            max_frame_bytes=self.max_frame_bytes if CAP_CHUNKED in accepted else 0
+        )
+
+    def GetDictionary(self, request: pb.DictionaryRequest, context) -> pb.DictionaryResponse:
+        """Serve our zstd dictionary to peers with a live session, so they can decode zstd-dict streams."""
+        _, peer = self._peer_session(context)
+        if not peer or not self.dictionary or (request.dict_id and request.dict_id != self.dictionary.dict_id):
+            return pb.DictionaryResponse()
+        return pb.DictionaryResponse(
+            dict_id=self.dictionary.dict_id,
+            dictionary=self.dictionary.data
         )
 
     def GetSchemas(self, request: pb.SchemaRequest, context) -> pb.SchemaResponse:
@@ -185,57 +622,121 @@ class WotPeerService(pb_grpc.WotPeerServicer):
         return pb.SchemaResponse(
             pool_rules_cid=b'',
             required=[],
-            rate_limits=pb.RateLimits(
-                thoughts_per_minute=100,
-                bytes_per_minute=1_000_000,
-                max_payload_bytes=65536
-            ),
+            rate_limits=self.limiter.rate_limits(),
             timestamp_unit="ms"
         )
 
     def ExchangeBloom(self, request: pb.BloomRequest, context) -> pb.BloomResponse:
         """Exchange bloom filters for sync."""
+        self._peer_session(context)
         # Build our bloom filter
-        thoughts = core.query_thoughts(limit=10000)
+        thoughts = core.query_thoughts(limit=BLOOM_SCAN_LIMIT)
         bf = BloomFilter(m=request.filter_m or 95851, k=request.filter_k or 7)
-
-        for t in thoughts:
-            cid_bytes = core.compute_cid_bytes({
-                "type": t.type,
-                "content": t.content,
-                "created_by": t.created_by,
-                "created_at": t.created_at,
-                "because": t.because,
-            })
+        cids = [cid_str_to_bytes(t.cid) for t in thoughts]
+        for cid_bytes in cids:
             bf.add(cid_bytes)
 
-        print(f"[Bloom] Exchanged filter: {len(thoughts)} thoughts")
+        # With the caller's filter we can list exactly what it lacks, so it
+        # never has to guess from counts (bloom false positives excepted)
+        missing = []
+        if request.filter_bytes:
+            theirs = BloomFilter.from_bytes(
+                request.filter_bytes, request.filter_m or 95851, request.filter_k or 7
+            )
+            missing = [c for c in cids if not theirs.contains(c)]
+
+        print(f"[Bloom] Exchanged filter: {len(thoughts)} thoughts, {len(missing)} missing at peer")
 
         return pb.BloomResponse(
             filter_bytes=bf.to_bytes(),
             filter_k=bf.k,
             filter_m=bf.m,
-            thought_count=len(thoughts)
+            thought_count=len(thoughts),
+            missing=missing
+        )
+
+    def Since(self, request: pb.SinceRequest, context) -> pb.SinceResponse:
+        """
+        CIDs stored after the caller's high-water mark, by indexed range scan.
+        count_at_cursor lets the caller spot thoughts that arrived late with
+        older timestamps, which a range scan past its mark can never return.
+        """
+        self._peer_session(context)
+        created_at, cid = decode_cursor(request.cursor)
+        count_at_cursor = core.count_through(created_at, cid) if request.cursor else 0
+        head_at, head_cid, head_count = core.store_head()
+
+        limit = min(request.limit, SINCE_MAX_LIMIT)
+        thoughts = core.query_since(created_at, cid, limit=limit + 1) if limit else []
+        more = len(thoughts) > limit
+        thoughts = thoughts[:limit]
+        cursor = encode_cursor(thoughts[-1].created_at, thoughts[-1].cid) if thoughts else request.cursor
+
+        return pb.SinceResponse(
+            cids=[cid_str_to_bytes(t.cid) for t in thoughts],
+            cursor=cursor,
+            count_at_cursor=count_at_cursor,
+            more=more,
+            head=encode_cursor(head_at, head_cid) if head_count else '',
+            head_count=head_count,
+            timestamp=int(time.time() * 1000)
         )
 
     def Want(self, request: pb.WantRequest, context) -> Iterator[pb.ThoughtPayload]:
         """Stream requested thoughts to peer."""
         print(f"[Want] Peer wants {len(request.cids)} thoughts")
+        keys = self._rate_keys(context)
+        caps = self._session_caps(context)
 
-        for cid_bytes in request.cids:
-            # Convert bytes to string CID
-            cid_hex = cid_bytes[4:].hex()  # Strip header
-            cid_str = f"cid:blake3:{cid_hex}"
+        dictionary = self.dictionary if CAP_ZSTD_DICT in caps else None
+        if dictionary is None and CAP_GZIP in caps:
+            context.set_compression(grpc.Compression.Gzip)
 
-            thought = core.get_thought(cid_str)
+        for cid_bytes in request.cids:
+            thought = core.get_thought(cid_bytes_to_str(cid_bytes))
             if thought:
-                yield thought_to_payload(thought)
+                payload = compression.encode_payload(thought_to_payload(thought), dictionary)
+                if CAP_CHUNKED in caps:
+                    frames = compression.split_payload(payload, self.max_frame_bytes)
+                else:
+                    frames = [payload]
+                for frame in frames:
+                    self.limiter.throttle_out(keys, frame.ByteSize())
+                    yield frame
 
     def Push(self, request_iterator, context) -> Iterator[pb.ThoughtAck]:
         """Receive thoughts from peer."""
         rag = get_rag()
+        keys = self._rate_keys(context)
+        max_payload = self._max_payload_bytes()
+        assembler = compression.ChunkAssembler(
+            max_pending_bytes=4 * max_payload, max_frame_bytes=self.max_frame_bytes
+        )
+
+        for frame in request_iterator:
+            try:
+                payload = assembler.feed(frame)
+                if payload is None:
+                    continue  # Waiting for more chunks
+                # Bounded before CBOR: admit() below only sees the decoded size
+                payload = compression.decode_payload(payload, max_payload)
+            except Exception as e:
+                yield pb.ThoughtAck(
+                    cid=frame.cid,
+                    status=pb.ACK_REJECTED,
+                    message=f"Failed to decode: {e}"
+                )
+                continue
+
+            status = self.limiter.admit(keys, len(payload.thought_cbor), max_payload)
+            if status == pb.ACK_QUARANTINED:
+                yield pb.ThoughtAck(
+                    cid=payload.cid,
+                    status=pb.ACK_QUARANTINED,
+                    message="Over rate limit or max_payload_bytes; not stored"
+                )
+                continue
 
-        for payload in request_iterator:
             thought = payload_to_thought(payload)
 
             if thought is None:
@@ -253,13 +754,19 @@ class WotPeerService(pb_grpc.WotPeerServicer):
                 # Index in RAG if available
                 if rag:
                     rag.pipeline.embed_thought(thought, self.pool_cid)
+                    if status == pb.ACK_FLAGGED:
+                        rag.pipeline.set_appetite(thought.cid, 'flagged')
+                    # Flags raised while storing found no index row yet
+                    flagged, downstream = self.revocations.flags_for([thought.cid])
+                    if flagged or downstream:
+                        self._record_flags(flagged, downstream)
 
                 print(f"[Push] Received: {thought.cid[:40]}... [{thought.type}]")
 
                 yield pb.ThoughtAck(
                     cid=payload.cid,
-                    status=pb.ACK_ACCEPTED,
-                    message="Stored"
+                    status=status,
+                    message="Stored" if status == pb.ACK_ACCEPTED else "Stored, flagged: over rate limit"
                 )
             except Exception as e:
                 yield pb.ThoughtAck(
@@ -268,54 +775,141 @@ class WotPeerService(pb_grpc.WotPeerServicer):
                     message=str(e)
                 )
 
+    def _ranked_results(self, rag, request: pb.QueryRequest, limit: int, as_of_ms: int, after) -> List[tuple]:
+        """Pipeline results above the pool waterline, ranked after the cursor."""
+        pool_cid = request.pool_cid.decode() if request.pool_cid else self.pool_cid
+        waterline = pool_mgmt.get_waterline(pool_cid)
+        viewer = cid_bytes_to_str(request.viewer) if request.viewer else None
+
+        # Waterline, pending exclusion and the cursor are applied inside the
+        # scoring pass, so no over-fetch is needed
+        results = rag.pipeline.query(
+            request.query_text,
+            top_k=limit,
+            pool_cid=pool_cid,
+            exclude_pending=not request.include_pending,
+            min_relevance=waterline,
+            after=after,
+            now_ms=as_of_ms,
+            creator_trust=self.trust_service.vector(viewer) if viewer else None
+        )
+        print(f"[Query] '{request.query_text[:30]}...' → {len(results)} above waterline ({waterline})")
+        return results
+
+    def _query_results(self, rag, request: pb.QueryRequest, context, limit: int):
+        """
+        Yield (QueryResult, cursor) pairs: pinned include_cids first (first
+        page only, cursor ''), then ranked results. A ranked result already
+        pinned yields (None, cursor), so it still fills its slot in the page
+        and advances the cursor. Full payloads are paced to the peer's byte
+        budget when include_thoughts is set.
+        """
+        keys = self._rate_keys(context) if request.include_thoughts else None
+        pinned = set()
+
+        def result(cid: str, relevance: float, snippet: str, cursor: str) -> pb.QueryResult:
+            qr = pb.QueryResult(cid=cid.encode(), similarity=relevance, snippet=snippet, cursor=cursor)
+            if request.include_thoughts:
+                thought = core.get_thought(cid)
+                if thought:
+                    qr.thought.CopyFrom(thought_to_payload(thought))
+                    self.limiter.throttle_out(keys, qr.thought.ByteSize())
+            return qr
+
+        if not request.cursor:
+            for cid_bytes in request.include_cids:
+                cid = cid_bytes_to_str(cid_bytes)
+                thought = core.get_thought(cid)
+                if thought and cid not in pinned:
+                    pinned.add(cid)
+                    yield result(cid, 0.0, rag.pipeline.extract_text(thought), ''), ''
+
+        as_of_ms, after = decode_query_cursor(request.cursor)
+        for cid, relevance, snippet, _ in self._ranked_results(rag, request, limit, as_of_ms, after):
+            cursor = encode_query_cursor(as_of_ms, relevance, cid)
+            if cid in pinned:
+                yield None, cursor
+                continue
+            yield result(cid, relevance, snippet or '', cursor), cursor
+
     def Query(self, request: pb.QueryRequest, context) -> pb.QueryResponse:
-        """Semantic search via RAG with pool waterline filtering."""
+        """Semantic search via RAG; one page of top_k results with a next_cursor."""
+        self._peer_session(context)
         rag = get_rag()
 
         if not rag:
             return pb.QueryResponse(results=[])
 
-        pool_cid = request.pool_cid.decode() if request.pool_cid else self.pool_cid
-
+        page_size = request.top_k or 10
         try:
-            # Fetch more than requested to account for waterline filtering
-            results = rag.retrieve(
-                query=request.query_text,
-                top_k=(request.top_k or 10) * 3,
-                pool_cid=pool_cid,
-                include_thoughts=True
-            )
-
-            # Apply pool waterline filtering
-            filtered = pool_mgmt.filter_by_waterline(results, pool_cid)
-
-            # Limit to requested top_k
-            filtered = filtered[:request.top_k or 10]
-
-            pb_results = []
-            for r in filtered:
-                result = pb.QueryResult(
-                    cid=r['cid'].encode() if isinstance(r['cid'], str) else r['cid'],
-                    similarity=r.get('relevance', r.get('similarity', 0.0)),
-                    snippet=r.get('snippet', '')[:200]
-                )
-                pb_results.append(result)
-
-            # Log with waterline info
-            pool = pool_mgmt.get_pool(pool_cid) if pool_cid else None
-            waterline = pool.rules.waterline if pool else 0.3
-            print(f"[Query] '{request.query_text[:30]}...' → {len(results)} raw, {len(filtered)} above waterline ({waterline})")
-
-            return pb.QueryResponse(results=pb_results)
+            results = []
+            ranked = 0
+            next_cursor = ''
+            for qr, cursor in self._query_results(rag, request, context, page_size):
+                if qr is not None:
+                    results.append(qr)
+                if cursor:
+                    ranked += 1
+                    next_cursor = cursor
+
+            # A short page means the ranking is exhausted
+            if ranked < page_size:
+                next_cursor = ''
+
+            return pb.QueryResponse(results=results, next_cursor=next_cursor)
 
         except Exception as e:
             print(f"[Query] Error: {e}")
             return pb.QueryResponse(results=[])
 
+    def QueryStream(self, request: pb.QueryRequest, context) -> Iterator[pb.QueryResult]:
+        """Server-streaming Query. top_k=0 streams everything above the waterline."""
+        self._peer_session(context)
+        rag = get_rag()
+
+        if not rag:
+            return
+
+        limit = request.top_k or sys.maxsize
+        for qr, _ in self._query_results(rag, request, context, limit):
+            if not context.is_active():
+                break
+            if qr is not None:
+                yield qr
+
+    def Subscribe(self, request: pb.SubscribeRequest, context) -> Iterator[pb.ThoughtEvent]:
+        """Stream the backlog after since_cursor, then each new thought as it is stored."""
+        keys = self._rate_keys(context)
+        caps = self._session_caps(context)
+        dictionary = self.dictionary if CAP_ZSTD_DICT in caps else None
+        if dictionary is None and CAP_GZIP in caps:
+            context.set_compression(grpc.Compression.Gzip)
+
+        pool_cid = request.pool_cid.decode() if request.pool_cid else None
+        print(f"[Subscribe] {keys[0]} since '{request.since_cursor[:30]}' ({self.feed.stats()['subscribers'] + 1} subscribers)")
+
+        events = self.feed.follow(pool_cid, request.since_cursor, is_active=context.is_active)
+        for thought, cursor in events:
+            payload = compression.encode_payload(thought_to_payload(thought), dictionary)
+            event = pb.ThoughtEvent(thought=payload, cursor=cursor)
+            self.limiter.throttle_out(keys, event.ByteSize())
+            yield event
+
+    def Trust(self, request: pb.TrustRequest, context) -> pb.TrustResponse:
+        """Viewer's trust in each target, in one lookup of the viewer's cached trust map."""
+        self._peer_session(context)
+        viewer = cid_bytes_to_str(request.viewer) if request.viewer else self.identity.cid
+        targets = [cid_bytes_to_str(t) for t in request.targets]
+        return pb.TrustResponse(
+            trust=self.trust_service.trust(viewer, targets),
+            epoch=self.trust_service.engine.epoch
+        )
+
     def Heartbeat(self, request: pb.HeartbeatRequest, context) -> pb.HeartbeatResponse:
-        """Health check."""
+        """Health check. Also keeps the caller's session alive."""
+        self._peer_session(context)
         thoughts = core.query_thoughts(limit=1)
-        thought_count = len(core.query_thoughts(limit=10000))
+        thought_count = len(core.query_thoughts(limit=BLOOM_SCAN_LIMIT))
 
         return pb.HeartbeatResponse(
             timestamp=int(time.time() * 1000),
@@ -328,101 +922,383 @@ class WotPeerService(pb_grpc.WotPeerServicer):
 # CLIENT
 # ============================================================================
 
+# Keepalive keeps pooled HTTP/2 connections warm between operations.
+CLIENT_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_timeout_ms", 10_000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+# Server side must tolerate the client's keepalive pings.
+SERVER_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.min_recv_ping_interval_without_data_ms", 10_000),
+    # gRPC checks this after undoing per-call gzip, bounding gzip bombs
+    ("grpc.max_receive_message_length", compression.DEFAULT_MAX_DECODED_BYTES),
+]
+
+
+class ChannelPool:
+    """
+    Warm channels and session IDs per peer address.
+
+    Channels are shared by every WotPeerClient for the same address. Session
+    IDs are cached per (address, identity) with the TTL the peer advertised,
+    and optionally persisted to `session_path` so a later CLI invocation can
+    resume instead of opening a fresh session.
+    """
+
+    def __init__(self, session_path: Optional[Path] = None):
+        self.session_path = session_path
+        self._channels = {}  # address -> grpc.Channel
+        self._sessions = {}  # "address|identity_cid" -> {"session_id", "ttl_s", "expires_at"}
+        self._handshaken = set()  # keys handshaken by this process
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if self.session_path and self.session_path.exists():
+            try:
+                with open(self.session_path) as f:
+                    self._sessions = json.load(f)
+            except (OSError, ValueError):
+                self._sessions = {}
+
+    def _save(self):
+        if self.session_path:
+            with open(self.session_path, 'w') as f:
+                json.dump(self._sessions, f, indent=2)
+
+    def channel(self, address: str) -> grpc.Channel:
+        """Get the pooled channel for address, creating it if needed."""
+        with self._lock:
+            if address not in self._channels:
+                self._channels[address] = grpc.insecure_channel(
+                    address, options=CLIENT_CHANNEL_OPTIONS
+                )
+            return self._channels[address]
+
+    def is_warm(self, address: str, identity_cid: str) -> bool:
+        """True if this process already handshook on an open channel to address."""
+        return address in self._channels and f"{address}|{identity_cid}" in self._handshaken
+
+    def session(self, address: str, identity_cid: str) -> Optional[str]:
+        """Cached session ID if it has not passed its advertised TTL."""
+        entry = self._sessions.get(f"{address}|{identity_cid}")
+        if entry and entry["expires_at"] > time.time():
+            return entry["session_id"]
+        return None
+
+    def remember(
+        self,
+        address: str,
+        identity_cid: str,
+        session_id: str,
+        ttl_s: int,
+        negotiated: Optional[dict] = None
+    ):
+        with self._lock:
+            self._sessions[f"{address}|{identity_cid}"] = {
+                "session_id": session_id,
+                "ttl_s": ttl_s,
+                "expires_at": time.time() + ttl_s,
+                "negotiated": negotiated or {}
+            }
+            self._handshaken.add(f"{address}|{identity_cid}")
+            self._save()
+
+    def negotiated(self, address: str, identity_cid: str) -> dict:
+        """Capabilities and stream settings agreed in the cached session's Hello."""
+        entry = self._sessions.get(f"{address}|{identity_cid}")
+        return entry.get("negotiated", {}) if entry else {}
+
+    def touch(self, address: str, identity_cid: str):
+        """Extend a cached session after a successful call (peer touched it too)."""
+        entry = self._sessions.get(f"{address}|{identity_cid}")
+        if entry:
+            entry["expires_at"] = time.time() + entry["ttl_s"]
+
+    def forget(self, address: str, identity_cid: str):
+        with self._lock:
+            self._sessions.pop(f"{address}|{identity_cid}", None)
+            self._handshaken.discard(f"{address}|{identity_cid}")
+            self._save()
+
+    def close_all(self):
+        """Persist sessions and close every pooled channel."""
+        with self._lock:
+            self._save()
+            for channel in self._channels.values():
+                channel.close()
+            self._channels.clear()
+            self._handshaken.clear()
+
+
 class WotPeerClient:
     """Client for connecting to remote WoT peer."""
 
-    def __init__(self, address: str, identity: core.Identity):
+    def __init__(self, address: str, identity: core.Identity, pool: Optional[ChannelPool] = None):
         self.address = address
         self.identity = identity
-        self.channel = grpc.insecure_channel(address)
+        self.pool = pool
+        if pool:
+            self.channel = pool.channel(address)
+        else:
+            self.channel = grpc.insecure_channel(address, options=CLIENT_CHANNEL_OPTIONS)
         self.stub = pb_grpc.WotPeerStub(self.channel)
         self.session_id = None
+        self.resumed = False
+        self.capabilities = set()   # Accepted by peer
+        self.dict_id = b''          # Peer's zstd dictionary, if zstd-dict accepted
+        self.max_frame_bytes = 0    # Peer's chunk threshold, if chunked accepted
+
+    def _apply_negotiated(self, negotiated: dict):
+        self.capabilities = set(negotiated.get("capabilities", []))
+        self.dict_id = bytes.fromhex(negotiated.get("dict_id", ""))
+        self.max_frame_bytes = negotiated.get("max_frame_bytes", 0)
 
     def connect(self) -> bool:
-        """Perform handshake with peer."""
+        """
+        Perform handshake with peer.
+
+        With a pool, a live cached session on an already-warm channel skips
+        the handshake entirely; a cached session from a previous process is
+        offered to the peer for resumption.
+        """
+        cached = self.pool.session(self.address, self.identity.cid) if self.pool else None
+        if cached and self.pool.is_warm(self.address, self.identity.cid):
+            self.session_id = cached
+            self.resumed = True
+            self._apply_negotiated(self.pool.negotiated(self.address, self.identity.cid))
+            return True
+
         try:
             sig = core.sign_content(self.identity.cid, self.identity)
 
             response = self.stub.Hello(pb.HelloRequest(
                 identity_cid=self.identity.cid.encode(),
                 protocol_version=0x0001,
-                capabilities=["sync", "push", "query"],
+                capabilities=["sync", "push", "query"] + compression.supported_capabilities(),
                 timestamp=int(time.time() * 1000),
-                signature=bytes.fromhex(sig)
+                signature=bytes.fromhex(sig),
+                resume_session_id=cached or ''
             ))
 
             self.session_id = response.session_id
-            print(f"Connected to {self.address}: session={self.session_id}")
+            self.resumed = response.resumed
+            negotiated = {
+                "capabilities": list(response.accepted_capabilities),
+                "dict_id": response.zstd_dict_id.hex(),
+                "max_frame_bytes": response.max_frame_bytes
+            }
+            self._apply_negotiated(negotiated)
+            if self.pool:
+                self.pool.remember(
+                    self.address, self.identity.cid, self.session_id,
+                    response.session_ttl_s or DEFAULT_SESSION_TTL_S,
+                    negotiated
+                )
+            verb = "Resumed" if self.resumed else "Connected to"
+            print(f"{verb} {self.address}: session={self.session_id}")
             return True
         except Exception as e:
             print(f"Connection failed: {e}")
+            if self.pool:
+                self.pool.forget(self.address, self.identity.cid)
             return False
 
+    def _metadata(self):
+        """Call metadata identifying our session to the peer."""
+        if not self.session_id:
+            return None
+        if self.pool:
+            self.pool.touch(self.address, self.identity.cid)
+        return ((SESSION_METADATA_KEY, self.session_id),)
+
+    def _dictionary(self) -> Optional[compression.CompressionDictionary]:
+        """Peer's zstd dictionary, downloaded once per process."""
+        if CAP_ZSTD_DICT not in self.capabilities or not self.dict_id:
+            return None
+        dictionary = compression.get_dictionary(self.dict_id)
+        if dictionary is None:
+            response = self.stub.GetDictionary(
+                pb.DictionaryRequest(dict_id=self.dict_id),
+                metadata=self._metadata()
+            )
+            if not response.dictionary:
+                return None
+            dictionary = compression.CompressionDictionary(response.dictionary)
+            compression.register_dictionary(dictionary)
+        return dictionary
+
+    def _call_compression(self, dictionary) -> Optional[grpc.Compression]:
+        """gzip the stream only when zstd-dict is not already compressing it."""
+        if dictionary is None and CAP_GZIP in self.capabilities:
+            return grpc.Compression.Gzip
+        return None
+
     def push_thoughts(self, thoughts: List[core.Thought]) -> List[pb.ThoughtAck]:
-        """Push thoughts to peer."""
+        """Push thoughts to peer using the negotiated compression and chunking."""
+        dictionary = self._dictionary()
+
         def thought_stream():
             for t in thoughts:
-                yield thought_to_payload(t)
-
-        acks = list(self.stub.Push(thought_stream()))
-        return acks
-
-    def query(self, query_text: str, top_k: int = 10) -> List[dict]:
-        """Query peer's thought index."""
-        response = self.stub.Query(pb.QueryRequest(
-            query_text=query_text,
-            top_k=top_k
+                payload = compression.encode_payload(thought_to_payload(t), dictionary)
+                if CAP_CHUNKED in self.capabilities and self.max_frame_bytes:
+                    yield from compression.split_payload(payload, self.max_frame_bytes)
+                else:
+                    yield payload
+
+        acks = list(self.stub.Push(
+            thought_stream(),
+            metadata=self._metadata(),
+            compression=self._call_compression(dictionary)
         ))
+        return acks
 
-        results = []
-        for r in response.results:
-            results.append({
-                'cid': r.cid.decode() if isinstance(r.cid, bytes) else r.cid,
-                'similarity': r.similarity,
-                'snippet': r.snippet
-            })
-        return results
-
-    def sync(self) -> int:
-        """Sync thoughts with peer using bloom filter exchange."""
-        # Build our bloom
-        thoughts = core.query_thoughts(limit=10000)
-        bf = BloomFilter()
-        our_cids = set()
-
-        for t in thoughts:
-            cid_bytes = core.compute_cid_bytes({
-                "type": t.type,
-                "content": t.content,
-                "created_by": t.created_by,
-                "created_at": t.created_at,
-                "because": t.because,
-            })
-            bf.add(cid_bytes)
-            our_cids.add(cid_bytes)
+    def want(self, cids: List[bytes]) -> List[core.Thought]:
+        """Fetch thoughts by 36-byte CID, decoding compressed and chunked frames."""
+        self._dictionary()  # Make sure we can decode zstd-dict frames
+        assembler = compression.ChunkAssembler(max_frame_bytes=self.max_frame_bytes)
+        thoughts = []
+        for frame in self.stub.Want(pb.WantRequest(cids=cids), metadata=self._metadata()):
+            payload = assembler.feed(frame)
+            if payload is None:
+                continue
+            thought = payload_to_thought(compression.decode_payload(payload))
+            if thought:
+                thoughts.append(thought)
+        return thoughts
 
-        # Exchange blooms
-        response = self.stub.ExchangeBloom(pb.BloomRequest(
+    def _exchange_bloom(self, bf: BloomFilter, count: int) -> pb.BloomResponse:
+        return self.stub.ExchangeBloom(pb.BloomRequest(
             filter_bytes=bf.to_bytes(),
             filter_k=bf.k,
             filter_m=bf.m,
-            thought_count=len(thoughts)
-        ))
+            thought_count=count
+        ), metadata=self._metadata())
+
+    def missing(self, bf: BloomFilter, count: int) -> List[bytes]:
+        """CIDs the peer holds that are absent from our filter `bf`."""
+        return list(self._exchange_bloom(bf, count).missing)
+
+    def since(self, cursor: str, limit: int) -> pb.SinceResponse:
+        """CIDs the peer stored after `cursor`, plus its head and clock."""
+        return self.stub.Since(pb.SinceRequest(cursor=cursor, limit=limit), metadata=self._metadata())
+
+    def trust(self, targets: List[str], viewer: str = '') -> List[float]:
+        """Peer's trust graph scores for targets, from viewer (default: the peer itself)."""
+        response = self.stub.Trust(pb.TrustRequest(
+            viewer=viewer.encode(),
+            targets=[t.encode() for t in targets]
+        ), metadata=self._metadata())
+        return list(response.trust)
+
+    def ping(self) -> float:
+        """Round-trip time of a Heartbeat, in seconds."""
+        start = time.monotonic()
+        self.stub.Heartbeat(pb.HeartbeatRequest(
+            timestamp=int(time.time() * 1000)
+        ), metadata=self._metadata())
+        return time.monotonic() - start
+
+    def _query_request(
+        self,
+        query_text: str,
+        top_k: int,
+        cursor: str,
+        include_thoughts: bool,
+        include_cids: Optional[List[str]],
+        viewer: str = ''
+    ) -> pb.QueryRequest:
+        return pb.QueryRequest(
+            query_text=query_text,
+            top_k=top_k,
+            cursor=cursor,
+            include_thoughts=include_thoughts,
+            include_cids=[c.encode() for c in include_cids or []],
+            viewer=viewer.encode()
+        )
 
-        their_bloom = BloomFilter.from_bytes(
-            response.filter_bytes,
-            response.filter_m,
-            response.filter_k
+    @staticmethod
+    def _result_dict(r: pb.QueryResult) -> dict:
+        return {
+            'cid': r.cid.decode() if isinstance(r.cid, bytes) else r.cid,
+            'similarity': r.similarity,
+            'snippet': r.snippet,
+            'cursor': r.cursor,
+            'thought': payload_to_thought(r.thought) if r.HasField('thought') else None
+        }
+
+    def query(
+        self,
+        query_text: str,
+        top_k: int = 10,
+        cursor: str = '',
+        include_thoughts: bool = False,
+        include_cids: Optional[List[str]] = None,
+        viewer: str = ''
+    ) -> List[dict]:
+        """
+        Query peer's thought index. Returns one page; pass the last result's
+        'cursor' back in to fetch the next. With a viewer, each creator's
+        relevance is weighted by the viewer's trust in it.
+        """
+        response = self.stub.Query(
+            self._query_request(query_text, top_k, cursor, include_thoughts, include_cids, viewer),
+            metadata=self._metadata()
+        )
+        return [self._result_dict(r) for r in response.results]
+
+    def query_stream(
+        self,
+        query_text: str,
+        top_k: int = 0,
+        cursor: str = '',
+        include_thoughts: bool = True,
+        include_cids: Optional[List[str]] = None
+    ) -> Iterator[dict]:
+        """Stream query results (top_k=0: everything above the waterline)."""
+        stream = self.stub.QueryStream(
+            self._query_request(query_text, top_k, cursor, include_thoughts, include_cids),
+            metadata=self._metadata()
         )
+        for r in stream:
+            yield self._result_dict(r)
 
-        # Find what they have that we don't
-        # (This is approximate due to bloom filter false positives)
-        # For now, request all if counts differ
-        if response.thought_count > len(thoughts):
-            print(f"Peer has {response.thought_count - len(thoughts)} more thoughts")
+    def sync(self) -> int:
+        """Sync thoughts with peer using bloom filter exchange."""
+        bf, cids = local_bloom()
+        response = self._exchange_bloom(bf, len(cids))
+
+        # The peer lists what it has that misses our filter; fetching it is
+        # sync.SyncCoordinator's job
+        if response.missing:
+            print(f"Peer has {len(response.missing)} thoughts we lack")
 
         return response.thought_count
 
+    def subscribe(self, pool_cid: Optional[str] = None, since_cursor: str = '') -> Iterator[tuple]:
+        """
+        Follow the peer's change feed. Yields (thought, cursor); pass the last
+        cursor back in to resume after a disconnect.
+        """
+        self._dictionary()
+        stream = self.stub.Subscribe(pb.SubscribeRequest(
+            pool_cid=pool_cid.encode() if pool_cid else b'',
+            since_cursor=since_cursor
+        ), metadata=self._metadata())
+        try:
+            for event in stream:
+                thought = payload_to_thought(compression.decode_payload(event.thought))
+                if thought:
+                    yield thought, event.cursor
+        finally:
+            stream.cancel()
+
     def close(self):
-        """Close connection."""
+        """Close connection. Pooled channels stay open for reuse."""
+        if self.pool:
+            return
         self.channel.close()
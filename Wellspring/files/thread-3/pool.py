@@ -219,6 +219,15 @@ def update_waterline(pool_cid: str, waterline: float, identity: core.Identity) -
 # WATERLINE FILTERING
 # ============================================================================
 
+def get_waterline(pool_cid: Optional[str] = None, default_waterline: float = 0.3) -> float:
+    """Pool's waterline threshold, or the default if no pool is found."""
+    if pool_cid:
+        pool = get_pool(pool_cid)
+        if pool:
+            return pool.rules.waterline
+    return default_waterline
+
+
 def filter_by_waterline(
     results: List[Dict[str, Any]],
     pool_cid: Optional[str] = None,
@@ -235,13 +244,7 @@ def filter_by_waterline(
     Returns:
         Filtered results above waterline
     """
-    waterline = default_waterline
-
-    if pool_cid:
-        pool = get_pool(pool_cid)
-        if pool:
-            waterline = pool.rules.waterline
-
+    waterline = get_waterline(pool_cid, default_waterline)
     return [r for r in results if r.get('relevance', 0) >= waterline]
 
 
@@ -0,0 +1,184 @@
+"""
+Compromise Windows for WoT Thread 3
+
+A compromise window marker is an aspect thought, as in
+wellspring_revocation.py:
+
+    {"name": "compromise_window", "applies_to": <identity CID>,
+     "window_start": ..., "window_end": ...}
+
+Everything that identity signed inside the window is suspect. Times are
+ms timestamps or ISO 8601 strings; no window_end leaves the window open.
+Only the identity itself, or the owner of an accepted membership, may mark
+a window. A membership is a member_of connection the owner issued with
+the device as "from". It is accepted once the device and the owner have
+both attested it +1, and stays accepted unless either one's newest
+attestation on it is negative. A revocation issued once the window has
+opened does not count: revoking the device is the usual first step of
+marking it compromised.
+
+RevocationProcessor listens to the store. When a marker arrives it flags
+the window's thoughts in one range scan of idx_created_by_at
+(core.flag_window) and finds every thought whose because chain passes
+through them (core.downstream). Both lists then go to a sink, in one call.
+In the daemon, the sink marks the first 'flagged' in the RAG index and
+lowers the second to 'low_trust_path'. Windows stay open to late arrivals:
+a thought synced in later is flagged if it falls in a window, and counts
+as downstream if it cites a flagged or downstream thought. Store listeners
+run before the daemon embeds a pushed thought, so the daemon re-runs the
+sink with flags_for() once the thought's index row exists.
+"""
+
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import core
+from trust import attestation_subject
+
+WINDOW_MARKER = "compromise_window"
+MEMBERSHIP = "member_of"
+
+Sink = Callable[[List[str], List[str]], None]   # (flagged, downstream)
+Window = Tuple[int, Optional[int], str]          # (start ms, end ms or None, marker CID)
+
+
+def window_time(value: Any) -> Optional[int]:
+    """Milliseconds from a ms timestamp or an ISO 8601 string; None if absent or malformed."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if not isinstance(value, str):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp() * 1000)
+
+
+class RevocationProcessor:
+    """Flags compromise windows and their downstream thoughts as markers arrive."""
+
+    def __init__(self, sink: Sink, db_path: Path = core.DB_PATH):
+        self.sink = sink
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._windows: Dict[str, List[Window]] = {}   # identity -> its compromise windows
+        self._flagged: Set[str] = set()               # In a compromise window
+        self._tainted: Set[str] = set()               # Flagged, or downstream of a flagged thought
+        core.add_store_listener(self.on_store, db_path)
+        self._rebuild()
+
+    def close(self):
+        core.remove_store_listener(self.on_store)
+
+    def windows(self, identity: str) -> List[Window]:
+        return list(self._windows.get(identity, ()))
+
+    def flags_for(self, cids: List[str]) -> Tuple[List[str], List[str]]:
+        """(flagged, downstream) among cids, for re-running the sink on newly indexed thoughts."""
+        with self._lock:
+            flagged = [cid for cid in cids if cid in self._flagged]
+            downstream = [cid for cid in cids if cid in self._tainted and cid not in self._flagged]
+        return flagged, downstream
+
+    def on_store(self, thought: core.Thought):
+        """Store listener: open a window, or check one new thought against the open ones."""
+        with self._lock:
+            flagged, downstream = self._apply(thought)
+        if flagged or downstream:
+            self.sink(flagged, downstream)
+
+    def _rebuild(self):
+        """Reopen every stored window, flag anything stored since, and push all flags at once."""
+        markers = core.query_thoughts(thought_type="aspect", limit=-1, db_path=self.db_path)
+        with self._lock:
+            for marker in reversed(markers):
+                opened = self._open(marker)
+                if opened:
+                    identity, (start, end, cid) = opened
+                    core.flag_window(identity, start, end, cid, self.db_path)
+            flagged = list(core.flagged(self.db_path))
+            downstream = core.downstream(flagged, self.db_path)
+            self._flagged = set(flagged)
+            self._tainted = set(flagged) | set(downstream)
+        if flagged:
+            self.sink(flagged, downstream)
+
+    def _authorized(self, marker: core.Thought, identity: str, start: int) -> bool:
+        """The identity itself, or the owner of an accepted membership with it as device."""
+        if marker.created_by == identity:
+            return True
+        owner = marker.created_by
+        memberships = {
+            c.cid for c in core.query_thoughts(
+                thought_type="connection", created_by=owner, limit=-1, db_path=self.db_path
+            )
+            if isinstance(c.content, dict) and c.content.get("relation") == MEMBERSHIP
+            and c.content.get("from") == identity
+        }
+        if not memberships:
+            return False
+        newest: Dict[Tuple[str, str], Tuple[int, float]] = {}   # (party, membership) -> (created_at, weight)
+        for party in (identity, owner):
+            attestations = core.query_thoughts(
+                thought_type="attestation", created_by=party, limit=-1, db_path=self.db_path
+            )
+            for attestation in attestations:
+                subject, weight = attestation_subject(attestation)
+                if subject not in memberships or (weight < 0 and attestation.created_at >= start):
+                    continue
+                key = (party, subject)
+                if attestation.created_at >= newest.get(key, (attestation.created_at, 0.0))[0]:
+                    newest[key] = (attestation.created_at, weight)
+        return any(
+            newest.get((identity, cid), (0, 0.0))[1] > 0 and newest.get((owner, cid), (0, 0.0))[1] > 0
+            for cid in memberships
+        )
+
+    def _open(self, marker: core.Thought) -> Optional[Tuple[str, Window]]:
+        content = marker.content if isinstance(marker.content, dict) else {}
+        if content.get("name") != WINDOW_MARKER:
+            return None
+        identity = content.get("applies_to")
+        start = window_time(content.get("window_start"))
+        end = window_time(content.get("window_end"))
+        if not isinstance(identity, str) or start is None or not self._authorized(marker, identity, start):
+            return None
+        window = (start, end, marker.cid)
+        windows = self._windows.setdefault(identity, [])
+        if window not in windows:
+            windows.append(window)
+        return identity, window
+
+    def _taint(self, flagged: List[str]) -> Tuple[List[str], List[str]]:
+        self._flagged.update(flagged)
+        self._tainted.update(flagged)
+        downstream = [cid for cid in core.downstream(flagged, self.db_path) if cid not in self._tainted]
+        self._tainted.update(downstream)
+        return flagged, downstream
+
+    def _apply(self, thought: core.Thought) -> Tuple[List[str], List[str]]:
+        if thought.type == "aspect":
+            opened = self._open(thought)
+            if opened:
+                identity, (start, end, marker) = opened
+                return self._taint(core.flag_window(identity, start, end, marker, self.db_path))
+
+        for start, end, marker in self._windows.get(thought.created_by, ()):
+            if start <= thought.created_at and (end is None or thought.created_at <= end) \
+                    and thought.cid != marker:
+                core.flag_thoughts([thought.cid], marker, self.db_path)
+                return self._taint([thought.cid])
+
+        if any(ref in self._tainted for ref in core.cited_cids(thought.because)):
+            self._tainted.add(thought.cid)
+            return [], [thought.cid]
+        return [], []
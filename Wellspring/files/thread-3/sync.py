@@ -0,0 +1,324 @@
+"""
+Concurrent Multi-Peer Sync for WoT Thread 3
+
+SyncCoordinator pulls from several peers at once on a bounded thread pool.
+
+Each peer is surveyed first: handshake, a timed Heartbeat for round-trip
+latency, and a bloom exchange in which the peer lists the CIDs it holds
+that miss our filter. The union of wanted CIDs is cut into sorted ranges of
+WANT_BATCH, and each range goes to the lowest-latency peer holding it,
+weighted by how many ranges that peer already has. Whatever that peer does
+not hold falls to the next best holder.
+
+A WantLedger shared by all fetches records which CIDs are in flight or
+done, so a CID is requested from one peer only. A fetch that fails or comes
+back short releases its claims and retries those CIDs with the next holder.
+
+Peers synced recently skip the bloom exchange. SyncMarks keeps, per peer, a
+high-water mark (created_at, cid) and how many of the peer's thoughts lay
+at or before it. Since returns only the CIDs after the mark. If the peer's
+count at the mark has changed, then thoughts arrived late with older
+timestamps, and the sync falls back to full reconciliation. It also falls
+back when the peer's clock is skewed, when the gap exceeds SINCE_LIMIT, and
+every FULL_SYNC_EVERY deltas, so bloom misses still get a second chance.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import grpc
+
+import core
+from peer_service import WotPeerClient, ChannelPool, local_bloom, cid_str_to_bytes, cid_bytes_to_str
+
+DEFAULT_CONCURRENCY = 8
+WANT_BATCH = 256   # CIDs per Want call
+SINCE_LIMIT = 4096            # Larger gaps use the bloom exchange
+MAX_CLOCK_SKEW_MS = 60_000    # Peer clock drift beyond which marks aren't trusted
+FULL_SYNC_EVERY = 20          # Delta syncs between full reconciliations
+
+
+# ============================================================================
+# WANT LEDGER
+# ============================================================================
+
+class WantLedger:
+    """CIDs in flight or already fetched, shared by every peer's fetches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Set[bytes] = set()
+        self._done: Set[bytes] = set()
+        self.duplicates_avoided = 0
+
+    def claim(self, cids: Iterable[bytes]) -> List[bytes]:
+        """Claim the CIDs nobody else is fetching or has fetched."""
+        claimed = []
+        with self._lock:
+            for cid in cids:
+                if cid in self._inflight or cid in self._done:
+                    self.duplicates_avoided += 1
+                    continue
+                self._inflight.add(cid)
+                claimed.append(cid)
+        return claimed
+
+    def complete(self, cids: Iterable[bytes]):
+        with self._lock:
+            for cid in cids:
+                self._inflight.discard(cid)
+                self._done.add(cid)
+
+    def release(self, cids: Iterable[bytes]):
+        """Give up claims so another peer can fetch these CIDs."""
+        with self._lock:
+            self._inflight.difference_update(cids)
+
+
+# ============================================================================
+# HIGH-WATER MARKS
+# ============================================================================
+
+class SyncMarks:
+    """Per-peer (cursor, count at or before it, deltas since full), saved as JSON."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks: Dict[str, dict] = {}
+        if path and path.exists():
+            try:
+                self._marks = json.loads(path.read_text())
+            except (OSError, ValueError):
+                self._marks = {}
+
+    def get(self, address: str) -> Optional[dict]:
+        with self._lock:
+            mark = self._marks.get(address)
+            return dict(mark) if mark else None
+
+    def set(self, address: str, cursor: str, count: int, deltas: int):
+        with self._lock:
+            self._marks[address] = {"cursor": cursor, "count": count, "deltas": deltas}
+            self._save()
+
+    def forget(self, address: str):
+        with self._lock:
+            if self._marks.pop(address, None):
+                self._save()
+
+    def _save(self):
+        if self.path:
+            self.path.write_text(json.dumps(self._marks, indent=2))
+
+
+def fallback_reason(mark: Optional[dict], response, now_ms: int) -> Optional[str]:
+    """Why a Since response can't stand in for full reconciliation, or None."""
+    if mark is None:
+        return "no mark"
+    if abs(response.timestamp - now_ms) > MAX_CLOCK_SKEW_MS:
+        return "clock skew"
+    if response.count_at_cursor != mark["count"]:
+        return "late arrivals"
+    if response.more:
+        return "gap too large"
+    if mark["deltas"] >= FULL_SYNC_EVERY:
+        return "periodic"
+    return None
+
+
+# ============================================================================
+# COORDINATOR
+# ============================================================================
+
+@dataclass
+class PeerInventory:
+    """What one peer offers us, and how it went."""
+    address: str
+    client: Optional[WotPeerClient] = None
+    rtt_s: float = float("inf")
+    missing: List[bytes] = field(default_factory=list)
+    mode: Optional[str] = None       # "delta" or "full"
+    fallback: Optional[str] = None   # Why a full reconciliation was needed
+    mark: Optional[dict] = None      # Recorded once everything offered is held
+    assigned: int = 0      # CIDs planned from this peer
+    fetched: int = 0       # Thoughts it delivered that we stored
+    error: Optional[str] = None
+
+    def report(self) -> dict:
+        return {
+            "rtt_ms": round(self.rtt_s * 1000, 1) if self.client else None,
+            "mode": self.mode,
+            "fallback": self.fallback,
+            "missing": len(self.missing),
+            "assigned": self.assigned,
+            "fetched": self.fetched,
+            "error": self.error,
+        }
+
+
+class SyncCoordinator:
+    """Sync with many peers concurrently, fetching each missing CID once."""
+
+    def __init__(
+        self,
+        identity: core.Identity,
+        pool: Optional[ChannelPool] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        db_path: Path = core.DB_PATH,
+        marks: Optional[SyncMarks] = None
+    ):
+        self.identity = identity
+        self.pool = pool
+        self.concurrency = max(1, concurrency)
+        self.db_path = db_path
+        self.marks = marks if marks is not None else SyncMarks()
+        self.ledger = WantLedger()
+        self._store_lock = threading.Lock()   # sqlite connections are per call
+
+    def _survey(self, address: str, bloom, count: int) -> PeerInventory:
+        inventory = PeerInventory(address)
+        client = WotPeerClient(address, self.identity, pool=self.pool)
+        if not client.connect():
+            inventory.error = "connect failed"
+            return inventory
+        try:
+            inventory.rtt_s = client.ping()
+            mark = self.marks.get(address)
+            response = client.since(mark["cursor"] if mark else '', SINCE_LIMIT if mark else 0)
+            inventory.fallback = fallback_reason(mark, response, int(time.time() * 1000))
+            if inventory.fallback is None:
+                inventory.mode = "delta"
+                inventory.missing = [
+                    cid for cid in response.cids
+                    if core.get_thought(cid_bytes_to_str(cid), self.db_path) is None
+                ]
+                inventory.mark = {
+                    "cursor": response.cursor,
+                    "count": response.count_at_cursor + len(response.cids),
+                    "deltas": mark["deltas"] + 1,
+                }
+            else:
+                # The head is read before the bloom exchange, so anything the
+                # peer stores in between is listed again by the next delta
+                inventory.mode = "full"
+                inventory.missing = client.missing(bloom, count)
+                inventory.mark = {"cursor": response.head, "count": response.head_count, "deltas": 0}
+            inventory.client = client
+        except grpc.RpcError as e:
+            inventory.error = e.code().name
+            client.close()
+        return inventory
+
+    def plan(self, inventories: Dict[str, PeerInventory]) -> Tuple[List[Tuple[str, List[bytes]]], Dict[bytes, List[str]]]:
+        """
+        Assign WANT_BATCH ranges of the wanted CIDs to peers. Returns the
+        (address, cids) batches and each CID's holders, fastest first.
+        """
+        holders: Dict[bytes, List[str]] = {}
+        for inventory in inventories.values():
+            for cid in inventory.missing:
+                holders.setdefault(cid, []).append(inventory.address)
+        for addresses in holders.values():
+            addresses.sort(key=lambda a: (inventories[a].rtt_s, a))
+
+        wanted = sorted(holders)
+        load = {address: 0 for address in inventories}
+        batches = []
+        for start in range(0, len(wanted), WANT_BATCH):
+            remaining = wanted[start:start + WANT_BATCH]
+            while remaining:
+                candidates = {a for cid in remaining for a in holders[cid]}
+                best = min(candidates, key=lambda a: (inventories[a].rtt_s * (1 + load[a]), a))
+                mine = [cid for cid in remaining if best in holders[cid]]
+                remaining = [cid for cid in remaining if best not in holders[cid]]
+                load[best] += 1
+                inventories[best].assigned += len(mine)
+                batches.append((best, mine))
+        return batches, holders
+
+    def _fetch_from(self, inventory: PeerInventory, cids: List[bytes]) -> List[bytes]:
+        """Fetch claimed CIDs from one peer and store them. Returns those not delivered."""
+        try:
+            thoughts = inventory.client.want(cids)
+        except grpc.RpcError as e:
+            inventory.error = e.code().name
+            thoughts = []
+
+        requested = set(cids)
+        delivered = set()
+        for thought in thoughts:
+            cid = cid_str_to_bytes(thought.cid)
+            if cid not in requested or cid in delivered:
+                continue
+            delivered.add(cid)
+            with self._store_lock:
+                if core.get_thought(thought.cid, self.db_path) is None:
+                    core.store_thought(thought, self.db_path)
+                    inventory.fetched += 1
+
+        self.ledger.complete(delivered)
+        lost = [cid for cid in cids if cid not in delivered]
+        self.ledger.release(lost)
+        return lost
+
+    def _fetch(self, inventories: Dict[str, PeerInventory], address: str,
+               cids: List[bytes], holders: Dict[bytes, List[str]]) -> List[bytes]:
+        """Fetch one batch, moving undelivered CIDs to their next holder. Returns failures."""
+        tried: Set[str] = set()
+        pending = {address: cids}
+        failed = []
+        while pending:
+            address, cids = pending.popitem()
+            tried.add(address)
+            claimed = self.ledger.claim(cids)
+            if not claimed:
+                continue
+            for cid in self._fetch_from(inventories[address], claimed):
+                fallback = [a for a in holders[cid] if a not in tried]
+                if fallback:
+                    pending.setdefault(fallback[0], []).append(cid)
+                else:
+                    failed.append(cid)
+        return failed
+
+    def sync(self, addresses: List[str]) -> dict:
+        """Survey, plan and fetch from every peer in `addresses`."""
+        addresses = list(dict.fromkeys(addresses))
+        bloom, ours = local_bloom(db_path=self.db_path)
+        skipped = self.ledger.duplicates_avoided
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            surveyed = executor.map(lambda a: self._survey(a, bloom, len(ours)), addresses)
+            inventories = {inventory.address: inventory for inventory in surveyed}
+            reachable = {a: inv for a, inv in inventories.items() if inv.client}
+
+            batches, holders = self.plan(reachable)
+            results = executor.map(
+                lambda batch: self._fetch(reachable, batch[0], batch[1], holders), batches
+            )
+            failed = [cid for result in results for cid in result]
+
+        # A mark is only safe once nothing the peer offered is still missing
+        unfetched = set(failed)
+        for inventory in reachable.values():
+            if not unfetched.intersection(inventory.missing):
+                self.marks.set(inventory.address, **inventory.mark)
+            inventory.client.close()
+
+        offered = sum(len(inv.missing) for inv in reachable.values())
+        return {
+            "peers": {a: inv.report() for a, inv in inventories.items()},
+            "wanted": len(holders),
+            "offered": offered,
+            "duplicates_avoided": offered - len(holders) + self.ledger.duplicates_avoided - skipped,
+            "batches": len(batches),
+            "delta_peers": sum(1 for inv in reachable.values() if inv.mode == "delta"),
+            "fetched": sum(inv.fetched for inv in reachable.values()),
+            "failed": len(failed),
+        }
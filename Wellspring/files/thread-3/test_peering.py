@@ -8,19 +8,31 @@ This script:
 3. Pushes thoughts from client to server
 4. Queries the server's index
 5. Verifies the thoughts were received
+6. Checks per-peer rate limit enforcement
+7. Checks pooled channels skip or resume the handshake
+8. Round-trips a large thought through compressed, chunked streams
+9. Syncs from two peers concurrently, fetching each thought once
+10. Takes the delta-since-mark fast path, falling back on late arrivals
+11. Scores vouch chains through the Trust RPC as vouches are stored and revoked,
+    holding attestations on identities until they author a thought
+12. Accepts compromise windows only from the device's accepted owner, and
+    flags late-pushed thoughts in the index
 """
 
 import time
+import tempfile
 import threading
 from concurrent import futures
 from pathlib import Path
 
 import grpc
 
+import compression
 import core
 import wot_peer_pb2 as pb
 import wot_peer_pb2_grpc as pb_grpc
-from peer_service import WotPeerService, WotPeerClient
+from peer_service import WotPeerService, WotPeerClient, PeerRateLimiter, ChannelPool, thought_to_payload, get_rag
+from sync import SyncCoordinator
 
 
 def run_test():
@@ -41,6 +53,7 @@ def run_test():
     service = WotPeerService(server_identity)
     pb_grpc.add_WotPeerServicer_to_server(service, server)
     server.add_insecure_port("[::]:50098")
+    server.add_insecure_port("[::]:50099")   # Second "peer" for concurrent sync
     server.start()
     print("    Server started")
 
@@ -90,19 +103,275 @@ def run_test():
         for r in results:
             print(f"      - (sim={r['similarity']:.3f}) {r['snippet'][:50]}...")
 
+        if len(results) == 5:
+            next_page = client.query("quick brown fox", top_k=5, cursor=results[-1]['cursor'])
+            overlap = {r['cid'] for r in results} & {r['cid'] for r in next_page}
+            print(f"    Next page returned {len(next_page)} results")
+            assert not overlap, "pages must not overlap"
+
+            # Pinning a ranked result must not end pagination after page 1
+            if next_page:
+                pinned_page = client.stub.Query(
+                    client._query_request("quick brown fox", 5, '', False, [results[0]['cid']], ''),
+                    metadata=client._metadata()
+                )
+                assert len(pinned_page.results) == 5, "pinned duplicate must not repeat"
+                assert pinned_page.next_cursor, "pinned page must keep the cursor"
+
+        streamed = list(client.query_stream("quick brown fox", top_k=3, include_cids=[thoughts[0].cid]))
+        print(f"    Stream returned {len(streamed)} results with full thoughts")
+        assert streamed and streamed[0]['cid'] == thoughts[0].cid
+        assert all(r['thought'] is not None for r in streamed)
+
         # Bloom exchange
         print("\n[8] Testing bloom filter exchange...")
         count = client.sync()
         print(f"    Sync complete: peer has {count} thoughts")
 
+        # Rate limits
+        print("\n[9] Checking rate limits...")
+        stats = service.rate_stats()
+        session_stats = stats[f"session:{client.session_id}"]
+        print(f"    Session counters: {session_stats}")
+        assert session_stats["accepted"] == len(thoughts)
+
+        limiter = PeerRateLimiter(thoughts_per_minute=4, max_wait_s=0, overdraft=0.25)
+        statuses = [limiter.admit(["noisy"], 100) for _ in range(6)]
+        statuses.append(limiter.admit(["noisy"], 70000))
+        print(f"    Noisy peer: {[pb.AckStatus.Name(s) for s in statuses]}")
+        assert statuses[:4] == [pb.ACK_ACCEPTED] * 4
+        assert statuses[4] == pb.ACK_FLAGGED
+        assert statuses[5] == pb.ACK_QUARANTINED
+        assert statuses[6] == pb.ACK_QUARANTINED  # oversized
+        assert limiter.stats("noisy")["noisy"]["oversized"] == 1
+
+        # Session reuse
+        print("\n[10] Checking pooled sessions...")
+        session_path = Path(tempfile.mkdtemp()) / "peer-sessions.json"
+        channel_pool = ChannelPool(session_path)
+        first = WotPeerClient("localhost:50098", client_identity, pool=channel_pool)
+        assert first.connect()
+        live = len(service.sessions)
+        second = WotPeerClient("localhost:50098", client_identity, pool=channel_pool)
+        assert second.connect() and second.resumed
+        assert second.session_id == first.session_id
+        assert len(service.sessions) == live, "warm channel should not re-handshake"
+        channel_pool.close_all()
+
+        restarted = ChannelPool(session_path)
+        third = WotPeerClient("localhost:50098", client_identity, pool=restarted)
+        assert third.connect() and third.resumed
+        assert third.session_id == first.session_id
+        restarted.close_all()
+        print(f"    Reused session {first.session_id} ({len(service.sessions)} live)")
+
+        # Compression + chunking
+        print("\n[11] Checking compressed, chunked transfer...")
+        print(f"    Negotiated: {sorted(client.capabilities)}")
+        assert "chunked" in client.capabilities and client.max_frame_bytes
+        big = core.create_thought(
+            content={"title": "Large trace", "body": "repetitive trace body " * 2000},
+            thought_type="trace",
+            identity=client_identity,
+            source="test/peering"
+        )
+        acks = client.push_thoughts([big])
+        assert len(acks) == 1 and acks[0].status == pb.ACK_ACCEPTED, acks
+        fetched = client.want([thought_to_payload(big).cid])
+        assert len(fetched) == 1 and fetched[0].content == big.content
+        print(f"    Round-tripped {len(big.content['body'])} byte body")
+
+        # Peer-set sizes are checked before anything is allocated or decompressed
+        assembler = compression.ChunkAssembler(max_pending_bytes=65536, max_frame_bytes=16384)
+        for bad in (pb.ThoughtPayload(cid=b'x', chunk_index=0, chunk_count=2**32 - 1, chunk_data=b'a'),
+                    pb.ThoughtPayload(cid=b'x', chunk_index=3, chunk_data=b'a')):
+            try:
+                assembler.feed(bad)
+                raise AssertionError("malformed chunk frame accepted")
+            except ValueError:
+                pass
+        assembler.feed(pb.ThoughtPayload(cid=b'y', chunk_index=0, chunk_count=2, chunk_data=b'a'))
+        try:
+            assembler.feed(pb.ThoughtPayload(cid=b'y', chunk_index=1, chunk_count=3, chunk_data=b'b'))
+            raise AssertionError("changed chunk_count accepted")
+        except ValueError:
+            pass
+        if service.dictionary:
+            bomb = pb.ThoughtPayload(
+                cid=thought_to_payload(big).cid,
+                thought_cbor=service.dictionary.compress(b'{' * (64 * 1024 * 1024)),
+                encoding=service.dictionary.encoding
+            )
+            acks = list(client.stub.Push(iter([bomb]), metadata=client._metadata()))
+            assert [a.status for a in acks] == [pb.ACK_REJECTED], acks
+            anonymous = pb_grpc.WotPeerStub(client.channel).GetDictionary(pb.DictionaryRequest())
+            assert not anonymous.dictionary, "dictionary served without a session"
+            print(f"    Rejected a {len(bomb.thought_cbor)} byte zstd bomb")
+
+        # Change feed
+        print("\n[12] Checking Subscribe change feed...")
+        latest = core.query_thoughts(limit=1)[0]
+        events = []
+        arrived = threading.Event()
+
+        def follow():
+            since = f"{latest.created_at}:{latest.cid}"
+            for thought, cursor in client.subscribe(since_cursor=since):
+                events.append((thought, cursor, time.time()))
+                arrived.set()
+                return
+
+        follower = threading.Thread(target=follow, daemon=True)
+        follower.start()
+        time.sleep(0.3)
+        fresh = core.create_thought(
+            content="Live thought for subscribers",
+            thought_type="basic",
+            identity=server_identity
+        )
+        stored_at = time.time()
+        core.store_thought(fresh)
+        assert arrived.wait(5.0), "subscriber never saw the new thought"
+        thought, cursor, seen_at = events[0]
+        assert thought.cid == fresh.cid
+        assert cursor == f"{fresh.created_at}:{fresh.cid}"
+        print(f"    Delivered in {(seen_at - stored_at) * 1000:.1f} ms, cursor {cursor[:30]}...")
+        client.close()
+
+        # Concurrent multi-peer sync into an empty store
+        print("\n[13] Checking concurrent multi-peer sync...")
+        with tempfile.TemporaryDirectory() as tmp:
+            local_db = Path(tmp) / "local.db"
+            core.init_db(local_db)
+            coordinator = SyncCoordinator(client_identity, concurrency=4, db_path=local_db)
+            report = coordinator.sync(["localhost:50098", "localhost:50099"])
+            served = len(core.query_thoughts(limit=10000))
+            assert report["wanted"] == served, report
+            assert report["fetched"] == served and report["failed"] == 0, report
+            assert report["duplicates_avoided"] == served, report   # Both peers offered everything
+            assert sum(p["assigned"] for p in report["peers"].values()) == served
+            assert len(core.query_thoughts(limit=10000, db_path=local_db)) == served
+            again = coordinator.sync(["localhost:50098", "localhost:50099"])
+            assert again["wanted"] == 0 and again["fetched"] == 0, again
+            print(f"    Fetched {report['fetched']} thoughts in {report['batches']} batches, "
+                  f"{report['duplicates_avoided']} duplicate fetches avoided")
+
+            # Second sync rode the marks; now one new and one late, old thought
+            assert again["delta_peers"] == 2, again
+            core.store_thought(core.create_thought(
+                content="Thought after the mark", thought_type="basic", identity=server_identity
+            ))
+            delta = coordinator.sync(["localhost:50098", "localhost:50099"])
+            assert delta["delta_peers"] == 2 and delta["fetched"] == 1, delta
+
+            signable = {"type": "basic", "content": f"Late arrival from a slow clock ({time.time()})",
+                        "created_by": server_identity.cid, "created_at": 1000, "because": []}
+            late_cid = core.compute_cid(signable)
+            core.store_thought(core.Thought(
+                cid=late_cid, type="basic", content=signable["content"],
+                created_by=server_identity.cid, created_at=1000, because=[],
+                signature=core.sign_content(late_cid, server_identity)
+            ))
+            late = coordinator.sync(["localhost:50098", "localhost:50099"])
+            assert late["delta_peers"] == 0 and late["fetched"] == 1, late
+            assert {p["fallback"] for p in late["peers"].values()} == {"late arrivals"}
+            assert core.get_thought(late_cid, local_db) is not None
+            print("    Delta path fetched 1 new thought; late arrival forced full reconciliation")
+
+        # Trust graph follows the store: vouch, attest, revoke
+        print("\n[14] Checking the Trust RPC...")
+        alice, bob, carol = (core.create_identity(name) for name in ("alice", "bob", "carol"))
+        vouch = core.create_thought(
+            content={"from": server_identity.cid, "to": alice.cid, "relation": "vouches", "weight": 0.9},
+            thought_type="connection", identity=server_identity
+        )
+        core.store_thought(vouch)
+        core.store_thought(core.create_thought(
+            content={"about": bob.cid, "weight": 0.5}, thought_type="attestation", identity=alice
+        ))
+        client = WotPeerClient("localhost:50098", client_identity)
+        assert client.connect()
+        # bob has authored nothing yet, so alice's attestation waits
+        waiting = client.trust([alice.cid, bob.cid])
+        assert [round(s, 4) for s in waiting] == [0.9, 0.0], waiting
+        core.store_thought(core.create_thought(
+            content="bob's first thought", thought_type="basic", identity=bob
+        ))
+        scores = client.trust([alice.cid, bob.cid, carol.cid])
+        assert [round(s, 4) for s in scores] == [0.9, 0.36, 0.0], scores
+        assert client.trust([server_identity.cid], viewer=alice.cid) == [0.0]
+        core.store_thought(core.create_thought(
+            content={"on": vouch.cid, "weight": -1.0}, thought_type="attestation", identity=server_identity
+        ))
+        revoked = client.trust([alice.cid, bob.cid])
+        assert revoked == [-1.0, 0.0], revoked
+        client.close()
+        print(f"    Vouched {scores[0]:.2f}, one hop on {scores[1]:.2f}; revoked to {revoked}")
+
+        # Compromise windows: only the accepted owner may mark, flags reach the index
+        print("\n[15] Checking compromise window markers...")
+        keif, phone, mallory = (core.create_identity(name) for name in ("keif", "keif-phone", "mallory"))
+
+        def membership(owner):
+            connection = core.create_thought(
+                content={"from": phone.cid, "to": owner.cid, "relation": "member_of"},
+                thought_type="connection", identity=owner
+            )
+            core.store_thought(connection)
+            return connection
+
+        def attest(identity, subject, weight):
+            core.store_thought(core.create_thought(
+                content={"on": subject, "weight": weight}, thought_type="attestation", identity=identity
+            ))
+
+        def mark(owner, start):
+            core.store_thought(core.create_thought(
+                content={"name": "compromise_window", "applies_to": phone.cid, "window_start": start},
+                thought_type="aspect", identity=owner
+            ))
+
+        accepted = membership(keif)
+        attest(phone, accepted.cid, 1.0)
+        attest(keif, accepted.cid, 1.0)
+        attest(mallory, membership(mallory).cid, 1.0)   # phone never accepted mallory
+        time.sleep(0.01)
+        start = int(time.time() * 1000)
+        mark(mallory, start)
+        assert service.revocations.windows(phone.cid) == [], "unaccepted owner must not mark"
+
+        time.sleep(0.01)
+        attest(phone, accepted.cid, -1.0)
+        time.sleep(0.01)
+        mark(keif, int(time.time() * 1000))
+        assert service.revocations.windows(phone.cid) == [], "membership revoked before the window"
+        mark(keif, start)   # The revocation came after this window opened
+        assert len(service.revocations.windows(phone.cid)) == 1, "accepted owner must mark"
+
+        # Pushed after the marker: flagged, and what cites it lowered, once indexed
+        stolen = core.create_thought(content="Sent from the stolen phone", thought_type="basic", identity=phone)
+        reply = core.create_thought(
+            content="Replying to the phone", thought_type="basic", identity=client_identity, because=[stolen.cid]
+        )
+        client = WotPeerClient("localhost:50098", client_identity)
+        assert client.connect()
+        client.push_thoughts([stolen, reply])
         client.close()
+        rag = get_rag()
+        if rag:
+            appetites = dict(rag.pipeline.vec_conn.execute(
+                "SELECT cid, appetite_status FROM embedding_metadata WHERE cid IN (?, ?)",
+                (stolen.cid, reply.cid)
+            ).fetchall())
+            assert appetites == {stolen.cid: "flagged", reply.cid: "low_trust_path"}, appetites
+        print("    Rejected unaccepted and revoked owners; late push flagged, its reply lowered")
 
         print("\n" + "=" * 60)
         print("TEST PASSED")
         print("=" * 60)
 
     finally:
-        print("\n[9] Shutting down server...")
+        print("\n[16] Shutting down server...")
         server.stop(grace=1)
         print("    Done")
 
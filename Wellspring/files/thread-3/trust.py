@@ -0,0 +1,348 @@
+"""
+Trust for WoT Thread 3
+
+CreatorTrust turns attestation thoughts into one trust score per creator.
+An attestation's content names its subject as "about" (core) or "on"
+(dogfoods) and gives a weight in [-1, 1]. It counts toward the creator of
+the thought it is about. If the subject is an identity CID that has
+authored thoughts, it counts toward that identity. Self-attestations are
+ignored, and an attester's newest attestation on a subject (by
+created_at) replaces its earlier ones. Each attestation counts with the
+daemon's web-of-trust score for its attester, clamped to [0, 1], so
+attesters with no trust path from the daemon count for nothing. A
+creator's trust is
+
+    (1 + Σ a·positive weight) / (1 + Σ a·|weight|),   a = trust in the attester
+
+so an unattested creator stays at 1.0 and each trusted rejection pulls it
+toward 0. When the trust graph changes, only creators attested by an
+attester whose score moved are rescored.
+
+An attestation whose subject has not been stored yet waits in
+PendingAttestations until the subject, or a thought by the subject
+identity, arrives. Out-of-order sync therefore delays an attestation
+instead of dropping it.
+
+The store is scanned once at startup. After that, each stored attestation
+rescores only its creator, and the new score goes to a sink:
+EmbeddingPipeline.set_creator_trust in the daemon. The vector index joins
+creator trust at query time, so a trust change never rewrites the
+creator's embedded thoughts.
+
+TrustService keeps the web-of-trust graph between identities for the
+daemon's lifetime. Its edges come from vouch connections
+({"from", "to", "relation": "vouches"}, issued by "from"), from the
+voucher's attestations on those connections (weight -1 revokes), and from
+attestations about identities that have authored a stored thought. An
+attestation about a CID that is not stored yet waits in
+PendingAttestations: it becomes an edge once the CID authors a thought,
+and is dropped if the CID turns out to be a thought. The store is scanned once at startup;
+after that each stored thought updates its one edge, and the engine drops
+only the cached viewer maps the edge can affect. trust(viewer, targets)
+answers a whole batch from one cached map, and at most max_cached viewer
+maps are kept, least recently used evicted first.
+"""
+
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import core
+
+sys.path.append(str(Path(__file__).parent.parent))
+from wellspring_trust import MAX_HOPS, TrustEngine, TrustMap
+
+Sink = Callable[[Mapping[str, float]], None]
+
+DEFAULT_VIEWER_CACHE = 1024             # Viewer trust maps TrustService keeps
+MAX_PENDING_SUBJECTS = 10_000           # Missing subjects attestations may wait on
+VOUCH_RELATIONS = ("vouches", "trusts")
+
+
+def attestation_subject(thought: core.Thought) -> Tuple[Optional[str], float]:
+    """(subject CID, weight clamped to [-1, 1]) of an attestation; subject None if malformed."""
+    content = thought.content if isinstance(thought.content, dict) else {}
+    subject = content.get("about") or content.get("on")
+    try:
+        weight = max(-1.0, min(1.0, float(content.get("weight", 0.0))))
+    except (TypeError, ValueError):
+        return None, 0.0
+    return (subject if isinstance(subject, str) else None), weight
+
+
+def known_identity(cid: str, db_path: Path = core.DB_PATH) -> bool:
+    """True if cid has authored a stored thought."""
+    conn = sqlite3.connect(db_path)
+    authored = conn.execute(
+        "SELECT 1 FROM thoughts WHERE created_by = ? LIMIT 1", (cid,)
+    ).fetchone()
+    conn.close()
+    return authored is not None
+
+
+def subject_creator(subject: str, db_path: Path = core.DB_PATH) -> Optional[str]:
+    """Creator an attestation on subject counts toward; None until the subject is known."""
+    about = core.get_thought(subject, db_path)
+    if about is not None:
+        return about.created_by
+    return subject if known_identity(subject, db_path) else None
+
+
+class PendingAttestations:
+    """Attestations waiting for their subject, keyed by subject CID; oldest subjects dropped first."""
+
+    def __init__(self, max_subjects: int = MAX_PENDING_SUBJECTS):
+        self.max_subjects = max_subjects
+        self._waiting: "OrderedDict[str, List[core.Thought]]" = OrderedDict()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return sum(len(waiting) for waiting in self._waiting.values())
+
+    def defer(self, subject: str, thought: core.Thought):
+        self._waiting.setdefault(subject, []).append(thought)
+        while len(self._waiting) > self.max_subjects:
+            self.dropped += len(self._waiting.popitem(last=False)[1])
+
+    def arrived(self, thought: core.Thought) -> List[core.Thought]:
+        """Attestations waiting on this thought, or on its author as an identity."""
+        ready = self._waiting.pop(thought.cid, [])
+        if thought.created_by != thought.cid:
+            ready += self._waiting.pop(thought.created_by, [])
+        return ready
+
+
+class CreatorTrust:
+    """Attestation-driven trust per creator, pushed to a sink as it changes."""
+
+    def __init__(self, sink: Sink, db_path: Path = core.DB_PATH,
+                 trust: Optional["TrustService"] = None, viewer: Optional[str] = None):
+        self.sink = sink
+        self.db_path = db_path
+        self.trust_service = trust      # None: every attester counts fully
+        self.viewer = viewer            # Whose trust in attesters weights them
+        self._lock = threading.Lock()
+        self._given: Dict[Tuple[str, str], Tuple[str, int]] = {}          # (attester, subject) -> (creator, created_at)
+        self._by_creator: Dict[str, Dict[Tuple[str, str], float]] = {}    # creator -> {(attester, subject): weight}
+        self._attested: Dict[str, Set[str]] = {}                          # attester -> creators it attested
+        self._weights: Dict[str, float] = {}                              # attester -> weight of its attestations
+        self._scores: Dict[str, float] = {}
+        self.pending = PendingAttestations()
+        self.applied = 0
+        # Listen before scanning: an attestation seen twice just replaces itself
+        core.add_store_listener(self.on_store, db_path)
+        if trust is not None:
+            trust.subscribe(self.on_trust_change)
+        self._rebuild()
+
+    def close(self):
+        core.remove_store_listener(self.on_store)
+        if self.trust_service is not None:
+            self.trust_service.unsubscribe(self.on_trust_change)
+
+    def trust(self, creator: str) -> float:
+        return self._scores.get(creator, 1.0)
+
+    def scores(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._scores)
+
+    def on_store(self, thought: core.Thought):
+        """Store listener: fold in a new attestation and any that waited on this thought."""
+        with self._lock:
+            ready = self.pending.arrived(thought)
+            if thought.type == "attestation":
+                ready.append(thought)
+            if not ready:
+                return
+            vector = self._vector()
+            changed = set()
+            for attestation in ready:
+                creator = self._apply(attestation, vector)
+                if creator:
+                    changed.add(creator)
+            scores = self._rescore(changed)
+        if scores:
+            self.sink(scores)
+
+    def on_trust_change(self):
+        """TrustService listener: reweight attesters whose trust moved, rescoring their creators."""
+        with self._lock:
+            vector = self._vector()
+            changed = set()
+            for attester, creators in self._attested.items():
+                weight = self._attester_weight(attester, vector)
+                if weight != self._weights.get(attester):
+                    self._weights[attester] = weight
+                    changed |= creators
+            scores = self._rescore(changed)
+        if scores:
+            self.sink(scores)
+
+    def _rebuild(self):
+        """Fold in every stored attestation, oldest first, and push all scores at once."""
+        attestations = core.query_thoughts(thought_type="attestation", limit=-1, db_path=self.db_path)
+        with self._lock:
+            vector = self._vector()
+            changed = set()
+            for thought in reversed(attestations):
+                creator = self._apply(thought, vector)
+                if creator:
+                    changed.add(creator)
+            scores = self._rescore(changed)
+        if scores:
+            self.sink(scores)
+
+    def _vector(self) -> Optional[TrustMap]:
+        return self.trust_service.vector(self.viewer) if self.trust_service is not None else None
+
+    @staticmethod
+    def _attester_weight(attester: str, vector: Optional[TrustMap]) -> float:
+        return 1.0 if vector is None else max(0.0, min(1.0, vector.get(attester)))
+
+    def _apply(self, thought: core.Thought, vector: Optional[TrustMap]) -> Optional[str]:
+        """Record one attestation; returns the creator it counts toward, None if it changed nothing."""
+        subject, weight = attestation_subject(thought)
+        if subject is None:
+            return None
+        creator = subject_creator(subject, self.db_path)
+        if creator is None:
+            self.pending.defer(subject, thought)
+            return None
+        attester = thought.created_by
+        key = (attester, subject)
+        if creator == attester or self._given.get(key, (creator, thought.created_at))[1] > thought.created_at:
+            return None
+        self._given[key] = (creator, thought.created_at)
+        self._by_creator.setdefault(creator, {})[key] = weight
+        self._attested.setdefault(attester, set()).add(creator)
+        if attester not in self._weights:
+            self._weights[attester] = self._attester_weight(attester, vector)
+        self.applied += 1
+        return creator
+
+    def _rescore(self, creators: Set[str]) -> Dict[str, float]:
+        """Recompute creators' scores; returns the ones that changed."""
+        changed = {}
+        for creator in creators:
+            positive = total = 0.0
+            for (attester, _), weight in self._by_creator.get(creator, {}).items():
+                positive += self._weights[attester] * max(0.0, weight)
+                total += self._weights[attester] * abs(weight)
+            score = (1.0 + positive) / (1.0 + total)
+            if self._scores.get(creator) != score:
+                self._scores[creator] = score
+                changed[creator] = score
+        return changed
+
+
+# ============================================================================
+# TRUST SERVICE
+# ============================================================================
+
+class TrustService:
+    """Incrementally maintained trust graph answering batch trust queries."""
+
+    def __init__(self, db_path: Path = core.DB_PATH, max_cached: int = DEFAULT_VIEWER_CACHE,
+                 max_hops: int = MAX_HOPS):
+        self.db_path = db_path
+        self.engine = TrustEngine(max_hops=max_hops, max_cached=max_cached)
+        self._lock = threading.Lock()
+        self._vouches: Dict[str, Tuple[str, str]] = {}         # connection CID -> (from, to)
+        self._stamps: Dict[Tuple[str, str], int] = {}          # edge -> created_at of its weight
+        self._listeners: List[Callable[[], None]] = []         # Called after an edge changes
+        self.pending = PendingAttestations()
+        self.applied = 0
+        # Listen before scanning; edges keep their newest weight whatever the order
+        core.add_store_listener(self.on_store, db_path)
+        self._rebuild()
+
+    def close(self):
+        core.remove_store_listener(self.on_store)
+
+    def subscribe(self, listener: Callable[[], None]):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def vector(self, viewer: str) -> TrustMap:
+        """viewer's trust in every identity, for EmbeddingPipeline.query(creator_trust=...)."""
+        return self.engine.trust_from(viewer)
+
+    def trust(self, viewer: str, targets: Sequence[str]) -> List[float]:
+        scores = self.engine.trust_from(viewer)
+        return [scores.get(target) for target in targets]
+
+    def stats(self) -> dict:
+        engine = self.engine
+        return {
+            "edges": sum(len(out) for out in engine.edges.values()),
+            "epoch": engine.epoch,
+            "cached_viewers": len(engine._maps),
+            "hits": engine.cache_hits,
+            "misses": engine.cache_misses,
+            "evictions": engine.evictions,
+        }
+
+    def on_store(self, thought: core.Thought):
+        """Store listener: fold in a vouch or attestation and any attestations that waited on this thought."""
+        with self._lock:
+            ready = self.pending.arrived(thought)
+            if thought.type in ("connection", "attestation"):
+                ready.insert(0, thought)
+            changed = False
+            for waiting in ready:
+                changed = self._apply(waiting) or changed
+        if changed:
+            for listener in list(self._listeners):
+                listener()
+
+    def _rebuild(self):
+        """Every stored vouch, then every attestation, oldest first."""
+        for thought_type in ("connection", "attestation"):
+            thoughts = core.query_thoughts(thought_type=thought_type, limit=-1, db_path=self.db_path)
+            with self._lock:
+                for thought in reversed(thoughts):
+                    self._apply(thought)
+
+    def _set(self, src: str, dst: str, weight: float, at: int) -> bool:
+        if src == dst or self._stamps.get((src, dst), at) > at:
+            return False
+        self._stamps[(src, dst)] = at
+        self.engine.add_edge(src, dst, weight)
+        self.applied += 1
+        return True
+
+    def _apply(self, thought: core.Thought) -> bool:
+        """Fold one thought into the graph; True if an edge changed."""
+        content = thought.content if isinstance(thought.content, dict) else {}
+        if thought.type == "connection":
+            src, dst = content.get("from"), content.get("to")
+            if content.get("relation") not in VOUCH_RELATIONS or src != thought.created_by \
+                    or not isinstance(dst, str):
+                return False
+            try:
+                weight = max(-1.0, min(1.0, float(content.get("weight", 1.0))))
+            except (TypeError, ValueError):
+                return False
+            self._vouches[thought.cid] = (src, dst)
+            return self._set(src, dst, weight, thought.created_at)
+
+        subject, weight = attestation_subject(thought)
+        if subject is None:
+            return False
+        if subject in self._vouches:
+            # Only the voucher can reweight or revoke its own vouch
+            src, dst = self._vouches[subject]
+            return thought.created_by == src and self._set(src, dst, weight, thought.created_at)
+        if core.get_thought(subject, self.db_path) is not None:
+            return False    # About a thought, not an identity
+        if not known_identity(subject, self.db_path):
+            self.pending.defer(subject, thought)
+            return False
+        return self._set(thought.created_by, subject, weight, thought.created_at)
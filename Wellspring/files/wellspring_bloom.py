@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Bit-packed Bloom filter shared by the HTTP sync nodes.
+
+Bits live in a bytearray (bit i of byte j is position 8*j + i, the same
+LSB-first packing the original list-of-ints filter used), so the wire hex
+is just the buffer and batch membership checks run through numpy.
+
+Filters are sized from an expected item count and a target false-positive
+rate. Size and hash count travel with the hex in /bloom and /sync payloads;
+a payload with only bloom_hex is read as the legacy 1024-bit, 3-hash filter.
+Peers set both, so from_hex rejects a size the hex can't back and a hash
+count outside 1..MAX_HASHES before allocating or hashing anything.
+"""
+
+import math
+from typing import Iterable, List, Optional
+
+import mmh3
+import numpy as np
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+LEGACY_BITS = 1024
+LEGACY_HASHES = 3
+DEFAULT_FP_RATE = 0.01
+MIN_CAPACITY = 64
+GROWTH_FACTOR = 2        # Resize to this multiple of the current count
+MAX_HASHES = 16          # Also the most a peer's filter may ask us to compute
+
+
+def optimal_params(capacity: int, fp_rate: float = DEFAULT_FP_RATE) -> tuple:
+    """(bits, hashes) for `capacity` items at `fp_rate`. Bits round up to a byte."""
+    capacity = max(capacity, 1)
+    bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+    bits = max(8, (bits + 7) // 8 * 8)
+    hashes = max(1, min(MAX_HASHES, round(bits / capacity * math.log(2))))
+    return bits, hashes
+
+
+# ============================================================================
+# BLOOM FILTER
+# ============================================================================
+
+class BloomFilter:
+    def __init__(self, size: int = LEGACY_BITS, hash_count: int = LEGACY_HASHES,
+                 capacity: Optional[int] = None):
+        self.size = size
+        self.hash_count = hash_count
+        self.capacity = capacity
+        self.count = 0
+        self.bits = bytearray((size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float = DEFAULT_FP_RATE) -> 'BloomFilter':
+        capacity = max(capacity, MIN_CAPACITY)
+        size, hash_count = optimal_params(capacity, fp_rate)
+        return cls(size, hash_count, capacity)
+
+    @classmethod
+    def from_items(cls, items: Iterable[str], fp_rate: float = DEFAULT_FP_RATE,
+                   headroom: int = GROWTH_FACTOR) -> 'BloomFilter':
+        """Filter holding `items`, sized for `headroom` times as many."""
+        items = list(items)
+        bf = cls.for_capacity(len(items) * headroom, fp_rate)
+        bf.add_many(items)
+        return bf
+
+    def _indexes(self, item: str) -> List[int]:
+        return [mmh3.hash(item, i) % self.size for i in range(self.hash_count)]
+
+    def _index_matrix(self, items: List[str]) -> np.ndarray:
+        """(len(items), hash_count) bit positions."""
+        return np.array(
+            [[mmh3.hash(item, i) for i in range(self.hash_count)] for item in items],
+            dtype=np.int64
+        ).reshape(len(items), self.hash_count) % self.size
+
+    def add(self, item: str):
+        for idx in self._indexes(item):
+            self.bits[idx >> 3] |= 1 << (idx & 7)
+        self.count += 1
+
+    def add_many(self, items: Iterable[str]):
+        items = list(items)
+        if not items:
+            return
+        idx = self._index_matrix(items).ravel()
+        buf = np.frombuffer(self.bits, dtype=np.uint8)
+        np.bitwise_or.at(buf, idx >> 3, (1 << (idx & 7)).astype(np.uint8))
+        self.count += len(items)
+
+    def maybe_contains(self, item: str) -> bool:
+        for idx in self._indexes(item):
+            if not self.bits[idx >> 3] & (1 << (idx & 7)):
+                return False
+        return True
+
+    def contains_many(self, items: List[str]) -> np.ndarray:
+        """Boolean array: maybe_contains for each item."""
+        if not items:
+            return np.zeros(0, dtype=bool)
+        idx = self._index_matrix(items)
+        buf = np.frombuffer(bytes(self.bits), dtype=np.uint8)
+        hit = (buf[idx >> 3] >> (idx & 7)) & 1
+        return hit.all(axis=1)
+
+    @property
+    def saturated(self) -> bool:
+        """True once more items were added than the filter was sized for."""
+        limit = self.capacity if self.capacity is not None else optimal_capacity(self.size, DEFAULT_FP_RATE)
+        return self.count > limit
+
+    def fill_ratio(self) -> float:
+        ones = int(np.unpackbits(np.frombuffer(bytes(self.bits), dtype=np.uint8)).sum())
+        return ones / self.size
+
+    def estimated_fp_rate(self) -> float:
+        return self.fill_ratio() ** self.hash_count
+
+    # ========================================================================
+    # SERIALIZATION
+    # ========================================================================
+
+    def to_hex(self) -> str:
+        return self.bits.hex()
+
+    @classmethod
+    def from_hex(cls, hex_str: str, size: Optional[int] = None,
+                 hash_count: Optional[int] = None) -> 'BloomFilter':
+        """Raises ValueError for bad hex, a size outside 1..4 bits per hex digit,
+        or a hash count outside 1..MAX_HASHES."""
+        data = bytearray.fromhex(hex_str)
+        if size is not None and not 0 < size <= len(data) * 8:
+            raise ValueError(f"bloom_bits {size} outside 1..{len(data) * 8} for the hex sent")
+        if hash_count is not None and not 1 <= hash_count <= MAX_HASHES:
+            raise ValueError(f"bloom_hashes {hash_count} outside 1..{MAX_HASHES}")
+        size = size or len(data) * 8 or LEGACY_BITS
+        bf = cls(size, hash_count or LEGACY_HASHES)
+        bf.bits[:len(data)] = data[:len(bf.bits)]
+        return bf
+
+    def to_payload(self) -> dict:
+        return {"bloom_hex": self.to_hex(), "bloom_bits": self.size, "bloom_hashes": self.hash_count}
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> 'BloomFilter':
+        """Read /bloom or /sync fields. Missing parameters mean the legacy filter."""
+        bits = payload.get("bloom_bits")
+        hashes = payload.get("bloom_hashes")
+        return cls.from_hex(
+            payload["bloom_hex"],
+            LEGACY_BITS if bits is None else bits,
+            LEGACY_HASHES if hashes is None else hashes
+        )
+
+
+def optimal_capacity(bits: int, fp_rate: float = DEFAULT_FP_RATE) -> int:
+    """Items a filter of `bits` can hold at `fp_rate`."""
+    return int(bits * (math.log(2) ** 2) / -math.log(fp_rate))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Bloom filter sync benchmark: legacy fixed filter vs auto-sized filter.
+
+Two nodes share half their thoughts. The receiver sends its bloom; the
+sender offers every thought the bloom does not claim. Completeness is the
+fraction of the receiver's truly missing thoughts that get offered (a false
+positive hides a thought until the next sync). Payload is the hex size on
+the wire.
+
+Usage:
+    python wellspring_bloom_bench.py
+"""
+
+import hashlib
+import time
+
+from wellspring_bloom import BloomFilter, LEGACY_BITS, LEGACY_HASHES
+
+SIZES = [100, 1_000, 10_000, 100_000]
+
+
+def fake_cids(prefix: str, n: int) -> list:
+    return [f"baf_{hashlib.sha256(f'{prefix}:{i}'.encode()).hexdigest()[:32]}" for i in range(n)]
+
+
+def run(n: int, sized: bool) -> dict:
+    shared = fake_cids("shared", n // 2)
+    receiver = shared + fake_cids("receiver", n - n // 2)
+    sender_only = fake_cids("sender", n - n // 2)
+    sender = shared + sender_only
+
+    start = time.perf_counter()
+    if sized:
+        bloom = BloomFilter.from_items(receiver)
+    else:
+        bloom = BloomFilter(LEGACY_BITS, LEGACY_HASHES)
+        bloom.add_many(receiver)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    payload = bloom.to_payload()
+    peer_bloom = BloomFilter.from_payload(payload)
+    wire_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    present = peer_bloom.contains_many(sender)
+    check_ms = (time.perf_counter() - start) * 1000
+
+    offered = {cid for cid, seen in zip(sender, present) if not seen}
+    found = len(offered & set(sender_only))
+    return {
+        "n": n,
+        "bits": bloom.size,
+        "hashes": bloom.hash_count,
+        "payload_bytes": len(payload["bloom_hex"]),
+        "completeness": found / len(sender_only),
+        "fill": bloom.fill_ratio(),
+        "build_ms": build_ms,
+        "wire_ms": wire_ms,
+        "check_ms": check_ms,
+    }
+
+
+def main():
+    print("=" * 86)
+    print("Bloom sync benchmark: 50% overlap, sender offers what the receiver's bloom lacks")
+    print("=" * 86)
+    print(f"{'filter':<8} {'thoughts':>9} {'bits':>9} {'k':>3} {'payload':>9} "
+          f"{'complete':>9} {'fill':>6} {'build ms':>9} {'wire ms':>8} {'check ms':>9}")
+    for n in SIZES:
+        for sized in (False, True):
+            r = run(n, sized)
+            print(f"{'sized' if sized else 'legacy':<8} {r['n']:>9} {r['bits']:>9} {r['hashes']:>3} "
+                  f"{r['payload_bytes']:>9} {r['completeness']:>9.3f} {r['fill']:>6.2f} "
+                  f"{r['build_ms']:>9.1f} {r['wire_ms']:>8.2f} {r['check_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Anti-entropy gossip for the HTTP sync nodes.
+
+Each node runs a GossipScheduler instead of being driven through
+all-pairs sync rounds:
+
+    - Every round (about min_interval apart) picks a random peer that is
+      due and asks for its fingerprint: a digest of what that peer would
+      share with us. Only when it changed since our last pull do we send
+      our bloom and pull.
+    - A peer whose fingerprint matched (or whose pull brought nothing new)
+      is checked half as often, up to max_interval; a pull that brought
+      new thoughts resets it to min_interval.
+    - Thoughts created locally are pushed straight away to `fanout` random
+      peers that may read them, so fresh data does not wait for a round.
+
+The scheduler talks to peers through a PeerClient and waits through a
+clock, so wellspring_sim can run the same code on simulated time.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+GOSSIP_FANOUT = 3
+GOSSIP_MIN_INTERVAL = 1.0    # Seconds between checks of a changing peer
+GOSSIP_MAX_INTERVAL = 60.0   # Ceiling for a peer that keeps matching
+
+# ============================================================================
+# SET FINGERPRINTS
+# ============================================================================
+
+_cid_hashes: Dict[str, int] = {}
+
+def cid_hash(cid: str) -> int:
+    """64-bit hash of a CID; XOR of these is an order-independent set digest."""
+    h = _cid_hashes.get(cid)
+    if h is None:
+        h = int.from_bytes(hashlib.sha256(cid.encode()).digest()[:8], "big")
+        if len(_cid_hashes) < 1_000_000:
+            _cid_hashes[cid] = h
+    return h
+
+
+def set_fingerprint(digests: Iterable[Tuple[str, int, int]]) -> str:
+    """Combine (bucket, count, xor) digests into one comparable string."""
+    h = hashlib.sha256()
+    for bucket, count, xor in sorted(digests):
+        h.update(f"{bucket}:{count}:{xor:016x};".encode())
+    return h.hexdigest()[:32]
+
+# ============================================================================
+# PEER CLIENT
+# ============================================================================
+
+class PeerClient:
+    """How the scheduler reaches a peer. Every call returns None on failure."""
+
+    bytes_sent = 0
+    bytes_received = 0
+
+    async def identity(self, address: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def fingerprint(self, address: str, requester_cid: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def pull(self, address: str, bloom_payload: dict, requester_cid: str) -> Optional[List[dict]]:
+        """Thoughts the peer may share with us that miss our bloom."""
+        raise NotImplementedError
+
+    async def push(self, address: str, thoughts: List[dict], sender_cid: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def fetch(self, address: str, cids: List[str]) -> Optional[List[dict]]:
+        """Specific thoughts by CID; ones the peer lacks are left out."""
+        raise NotImplementedError
+
+
+class HttpPeerClient(PeerClient):
+    """PeerClient over the node HTTP API; requests run in worker threads."""
+
+    def __init__(self, timeout: float = 30):
+        self.timeout = timeout
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+
+    def _count(self, sent: int, received: int):
+        with self._lock:
+            self.bytes_sent += sent
+            self.bytes_received += received
+
+    async def _call(self, fn, *args):
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except (requests.RequestException, ValueError) as e:
+            print(f"Gossip request failed: {e}")
+            return None
+
+    def _get_json(self, url: str, params: Optional[dict] = None) -> dict:
+        resp = requests.get(url, params=params, timeout=self.timeout)
+        resp.raise_for_status()
+        self._count(len(resp.request.url), len(resp.content))
+        return resp.json()
+
+    def _post_json(self, url: str, body, params: Optional[dict] = None) -> requests.Response:
+        data = json.dumps(body, separators=(',', ':')).encode()
+        resp = requests.post(url, data=data, params=params, timeout=self.timeout,
+                             headers={"Content-Type": "application/json"}, stream=True)
+        resp.raise_for_status()
+        self._count(len(data), 0)
+        return resp
+
+    async def identity(self, address: str) -> Optional[dict]:
+        return await self._call(self._get_json, f"{address}/identity")
+
+    async def fingerprint(self, address: str, requester_cid: str) -> Optional[str]:
+        result = await self._call(self._get_json, f"{address}/fingerprint", {"peer_cid": requester_cid})
+        return result["fingerprint"] if result else None
+
+    def _pull(self, address: str, bloom_payload: dict, requester_cid: str) -> List[dict]:
+        thoughts = []
+        with self._post_json(f"{address}/sync/stream",
+                             {**bloom_payload, "sender_cid": requester_cid}) as resp:
+            for line in resp.iter_lines():
+                if line:
+                    self._count(0, len(line) + 1)
+                    thoughts.append(json.loads(line))
+        return thoughts
+
+    async def pull(self, address: str, bloom_payload: dict, requester_cid: str) -> Optional[List[dict]]:
+        return await self._call(self._pull, address, bloom_payload, requester_cid)
+
+    def _push(self, address: str, thoughts: List[dict], sender_cid: str) -> dict:
+        with self._post_json(f"{address}/receive",
+                             {"thoughts": thoughts, "sender_cid": sender_cid}) as resp:
+            self._count(0, len(resp.content))
+            return resp.json()
+
+    async def push(self, address: str, thoughts: List[dict], sender_cid: str) -> Optional[dict]:
+        return await self._call(self._push, address, thoughts, sender_cid)
+
+    def _fetch(self, address: str, cids: List[str]) -> List[dict]:
+        thoughts = []
+        for cid in cids:
+            resp = requests.get(f"{address}/thoughts/{cid}", timeout=self.timeout)
+            self._count(len(resp.request.url), len(resp.content))
+            if resp.status_code == 200:
+                thoughts.append(resp.json())
+        return thoughts
+
+    async def fetch(self, address: str, cids: List[str]) -> Optional[List[dict]]:
+        return await self._call(self._fetch, address, cids)
+
+# ============================================================================
+# SCHEDULER
+# ============================================================================
+
+class AsyncioClock:
+    """Wall-clock time on the running event loop."""
+
+    @property
+    def now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def sleep(self, delay: float):
+        return asyncio.sleep(delay)
+
+    def spawn(self, coro):
+        return asyncio.get_running_loop().create_task(coro)
+
+
+@dataclass
+class PeerState:
+    address: str
+    cid: Optional[str] = None
+    fingerprint: Optional[str] = None   # Peer's fingerprint when we last pulled
+    interval: float = GOSSIP_MIN_INTERVAL
+    next_due: float = 0.0
+    identity_sent: bool = False
+    in_sync: bool = False               # Last check found nothing to pull
+
+
+class GossipScheduler:
+    """
+    Background anti-entropy for one WellspringNodeV2, over node.peers.
+
+    run() loops forever; cancel its task to stop. Local node work (the
+    bloom we pull with, receive_batch, push visibility checks) runs on
+    `executor`, or inline if None.
+    """
+
+    def __init__(self, node, client: PeerClient, fanout: int = GOSSIP_FANOUT,
+                 min_interval: float = GOSSIP_MIN_INTERVAL, max_interval: float = GOSSIP_MAX_INTERVAL,
+                 clock=None, rng: Optional[random.Random] = None, executor=None):
+        self.node = node
+        self.client = client
+        self.fanout = fanout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.clock = clock or AsyncioClock()
+        self.rng = rng or random.Random()
+        self.executor = executor
+        self.peer_state: Dict[str, PeerState] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Metrics
+        self.rounds = 0
+        self.fingerprint_matches = 0
+        self.pulls = 0
+        self.pulled = 0
+        self.new = 0
+        self.pushes = 0
+        self.pushed = 0
+        self.failures = 0
+        self.started_at: Optional[float] = None
+        self.last_new_at: Optional[float] = None
+
+        node.store_listeners.append(self._on_store)
+
+    # ------------------------------------------------------------------------
+
+    def _peers(self) -> List[PeerState]:
+        for address in self.node.peers:
+            if address not in self.peer_state:
+                self.peer_state[address] = PeerState(address, next_due=self.clock.now)
+        return [self.peer_state[a] for a in self.node.peers]
+
+    async def _offload(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _resolve(self, peer: PeerState) -> bool:
+        """Learn the peer's identity CID; visibility and provenance need it."""
+        if peer.cid is None:
+            identity = await self.client.identity(peer.address)
+            if identity is None:
+                return False
+            self.node.register_peer(identity)
+            peer.cid = identity["cid"]
+        return True
+
+    def _back_off(self, peer: PeerState, reset: bool):
+        peer.interval = self.min_interval if reset else min(peer.interval * 2, self.max_interval)
+        peer.next_due = self.clock.now + peer.interval * self.rng.uniform(0.75, 1.25)
+
+    async def sync_with(self, peer: PeerState) -> int:
+        """One anti-entropy exchange. Returns the number of new thoughts."""
+        self.rounds += 1
+        if not await self._resolve(peer):
+            self.failures += 1
+            self._back_off(peer, reset=False)
+            return 0
+
+        fingerprint = await self.client.fingerprint(peer.address, self.node.cid)
+        if fingerprint is None:
+            self.failures += 1
+            self._back_off(peer, reset=False)
+            return 0
+        if fingerprint == peer.fingerprint:
+            self.fingerprint_matches += 1
+            peer.in_sync = True
+            self._back_off(peer, reset=False)
+            return 0
+
+        bloom = await self._offload(self.node.get_bloom_payload)
+        thoughts = await self.client.pull(peer.address, bloom, self.node.cid)
+        if thoughts is None:
+            self.failures += 1
+            self._back_off(peer, reset=False)
+            return 0
+        self.pulls += 1
+        self.pulled += len(thoughts)
+        new, waiting = 0, []
+        if thoughts:
+            result = await self._offload(self.node.receive_batch, thoughts, peer.cid)
+            new, waiting = result["new"], result["waiting_on"]
+        if waiting:
+            # The peer skips a signer identity our bloom falsely claims, which
+            # would leave that signer's thoughts parked here: ask for it by CID
+            identities = await self.client.fetch(peer.address, waiting)
+            if identities:
+                result = await self._offload(self.node.receive_batch, identities, peer.cid)
+                new += result["new"]
+                waiting = [s for s in waiting if s not in self.node.pubkeys]
+        if not waiting:
+            peer.fingerprint = fingerprint
+        peer.in_sync = new == 0 and not waiting
+        if new:
+            self.new += new
+            self.last_new_at = self.clock.now
+        self._back_off(peer, reset=new > 0)
+        return new
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self.started_at = self.clock.now
+        while True:
+            # At most one exchange per round; backed-off peers sit rounds out
+            peers = self._peers()
+            due = [p for p in peers if p.next_due <= self.clock.now]
+            if due:
+                await self.sync_with(self.rng.choice(due))
+            now = self.clock.now
+            wake = min((p.next_due for p in peers), default=now)
+            gap = self.min_interval * self.rng.uniform(0.5, 1.5)
+            await self.clock.sleep(min(max(wake - now, gap), self.max_interval))
+
+    # ------------------------------------------------------------------------
+    # EAGER PUSH
+    # ------------------------------------------------------------------------
+
+    def _on_store(self, thought: dict):
+        """Store listener: push thoughts we created. May run on a worker thread."""
+        if thought["created_by"] != self.node.cid or self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self.clock.spawn(self.push(thought))
+        else:
+            self._loop.call_soon_threadsafe(lambda: self.clock.spawn(self.push(thought)))
+
+    def _readers(self, thought: dict, peers: List[PeerState]) -> List[PeerState]:
+        return [p for p in peers if self.node._can_share_with_peer(thought, p.cid)[0]]
+
+    async def push(self, thought: dict):
+        """Send a new local thought to up to `fanout` random peers that may read it."""
+        peers = [p for p in self._peers() if p.cid is not None]
+        readers = await self._offload(self._readers, thought, peers)
+        for peer in self.rng.sample(readers, min(self.fanout, len(readers))):
+            batch = [thought]
+            if not peer.identity_sent:
+                batch.insert(0, self.node.identity_thought.to_dict())
+            result = await self.client.push(peer.address, batch, self.node.cid)
+            if result is None:
+                self.failures += 1
+                continue
+            peer.identity_sent = True
+            self.pushes += 1
+            self.pushed += len(batch)
+
+    # ------------------------------------------------------------------------
+
+    def metrics(self) -> dict:
+        now = self.clock.now
+        peers = list(self.peer_state.values())
+        return {
+            "rounds": self.rounds,
+            "fingerprint_matches": self.fingerprint_matches,
+            "pulls": self.pulls,
+            "pulled": self.pulled,
+            "new": self.new,
+            "pushes": self.pushes,
+            "pushed": self.pushed,
+            "failures": self.failures,
+            "bytes_sent": self.client.bytes_sent,
+            "bytes_received": self.client.bytes_received,
+            "peers_in_sync": sum(1 for p in peers if p.in_sync),
+            "peers": len(peers),
+            "converged": bool(peers) and all(p.in_sync for p in peers),
+            "quiet_for_s": now - (self.last_new_at if self.last_new_at is not None
+                                  else self.started_at if self.started_at is not None else now),
+            "intervals": {p.address: round(p.interval, 2) for p in peers},
+        }
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Bandwidth benchmark: gossip scheduler vs all-pairs round-robin sync.
+
+Runs wellspring_sim's in-process network twice per size, once with
+NetworkSimulator.sync_all_peers-style rounds (every peering pair, both
+ways, until a round moves nothing, repeated every interval) and once
+with a GossipScheduler on every node. Nodes keep creating thoughts for
+--workload seconds; after convergence both keep running for --idle
+seconds to show what staying in sync costs.
+
+Usage:
+    python wellspring_gossip_bench.py [--sizes 25 50 100] [--workload 30 --rate 5]
+"""
+
+import argparse
+
+from wellspring_sim import AntiEntropy, LinkModel, NetworkSimulation, RoundRobin, SimConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gossip vs round-robin bandwidth benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 50, 100])
+    parser.add_argument("--degree", type=int, default=4)
+    parser.add_argument("--workload", type=float, default=30, help="Seconds of thought creation")
+    parser.add_argument("--rate", type=float, default=5, help="Thoughts per second, network-wide")
+    parser.add_argument("--idle", type=float, default=300, help="Seconds measured after convergence")
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("=" * 96)
+    print(f"Gossip scheduler vs round-robin: degree {args.degree}, {args.rate:g} thoughts/s for "
+          f"{args.workload:g}s, then {args.idle:g}s idle")
+    print("=" * 96)
+    print(f"  {'nodes':>5} {'strategy':<11} {'converge':>9} {'coverage':>8} {'MB total':>9} "
+          f"{'KB/node':>9} {'messages':>9} {'idle KB/node/min':>17}")
+
+    for n in args.sizes:
+        config = SimConfig(
+            nodes=n,
+            degree=args.degree,
+            workload_s=args.workload,
+            workload_rate=args.rate,
+            interval_s=args.interval,
+            idle_s=args.idle,
+            seed=args.seed,
+            link=LinkModel()
+        )
+        results = [NetworkSimulation(config, strategy).run() for strategy in (RoundRobin(), AntiEntropy())]
+        for r in results:
+            conv = f"{r['convergence_s']:.1f}s" if r["convergence_s"] is not None else "—"
+            idle = r["idle_bytes_per_node_min"]
+            idle = f"{idle / 1024:.1f}" if idle is not None else "—"
+            print(f"  {n:>5} {r['strategy']:<11} {conv:>9} {r['coverage']:>8.1%} "
+                  f"{r['bytes_total'] / 1e6:>9.2f} {r['bytes_per_node'] / 1024:>9.1f} "
+                  f"{r['messages']:>9} {idle:>17}")
+        rr, ae = results
+        if rr["bytes_total"]:
+            print(f"  {'':>5} gossip/round-robin bytes to converge: {ae['bytes_total'] / rr['bytes_total']:.2f}x", end="")
+            if rr["idle_bytes_per_node_min"] and ae["idle_bytes_per_node_min"] is not None:
+                print(f", idle: {ae['idle_bytes_per_node_min'] / rr['idle_bytes_per_node_min']:.2f}x", end="")
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Time-indexed key history for signature verification.
+
+Identities rotate keys with a thought signed by the current key (see
+wellspring_key_rotation.py):
+
+    {"rotation": {"new_pubkey": <hex>, "reason": ..., "old_key_status": ...}}
+
+They revoke a compromised key with one signed by a key still valid:
+
+    {"revocation": {"pubkey": <hex>, "since": <timestamp>}}
+
+KeyHistory keeps, per identity, spans (valid_from, valid_to, pubkey),
+sorted by valid_from. A rotation at t ends the span holding t and starts
+the new key there. A revocation ends each span of that key at `since`, so
+whatever it signed afterwards stops verifying. The signing key is the one
+valid at the revocation's created_at, so a rotated-out key could backdate
+one into its own span. A key may therefore revoke itself, or a key whose
+span starts before its own ends: the latest key can revoke any, an older
+one cannot revoke its successors. A `since` before the revoked key's
+valid_from is rejected. The genesis key is valid from the start of time. Timestamps are whatever the node stamps
+created_at with: they only need to compare consistently.
+
+resolve(identity, created_at) is a binary search over the identity's span
+starts. Batches mostly hold one identity's thoughts from one era, so the
+last span each identity resolved to is tried first. Parsed public keys
+are cached by hex, so a batch parses each key once.
+"""
+
+import json
+import threading
+from bisect import bisect_right, insort
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Span = Tuple[object, Optional[object], str]   # (valid_from, valid_to or None, pubkey hex)
+
+BEGINNING = ""   # Sorts before every ISO timestamp
+
+
+def changes_keys(thought: dict) -> bool:
+    """True if thought is a rotation or revocation KeyHistory.apply would fold in."""
+    content = thought.get("content")
+    if not isinstance(content, dict):
+        return False
+    rotation, revocation = content.get("rotation"), content.get("revocation")
+    return (isinstance(rotation, dict) and isinstance(rotation.get("new_pubkey"), str)) \
+        or (isinstance(revocation, dict) and isinstance(revocation.get("pubkey"), str))
+
+
+class KeyHistory:
+    """identity -> sorted key spans, resolved by created_at."""
+
+    def __init__(self, parse: Optional[Callable[[str], Any]] = None):
+        self._spans: Dict[str, List[Span]] = {}
+        self._starts: Dict[str, List[object]] = {}
+        self._last: Dict[str, Span] = {}
+        self._parse = parse
+        self._parsed: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.fast_hits = 0
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def register(self, identity: str, pubkey: str, valid_from: object = BEGINNING):
+        """An identity's genesis key. Ignored once the identity has a history."""
+        with self._lock:
+            if identity not in self._spans:
+                self._set(identity, [(valid_from, None, pubkey)])
+
+    def rotate(self, identity: str, new_pubkey: str, at: object):
+        with self._lock:
+            spans = list(self._spans.get(identity, ()))
+            i = bisect_right([s[0] for s in spans], at) - 1
+            if i < 0:
+                return
+            start, end, pubkey = spans[i]
+            spans[i] = (start, at, pubkey)
+            insort(spans, (at, end, new_pubkey), key=lambda s: s[0])
+            self._set(identity, spans)
+
+    def revoke(self, identity: str, pubkey: str, since: object, at: Optional[object] = None) -> bool:
+        """End pubkey's spans at since. With at, the revocation's created_at, the key
+        valid then must be allowed to revoke pubkey. True if the history changed."""
+        with self._lock:
+            spans = self._spans.get(identity, ())
+            starts = [start for start, _, key in spans if key == pubkey]
+            try:
+                if not starts or since < starts[0]:
+                    return False
+                if at is not None:
+                    signer = self._find(identity, at)
+                    if signer is None or signer[2] != pubkey and signer[1] is not None \
+                            and not starts[0] < signer[1]:
+                        return False
+                spans = [
+                    (start, since if key == pubkey and (end is None or since < end) else end, key)
+                    for start, end, key in spans
+                ]
+            except TypeError:   # since doesn't compare with this node's timestamps
+                return False
+            self._set(identity, spans)
+            return True
+
+    def apply(self, thought: dict) -> bool:
+        """Fold in a verified rotation or revocation thought. True if it was one."""
+        if not changes_keys(thought):
+            return False
+        identity, at = thought["created_by"], thought["created_at"]
+        rotation, revocation = thought["content"].get("rotation"), thought["content"].get("revocation")
+        if isinstance(rotation, dict) and isinstance(rotation.get("new_pubkey"), str):
+            self.rotate(identity, rotation["new_pubkey"], at)
+        else:
+            self.revoke(identity, revocation["pubkey"], revocation.get("since", at), at)
+        return True
+
+    def _set(self, identity: str, spans: List[Span]):
+        self._spans[identity] = spans
+        self._starts[identity] = [s[0] for s in spans]
+        self._last.pop(identity, None)
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+
+    def resolve(self, identity: str, created_at: object) -> Optional[str]:
+        """Pubkey valid for identity at created_at, or None."""
+        self.lookups += 1
+        last = self._last.get(identity)
+        if last is not None and last[0] <= created_at and (last[1] is None or created_at < last[1]):
+            self.fast_hits += 1
+            return last[2]
+        span = self._find(identity, created_at)
+        if span is None:
+            return None
+        self._last[identity] = span
+        return span[2]
+
+    def _find(self, identity: str, created_at: object) -> Optional[Span]:
+        spans = self._spans.get(identity)
+        if not spans:
+            return None
+        i = bisect_right(self._starts[identity], created_at) - 1
+        if i < 0:
+            return None
+        span = spans[i]
+        if span[1] is not None and created_at >= span[1]:
+            return None
+        return span
+
+    def key(self, identity: str, created_at: object) -> Any:
+        """resolve(), parsed with `parse` and cached per pubkey."""
+        pubkey = self.resolve(identity, created_at)
+        if pubkey is None:
+            return None
+        parsed = self._parsed.get(pubkey)
+        if parsed is None:
+            parsed = self._parsed[pubkey] = self._parse(pubkey)
+        return parsed
+
+    def spans(self, identity: str) -> List[Span]:
+        return list(self._spans.get(identity, ()))
+
+    def __contains__(self, identity: str) -> bool:
+        return identity in self._spans
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_json(self) -> str:
+        """Only identities that rotated or revoked; genesis keys come from pubkeys."""
+        with self._lock:
+            return json.dumps({
+                identity: spans for identity, spans in self._spans.items()
+                if len(spans) > 1 or spans[0][1] is not None
+            })
+
+    def load_json(self, data: str):
+        with self._lock:
+            for identity, spans in json.loads(data).items():
+                self._set(identity, [tuple(s) for s in spans])
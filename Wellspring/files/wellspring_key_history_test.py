@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+KeyHistory rotation and revocation test.
+
+Walks one identity through two rotations and a series of revocations,
+applied as the thoughts a node would verify, and checks which key each
+created_at resolves to afterwards:
+  - rotations hand over at their created_at and keep older eras verifying
+  - a key can revoke itself, and the latest key can revoke older ones
+  - a rotated-out key cannot revoke its successors, even backdated into
+    its own span with since ""
+  - a since before the revoked key's valid_from is rejected
+  - the history survives to_json / load_json
+
+Usage:
+    python wellspring_key_history_test.py
+"""
+
+from typing import List
+
+from wellspring_key_history import KeyHistory
+
+ALICE = "cid:alice"
+T0, T1, T2, T3 = ("2026-01-01T00:00:00", "2026-02-01T00:00:00",
+                  "2026-03-01T00:00:00", "2026-04-01T00:00:00")
+
+
+def thought(created_at: str, content: dict) -> dict:
+    return {"created_by": ALICE, "created_at": created_at, "content": content}
+
+
+def rotation(created_at: str, new_pubkey: str) -> dict:
+    return thought(created_at, {"rotation": {"new_pubkey": new_pubkey, "reason": "scheduled"}})
+
+
+def revocation(created_at: str, pubkey: str, since: str) -> dict:
+    return thought(created_at, {"revocation": {"pubkey": pubkey, "since": since}})
+
+
+def expect(history: KeyHistory, checks: List[tuple], label: str) -> List[str]:
+    errors = []
+    for created_at, pubkey in checks:
+        resolved = history.resolve(ALICE, created_at)
+        if resolved != pubkey:
+            errors.append(f"{label}: {created_at} resolved to {resolved}, expected {pubkey}")
+    return errors
+
+
+def rotated() -> KeyHistory:
+    """k1 from the beginning, k2 from T1, k3 from T2."""
+    history = KeyHistory()
+    history.register(ALICE, "k1")
+    history.apply(rotation(T1, "k2"))
+    history.apply(rotation(T2, "k3"))
+    return history
+
+
+def main():
+    print("=" * 70)
+    print("KeyHistory rotation and revocation")
+    print("=" * 70)
+
+    errors = []
+    history = rotated()
+    errors += expect(history, [(T0, "k1"), (T1, "k2"), ("2026-02-15", "k2"), (T2, "k3"), (T3, "k3")],
+                     "rotation")
+
+    # A rotated-out key revokes itself from partway through its own era
+    history = rotated()
+    history.apply(revocation("2026-02-20", "k2", "2026-02-10"))
+    errors += expect(history, [("2026-02-05", "k2"), ("2026-02-15", None), (T2, "k3")], "self-revocation")
+
+    # The latest key revokes an older one
+    history = rotated()
+    history.apply(revocation(T3, "k1", "2026-01-15"))
+    errors += expect(history, [(T0, "k1"), ("2026-01-20", None), (T1, "k2"), (T3, "k3")], "latest revokes")
+
+    # k1, rotated out at T1, backdates revocations of its successors
+    history = rotated()
+    history.apply(revocation(T0, "k2", ""))
+    history.apply(revocation(T0, "k3", T3))
+    history.apply(revocation(T0, "k3", ""))
+    errors += expect(history, [(T1, "k2"), (T2, "k3"), (T3, "k3")], "backdated revocation")
+
+    # k2 may revoke k1, but not k3, which started after k2's span ended
+    history = rotated()
+    history.apply(revocation("2026-02-15", "k3", T3))
+    errors += expect(history, [(T3, "k3")], "successor revocation")
+
+    # A since before the revoked key's valid_from is rejected outright
+    history = rotated()
+    history.apply(revocation(T3, "k3", T0))
+    history.apply(revocation(T3, "k2", "2026-01-15"))
+    errors += expect(history, [(T1, "k2"), (T2, "k3"), (T3, "k3")], "since before valid_from")
+
+    # A since that doesn't compare with the node's timestamps is rejected too
+    history = rotated()
+    history.apply(revocation(T3, "k3", 0))
+    errors += expect(history, [(T3, "k3")], "malformed since")
+
+    # Persistence
+    history = rotated()
+    history.apply(revocation(T3, "k1", "2026-01-15"))
+    restored = KeyHistory()
+    restored.load_json(history.to_json())
+    restored.register(ALICE, "k1")   # Ignored: the history is already known
+    errors += expect(restored, [(T0, "k1"), ("2026-01-20", None), (T1, "k2"), (T3, "k3")], "reload")
+
+    print(f"  {'✓' if not errors else '✗'} {len(errors)} wrong keys")
+    for error in errors:
+        print(f"      {error}")
+
+    assert not errors, f"{len(errors)} timestamps resolved to the wrong key"
+    print("\n  Rotations and revocations resolve as expected.")
+
+
+if __name__ == "__main__":
+    main()
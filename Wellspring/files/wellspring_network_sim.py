@@ -13,6 +13,8 @@ import os
 import random
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from wellspring_stream import stream_sync, iter_thoughts
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 NODE_SCRIPT = os.path.join(BASE_DIR, "wellspring_node.py")
 
@@ -66,7 +68,7 @@ class NetworkSimulator:
         return requests.get(f"{self.nodes[name]['url']}/").json()
 
     def get_thoughts(self, name: str) -> list:
-        return requests.get(f"{self.nodes[name]['url']}/thoughts").json()["thoughts"]
+        return list(iter_thoughts(self.nodes[name]['url']))
 
     def create_thought(self, name: str, type: str, content: dict, because: list = None) -> dict:
         return requests.post(
@@ -78,27 +80,9 @@ class NetworkSimulator:
         src_url = self.nodes[src_name]["url"]
         dst_url = self.nodes[dst_name]["url"]
 
-        # Get dst's bloom
-        bloom_resp = requests.get(f"{dst_url}/bloom")
-        bloom_data = bloom_resp.json()
-
-        # Get src's identity
+        # Stream src's missing thoughts (per dst's bloom) straight into dst
         src_id = self.get_identity(src_name)
-
-        # Get missing thoughts from src
-        sync_resp = requests.post(
-            f"{src_url}/sync",
-            json={"bloom_hex": bloom_data["bloom_hex"], "sender_cid": src_id["cid"]}
-        )
-        sync_data = sync_resp.json()
-
-        if sync_data["count"] > 0:
-            recv_resp = requests.post(
-                f"{dst_url}/receive",
-                json={"thoughts": sync_data["thoughts"], "sender_cid": src_id["cid"]}
-            )
-            return recv_resp.json()
-        return {"received": 0, "new": 0}
+        return stream_sync(src_url, dst_url, src_id["cid"])
 
     def bidirectional_sync(self, name_a: str, name_b: str) -> dict:
         r1 = self.sync_nodes(name_a, name_b)
@@ -112,15 +96,17 @@ class NetworkSimulator:
         """Record a peering relationship."""
         self.peerings.append((name_a, name_b))
 
-    def sync_all_peers(self, rounds: int = 3) -> dict:
-        """Run sync rounds across all peering relationships."""
+    def sync_all_peers(self, rounds: int = 3, concurrency: int = 8) -> dict:
+        """Run sync rounds across all peering relationships, up to `concurrency` pairs at once."""
         stats = {"rounds": [], "total_synced": 0}
 
         for round_num in range(rounds):
             round_stats = {"round": round_num + 1, "syncs": []}
 
-            for name_a, name_b in self.peerings:
-                result = self.bidirectional_sync(name_a, name_b)
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(lambda pair: self.bidirectional_sync(*pair), self.peerings))
+
+            for (name_a, name_b), result in zip(self.peerings, results):
                 new_a = result[f"{name_a}→{name_b}"].get("new", 0)
                 new_b = result[f"{name_b}→{name_a}"].get("new", 0)
                 round_stats["syncs"].append({
@@ -8,19 +8,28 @@ import json
 import hashlib
 import asyncio
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set
+from typing import Iterator, List, Optional
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
 from cryptography.hazmat.primitives import serialization
-from cryptography.exceptions import InvalidSignature
 import base64
-import mmh3  # MurmurHash for bloom filter
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 import uvicorn
 
+from wellspring_bloom import BloomFilter
+from wellspring_receive import ReceivePipeline
+from wellspring_stream import ndjson_response, receive_ndjson
+from wellspring_key_history import KeyHistory, changes_keys
+from wellspring_storage import ThoughtStorage, MemoryStorage, open_storage, thought_row_error, DEFAULT_CACHE_SIZE
+
+VERIFY_WORKERS = 4
+SYNC_CHUNK = 1024  # CIDs bloom-checked per step while streaming /sync
+
 # ============================================================================
 # CRYPTO UTILITIES
 # ============================================================================
@@ -39,50 +48,6 @@ def compute_cid(data: dict) -> str:
     hash_bytes = hashlib.sha256(canonical.encode()).hexdigest()
     return f"baf_{hash_bytes[:32]}"
 
-# ============================================================================
-# BLOOM FILTER (simple implementation)
-# ============================================================================
-
-class BloomFilter:
-    def __init__(self, size: int = 1024, hash_count: int = 3):
-        self.size = size
-        self.hash_count = hash_count
-        self.bits = [0] * size
-
-    def add(self, item: str):
-        for i in range(self.hash_count):
-            idx = mmh3.hash(item, i) % self.size
-            self.bits[idx] = 1
-
-    def maybe_contains(self, item: str) -> bool:
-        for i in range(self.hash_count):
-            idx = mmh3.hash(item, i) % self.size
-            if self.bits[idx] == 0:
-                return False
-        return True
-
-    def to_hex(self) -> str:
-        # Pack bits into bytes
-        byte_arr = []
-        for i in range(0, len(self.bits), 8):
-            byte_val = 0
-            for j in range(8):
-                if i + j < len(self.bits):
-                    byte_val |= (self.bits[i + j] << j)
-            byte_arr.append(byte_val)
-        return bytes(byte_arr).hex()
-
-    @classmethod
-    def from_hex(cls, hex_str: str, size: int = 1024, hash_count: int = 3):
-        bf = cls(size, hash_count)
-        byte_arr = bytes.fromhex(hex_str)
-        bf.bits = []
-        for byte_val in byte_arr:
-            for j in range(8):
-                bf.bits.append((byte_val >> j) & 1)
-        bf.bits = bf.bits[:size]
-        return bf
-
 # ============================================================================
 # SIGNED THOUGHT
 # ============================================================================
@@ -149,12 +114,58 @@ class SignedThought:
 # ============================================================================
 
 class WellspringNode:
-    def __init__(self, name: str, port: int):
+    def __init__(self, name: str, port: int, storage: Optional[ThoughtStorage] = None):
         self.name = name
         self.port = port
         self.peers: List[str] = []  # URLs of peer nodes
 
-        # Identity
+        # Storage (in-memory unless a persistent backend is passed in)
+        self.storage = storage or MemoryStorage()
+        self.thoughts = self.storage.thoughts
+        self.pubkeys = self.storage.pubkeys   # Genesis key per identity
+        self.keys = KeyHistory(hex_to_pubkey)   # Key valid at each created_at
+        history = self.storage.get_meta("key_history")
+        if history:
+            self.keys.load_json(history)
+
+        # Identity (a stored key is reused, so a restarted node keeps its CID)
+        self._load_identity(name, port)
+        if self.cid not in self.thoughts:
+            self.thoughts[self.cid] = self.identity_thought.to_dict()
+            self.pubkeys[self.cid] = self.pubkey_hex
+        self.bloom = self._load_bloom()
+
+        # Receive batches verify off the event loop; the lock serializes stores
+        self.verify_pool = ThreadPoolExecutor(max_workers=VERIFY_WORKERS)
+        self.store_lock = threading.Lock()
+        self._batch_stored: Optional[List[str]] = None   # CIDs stored in the open receive_batch
+
+        # Received thoughts are stored in dependency order; ones whose signer
+        # is unknown wait in its parking lot until the identity arrives
+        self.receiver = ReceivePipeline(
+            store=self._store_thought,
+            has_thought=lambda cid: cid in self.thoughts,
+            has_signer=lambda cid: cid in self.pubkeys,
+            on_new=self._on_received,
+            rekeyed=changes_keys
+        )
+
+        # Stats
+        self.received_count = 0
+        self.sent_count = 0
+        self.verified_count = 0
+        self.rejected_count = 0
+
+    def _load_identity(self, name: str, port: int):
+        key_hex = self.storage.get_meta("private_key")
+        if key_hex:
+            self.private_key = Ed25519PrivateKey.from_private_bytes(bytes.fromhex(key_hex))
+            self.public_key = self.private_key.public_key()
+            self.pubkey_hex = pubkey_to_hex(self.public_key)
+            self.cid = self.storage.get_meta("identity_cid")
+            self.identity_thought = SignedThought.from_dict(self.thoughts[self.cid])
+            return
+
         self.private_key = Ed25519PrivateKey.generate()
         self.public_key = self.private_key.public_key()
         self.pubkey_hex = pubkey_to_hex(self.public_key)
@@ -167,17 +178,32 @@ class WellspringNode:
         self.identity_thought.sign(self.private_key)
         self.cid = self.identity_thought.cid
 
-        # Storage
-        self.thoughts: Dict[str, dict] = {self.cid: self.identity_thought.to_dict()}
-        self.pubkeys: Dict[str, str] = {self.cid: self.pubkey_hex}
-        self.bloom = BloomFilter()
-        self.bloom.add(self.cid)
-
-        # Stats
-        self.received_count = 0
-        self.sent_count = 0
-        self.verified_count = 0
-        self.rejected_count = 0
+        key_bytes = self.private_key.private_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PrivateFormat.Raw,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        self.storage.set_meta("private_key", key_bytes.hex())
+        self.storage.set_meta("identity_cid", self.cid)
+
+    def _load_bloom(self) -> BloomFilter:
+        """Reuse the bloom saved at shutdown if no thoughts arrived since; else rebuild."""
+        snapshot = self.storage.get_meta("bloom")
+        if snapshot:
+            saved = json.loads(snapshot)
+            if saved["thought_count"] == len(self.thoughts):
+                bloom = BloomFilter.from_payload(saved)
+                bloom.count = saved["thought_count"]
+                return bloom
+        return BloomFilter.from_items(self.thoughts)
+
+    def close(self):
+        """Snapshot the bloom and release storage."""
+        self.storage.set_meta("bloom", json.dumps({
+            **self.bloom.to_payload(),
+            "thought_count": len(self.thoughts)
+        }))
+        self.storage.close()
 
     def add_peer(self, url: str):
         if url not in self.peers:
@@ -194,39 +220,94 @@ class WellspringNode:
         self._store_thought(thought.to_dict())
         return thought
 
-    def _store_thought(self, thought: dict) -> bool:
-        """Store a thought if valid. Returns True if new."""
+    def _store_thought(self, thought: dict) -> Optional[bool]:
+        """Store a thought if valid. Returns True if new, None if a rotation may yet make its signature valid."""
         cid = thought["cid"]
         if cid in self.thoughts:
             return False  # Already have it
 
-        # Verify signature
+        # Check the row and verify the signature before anything is written
+        if thought_row_error(thought):
+            self.rejected_count += 1
+            return False
         if not self._verify_signature(thought):
+            if self._key_may_rotate(thought):
+                return None
             self.rejected_count += 1
             return False
 
         self.thoughts[cid] = thought
-        self.bloom.add(cid)
         self.verified_count += 1
+        if self._batch_stored is not None:
+            self._batch_stored.append(cid)
+        self._index_bloom(cid)
 
-        # Track identity pubkeys
+        # Track identity pubkeys and their rotations
         if thought["type"] == "identity" and thought["created_by"] == "GENESIS":
             self.pubkeys[cid] = thought["content"]["pubkey"]
+        elif self.keys.apply(thought):
+            self.storage.set_meta("key_history", self.keys.to_json())
 
         return True
 
+    def _forget_rolled_back(self, stored: List[str]):
+        """Rebuild the bloom and key history if a rolled-back transaction dropped stored thoughts."""
+        lost = [cid for cid in stored if cid not in self.thoughts]
+        if not lost:
+            return
+        self.verified_count -= len(lost)
+        self.bloom = BloomFilter.from_items(self.thoughts)
+        self.keys = KeyHistory(hex_to_pubkey)
+        history = self.storage.get_meta("key_history")
+        if history:
+            self.keys.load_json(history)
+
+    def _key_may_rotate(self, thought: dict) -> bool:
+        """A signature failing for a signer with a key history may use a key whose rotation hasn't arrived."""
+        return not (thought["type"] == "identity" and thought["created_by"] == "GENESIS") \
+            and thought["created_by"] in self.keys
+
+    def _signing_key(self, identity: str, created_at: str) -> Optional[Ed25519PublicKey]:
+        """identity's key at created_at; None if unknown, rotated out or revoked by then."""
+        if identity not in self.keys:
+            pubkey_hex = self.pubkeys.get(identity)
+            if pubkey_hex is None:
+                return None
+            self.keys.register(identity, pubkey_hex)
+        return self.keys.key(identity, created_at)
+
+    def rotate_key(self, reason: str = "Scheduled key rotation") -> SignedThought:
+        """Announce a fresh key in a thought signed by the current one, then sign with the new key."""
+        new_key = Ed25519PrivateKey.generate()
+        rotation = self.create_thought("basic", {
+            "text": "Rotating to new keypair",
+            "rotation": {
+                "new_pubkey": pubkey_to_hex(new_key.public_key()),
+                "reason": reason,
+                "old_key_status": "deprecated"
+            }
+        }, [self.cid])
+        self.private_key = new_key
+        self.public_key = new_key.public_key()
+        self.pubkey_hex = pubkey_to_hex(self.public_key)
+        self.storage.set_meta("private_key", new_key.private_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PrivateFormat.Raw,
+            encryption_algorithm=serialization.NoEncryption()
+        ).hex())
+        return rotation
+
     def _verify_signature(self, thought: dict) -> bool:
         created_by = thought["created_by"]
 
-        if thought["type"] == "identity" and created_by == "GENESIS":
-            pubkey_hex = thought["content"]["pubkey"]
-        elif created_by in self.pubkeys:
-            pubkey_hex = self.pubkeys[created_by]
-        else:
-            return False  # Unknown identity
-
         try:
-            pubkey = hex_to_pubkey(pubkey_hex)
+            if thought["type"] == "identity" and created_by == "GENESIS":
+                pubkey = hex_to_pubkey(thought["content"]["pubkey"])
+            else:
+                pubkey = self._signing_key(created_by, thought["created_at"])
+            if pubkey is None:
+                return False  # Unknown identity, or no key valid at created_at
+
             sign_data = {
                 "type": thought["type"],
                 "content": thought["content"],
@@ -244,72 +325,63 @@ class WellspringNode:
         except:
             return False
 
-    def get_bloom_hex(self) -> str:
-        return self.bloom.to_hex()
-
-    def get_missing_for_peer(self, peer_bloom_hex: str) -> List[dict]:
+    def _index_bloom(self, cid: str):
+        """Add to the bloom, resizing once it holds more than it was sized for."""
+        self.bloom.add(cid)
+        if self.bloom.saturated:
+            self.bloom = BloomFilter.from_items(self.thoughts)
+
+    def get_bloom_payload(self) -> dict:
+        return self.bloom.to_payload()
+
+    def iter_missing_for_peer(self, peer_bloom: BloomFilter) -> Iterator[dict]:
+        """
+        Yield thoughts we have that peer probably doesn't, with dependencies.
+        Each signer's identity is yielded before the first thought it signed
+        (so receiver can verify), one chunk of CIDs at a time.
+        """
+        sent = set()
+        for chunk in self.storage.cid_pages(SYNC_CHUNK):
+            present = peer_bloom.contains_many(chunk)
+            for cid, seen in zip(chunk, present):
+                if seen or cid in sent:
+                    continue
+                thought = self.thoughts[cid]
+                created_by = thought["created_by"]
+                # If created_by is an identity CID (not GENESIS) the peer probably lacks, send it first
+                if (created_by != "GENESIS" and created_by in self.thoughts
+                        and created_by not in sent and not peer_bloom.maybe_contains(created_by)):
+                    sent.add(created_by)
+                    yield self.thoughts[created_by]
+                sent.add(cid)
+                yield thought
+
+    def get_missing_for_peer(self, peer_bloom: BloomFilter) -> List[dict]:
         """Return thoughts we have that peer probably doesn't, with dependencies."""
-        peer_bloom = BloomFilter.from_hex(peer_bloom_hex)
-
-        # First pass: find thoughts peer is missing
-        missing_cids = set()
-        for cid in self.thoughts:
-            if not peer_bloom.maybe_contains(cid):
-                missing_cids.add(cid)
-
-        # Second pass: resolve identity dependencies
-        # For each missing thought, ensure we include the identity that signed it
-        needed_identities = set()
-        for cid in missing_cids:
-            thought = self.thoughts[cid]
-            created_by = thought["created_by"]
-            # If created_by is an identity CID (not GENESIS), we need that identity
-            if created_by != "GENESIS" and created_by in self.thoughts:
-                # Check if peer probably doesn't have this identity
-                if not peer_bloom.maybe_contains(created_by):
-                    needed_identities.add(created_by)
-
-        # Combine: identities first (so receiver can verify), then content
-        result = []
-
-        # Add identities first (order matters for verification)
-        for cid in needed_identities:
-            if cid not in missing_cids:  # Don't double-add
-                result.append(self.thoughts[cid])
-
-        # Add missing thoughts (identities that were already in missing_cids come naturally)
-        for cid in missing_cids:
-            result.append(self.thoughts[cid])
-
-        return result
+        return list(self.iter_missing_for_peer(peer_bloom))
 
     def receive_thoughts(self, thoughts: List[dict]) -> dict:
-        """Receive thoughts from peer. Returns stats."""
-        # Sort: identities first (need pubkeys before we can verify content)
-        sorted_thoughts = sorted(thoughts, key=lambda t: (
-            0 if t["type"] == "identity" else 1,
-            t.get("created_at", "")
-        ))
-
-        new_count = 0
-        deferred = []  # Thoughts we couldn't verify yet (missing identity)
-
-        # First pass: process what we can
-        for thought in sorted_thoughts:
-            if self._store_thought(thought):
-                new_count += 1
-                self.received_count += 1
-            elif thought["cid"] not in self.thoughts:
-                # Couldn't verify - might need identity we haven't seen yet
-                deferred.append(thought)
-
-        # Second pass: retry deferred (in case identity came later in batch)
-        for thought in deferred:
-            if self._store_thought(thought):
-                new_count += 1
-                self.received_count += 1
-
-        return {"received": len(thoughts), "new": new_count}
+        """
+        Receive thoughts from peer. Returns stats: new includes parked
+        thoughts this batch released; waiting_on lists signers still missing.
+        """
+        return self.receiver.receive(thoughts)
+
+    def _on_received(self, thought: dict, sender_cid: Optional[str]):
+        self.received_count += 1
+
+    def receive_batch(self, thoughts: List[dict]) -> dict:
+        """receive_thoughts for a worker thread, in one storage transaction."""
+        with self.store_lock:
+            self._batch_stored = []
+            try:
+                with self.storage.transaction():
+                    return self.receive_thoughts(thoughts)
+            except BaseException:
+                self._forget_rolled_back(self._batch_stored)
+                raise
+            finally:
+                self._batch_stored = None
 
     def stats(self) -> dict:
         return {
@@ -320,7 +392,8 @@ class WellspringNode:
             "received": self.received_count,
             "sent": self.sent_count,
             "verified": self.verified_count,
-            "rejected": self.rejected_count
+            "rejected": self.rejected_count,
+            "parked": len(self.receiver.parking)
         }
 
 # ============================================================================
@@ -330,6 +403,15 @@ class WellspringNode:
 class SyncRequest(BaseModel):
     bloom_hex: str
     sender_cid: str
+    bloom_bits: Optional[int] = None     # Absent: legacy 1024-bit filter
+    bloom_hashes: Optional[int] = None
+
+    def peer_bloom(self) -> BloomFilter:
+        """The sender's filter; 400 if its parameters are malformed."""
+        try:
+            return BloomFilter.from_hex(self.bloom_hex, self.bloom_bits, self.bloom_hashes)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
 class ThoughtsPayload(BaseModel):
     thoughts: List[dict]
@@ -357,25 +439,47 @@ def create_app(node: WellspringNode) -> FastAPI:
 
     @app.get("/bloom")
     async def get_bloom():
-        return {"bloom_hex": node.get_bloom_hex(), "thought_count": len(node.thoughts)}
+        return {**node.get_bloom_payload(), "thought_count": len(node.thoughts)}
 
     @app.post("/sync")
     async def sync(request: SyncRequest):
         """Receive peer's bloom, return thoughts they're missing."""
         # Learn about sender if new
-        missing = node.get_missing_for_peer(request.bloom_hex)
+        missing = node.get_missing_for_peer(request.peer_bloom())
         node.sent_count += len(missing)
         return {"thoughts": missing, "count": len(missing)}
 
+    @app.post("/sync/stream")
+    async def sync_stream(request: SyncRequest):
+        """Streaming /sync: missing thoughts as NDJSON, produced lazily."""
+        peer_bloom = request.peer_bloom()   # Fails with 400 before streaming starts
+
+        def missing():
+            for thought in node.iter_missing_for_peer(peer_bloom):
+                node.sent_count += 1
+                yield thought
+        return ndjson_response(missing())
+
     @app.post("/receive")
     async def receive(payload: ThoughtsPayload):
         """Receive thoughts from peer."""
-        result = node.receive_thoughts(payload.thoughts)
-        return result
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(node.verify_pool, node.receive_batch, payload.thoughts)
+        return {"received": result["received"], "new": result["new"], "parked": result["parked"]}
+
+    @app.post("/receive/stream")
+    async def receive_stream(request: Request):
+        """Streaming /receive: NDJSON body, verified in batches off the event loop."""
+        return await receive_ndjson(request, node.receive_batch, node.verify_pool)
 
     @app.get("/thoughts")
     async def list_thoughts():
-        return {"thoughts": list(node.thoughts.values()), "count": len(node.thoughts)}
+        thoughts = list(node.storage.iter_thoughts())
+        return {"thoughts": thoughts, "count": len(thoughts)}
+
+    @app.get("/thoughts/stream")
+    async def stream_thoughts():
+        return ndjson_response(node.storage.iter_thoughts())
 
     @app.get("/thoughts/{cid}")
     async def get_thought(cid: str):
@@ -407,16 +511,21 @@ def main():
     parser = argparse.ArgumentParser(description="Wellspring Node")
     parser.add_argument("--name", required=True, help="Node name")
     parser.add_argument("--port", type=int, required=True, help="HTTP port")
+    parser.add_argument("--db", help="SQLite path for persistent storage (default: in-memory)")
+    parser.add_argument("--cache", type=int, default=DEFAULT_CACHE_SIZE, help="Hot thoughts kept in memory")
     args = parser.parse_args()
 
-    node = WellspringNode(args.name, args.port)
+    node = WellspringNode(args.name, args.port, open_storage(args.db, args.cache))
     app = create_app(node)
 
     print(f"Starting Wellspring node: {node.name}")
     print(f"Identity CID: {node.cid}")
     print(f"Endpoint: http://localhost:{args.port}")
 
-    uvicorn.run(app, host="0.0.0.0", port=args.port, log_level="warning")
+    try:
+        uvicorn.run(app, host="0.0.0.0", port=args.port, log_level="warning")
+    finally:
+        node.close()
 
 if __name__ == "__main__":
     main()
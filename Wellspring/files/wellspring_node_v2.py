@@ -8,19 +8,40 @@ import json
 import hashlib
 import asyncio
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Tuple
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
 from cryptography.hazmat.primitives import serialization
-from cryptography.exceptions import InvalidSignature
 import base64
-import mmh3  # MurmurHash for bloom filter
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 import uvicorn
 
+from wellspring_bloom import BloomFilter
+from wellspring_gossip import GossipScheduler, HttpPeerClient, cid_hash, set_fingerprint, GOSSIP_FANOUT
+from wellspring_receive import ReceivePipeline
+from wellspring_stream import ndjson_response, receive_ndjson
+from wellspring_key_history import KeyHistory, changes_keys
+from wellspring_storage import ThoughtStorage, MemoryStorage, open_storage, thought_row_error, DEFAULT_CACHE_SIZE
+
+VERIFY_WORKERS = 4
+SYNC_CHUNK = 1024  # CIDs bloom-checked per step while streaming /sync
+
+# Visibility index buckets. A thought is filed under one or more buckets at
+# insert time; a peer is sent only the buckets it may read.
+BUCKET_PUBLIC = "public"
+BUCKET_LOCAL = "local_forever"
+BUCKET_PARTICIPANTS = "participants_only"   # All such thoughts; never readable as a whole
+BUCKET_UNKNOWN = "unknown"                  # Unrecognized visibility; never shared
+VISIBILITY_INDEX_VERSION = "1"
+
+PROVENANCE_BATCH = 1000  # received_via log entries per signed rollup thought
+
 # ============================================================================
 # CRYPTO UTILITIES
 # ============================================================================
@@ -39,48 +60,53 @@ def compute_cid(data: dict) -> str:
     hash_bytes = hashlib.sha256(canonical.encode()).hexdigest()
     return f"baf_{hash_bytes[:32]}"
 
+def provenance_leaf(entry: dict) -> bytes:
+    """Merkle leaf for one received_via log entry."""
+    canonical = json.dumps([entry["thought"], entry["via"], entry["received_at"]], separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).digest()
+
+def merkle_levels(leaves: List[bytes]) -> List[List[bytes]]:
+    """All tree levels, leaves first. An odd node is paired with itself."""
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        if len(level) % 2:
+            level = level + [level[-1]]
+        levels.append([hashlib.sha256(level[i] + level[i + 1]).digest() for i in range(0, len(level), 2)])
+    return levels
+
+def merkle_proof(levels: List[List[bytes]], index: int) -> List[dict]:
+    """Sibling hashes from leaf `index` up to the root."""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling >= len(level):
+            sibling = index
+        proof.append({"hash": level[sibling].hex(), "side": "left" if sibling < index else "right"})
+        index //= 2
+    return proof
+
 # ============================================================================
-# BLOOM FILTER
+# VISIBILITY INDEX
 # ============================================================================
 
-class BloomFilter:
-    def __init__(self, size: int = 1024, hash_count: int = 3):
-        self.size = size
-        self.hash_count = hash_count
-        self.bits = [0] * size
-
-    def add(self, item: str):
-        for i in range(self.hash_count):
-            idx = mmh3.hash(item, i) % self.size
-            self.bits[idx] = 1
-
-    def maybe_contains(self, item: str) -> bool:
-        for i in range(self.hash_count):
-            idx = mmh3.hash(item, i) % self.size
-            if self.bits[idx] == 0:
-                return False
-        return True
-
-    def to_hex(self) -> str:
-        byte_arr = []
-        for i in range(0, len(self.bits), 8):
-            byte_val = 0
-            for j in range(8):
-                if i + j < len(self.bits):
-                    byte_val |= (self.bits[i + j] << j)
-            byte_arr.append(byte_val)
-        return bytes(byte_arr).hex()
-
-    @classmethod
-    def from_hex(cls, hex_str: str, size: int = 1024, hash_count: int = 3):
-        bf = cls(size, hash_count)
-        byte_arr = bytes.fromhex(hex_str)
-        bf.bits = []
-        for byte_val in byte_arr:
-            for j in range(8):
-                bf.bits.append((byte_val >> j) & 1)
-        bf.bits = bf.bits[:size]
-        return bf
+def visibility_buckets(thought: dict) -> List[str]:
+    """
+    Index buckets for a thought, mirroring _can_share_with_peer:
+    public, local_forever, pool:<cid>, or one participant:<name|cid>
+    bucket per listed participant.
+    """
+    visibility = thought.get("visibility")
+    if visibility is None or visibility == "public":
+        return [BUCKET_PUBLIC]
+    if visibility == "local_forever":
+        return [BUCKET_LOCAL]
+    if visibility.startswith("pool:"):
+        return [visibility]
+    if visibility == "participants_only":
+        participants = thought.get("content", {}).get("participants", [])
+        return [BUCKET_PARTICIPANTS] + [f"participant:{p}" for p in participants]
+    return [BUCKET_UNKNOWN]
 
 # ============================================================================
 # SIGNED THOUGHT
@@ -148,34 +174,46 @@ class SignedThought:
 # ============================================================================
 
 class WellspringNodeV2:
-    def __init__(self, name: str, port: int):
+    def __init__(self, name: str, port: int, storage: Optional[ThoughtStorage] = None):
         self.name = name
         self.port = port
         self.peers: List[str] = []  # URLs of peer nodes
 
-        # Identity
-        self.private_key = Ed25519PrivateKey.generate()
-        self.public_key = self.private_key.public_key()
-        self.pubkey_hex = pubkey_to_hex(self.public_key)
-
-        self.identity_thought = SignedThought(
-            type="identity",
-            content={"name": name, "pubkey": self.pubkey_hex, "endpoint": f"http://localhost:{port}"},
-            created_by="GENESIS"
+        # Storage (in-memory unless a persistent backend is passed in)
+        self.storage = storage or MemoryStorage()
+        self.thoughts = self.storage.thoughts
+        self.pubkeys = self.storage.pubkeys   # Genesis key per identity
+        self.keys = KeyHistory(hex_to_pubkey)   # Key valid at each created_at
+        history = self.storage.get_meta("key_history")
+        if history:
+            self.keys.load_json(history)
+
+        # Identity (a stored key is reused, so a restarted node keeps its CID)
+        self._load_identity(name, port)
+        if self.cid not in self.thoughts:
+            self.thoughts[self.cid] = self.identity_thought.to_dict()
+            self.pubkeys[self.cid] = self.pubkey_hex
+        self.bloom = self._load_bloom()
+        self._load_visibility_index()
+
+        # Receive batches verify off the event loop; the lock serializes stores
+        self.verify_pool = ThreadPoolExecutor(max_workers=VERIFY_WORKERS)
+        self.store_lock = threading.Lock()
+        self._batch_stored: Optional[List[str]] = None   # CIDs stored in the open receive_batch
+
+        # Received thoughts are stored in dependency order; ones whose signer
+        # is unknown wait in its parking lot until the identity arrives
+        self.receiver = ReceivePipeline(
+            store=self._store_thought,
+            has_thought=lambda cid: cid in self.thoughts,
+            has_signer=lambda cid: cid in self.pubkeys,
+            on_new=self._on_received,
+            rekeyed=changes_keys
         )
-        self.identity_thought.sign(self.private_key)
-        self.cid = self.identity_thought.cid
-
-        # Storage
-        self.thoughts: Dict[str, dict] = {self.cid: self.identity_thought.to_dict()}
-        self.pubkeys: Dict[str, str] = {self.cid: self.pubkey_hex}
-        self.bloom = BloomFilter()
-        self.bloom.add(self.cid)
 
         # === NEW: Pool and peer relationship tracking ===
 
-        # Pool memberships: pool_cid -> set of member identity CIDs
-        self.pool_memberships: Dict[str, Set[str]] = {}
+        # Pool memberships (pool_cid -> member identity CIDs) live in storage
 
         # Peer shared pools: peer_cid -> set of pool_cids we share with them
         # This is the peering agreement - what pools we sync with this peer
@@ -184,16 +222,29 @@ class WellspringNodeV2:
         # Known peer identities: peer_cid -> identity dict
         self.known_peers: Dict[str, dict] = {}
 
-        # Sync provenance (local_forever): thought_cid -> received_via peer_cid
-        # These are stored as actual thoughts with visibility: local_forever
-        self.received_via: Dict[str, str] = {}
+        # Visibility buckets each peer may read: peer_cid -> buckets.
+        # Dropped for a peer when its memberships or peering change.
+        self.peer_buckets: Dict[str, Set[str]] = {}
+
+        # Per-bucket [count, xor of cid_hash], built on first use and kept
+        # current on insert; a peer's fingerprint combines its visible buckets
+        self.bucket_digests: Dict[str, List[int]] = {}
+
+        # Called with each newly stored thought (created or received), under
+        # store_lock when received through receive_batch. Must not block.
+        self.store_listeners: List[Callable[[dict], None]] = []
+
+        # Sync provenance: an append-only (thought, via, received_at) log in
+        # storage, rolled up every PROVENANCE_BATCH entries into one signed
+        # local_forever thought carrying the entries' Merkle root
+        self.provenance_pending = len(self.storage.pending_provenance())
 
         # Stats
         self.received_count = 0
         self.sent_count = 0
         self.verified_count = 0
         self.rejected_count = 0
-        self.filtered_count = 0  # Thoughts not synced due to visibility
+        self.withheld_count = 0  # Thoughts held back by visibility, summed over syncs
 
     # ========================================================================
     # POOL MANAGEMENT
@@ -217,32 +268,35 @@ class WellspringNodeV2:
         self._store_thought(thought.to_dict())
 
         # Auto-add self as member
-        self.pool_memberships[thought.cid] = {self.cid}
+        self.add_pool_member(thought.cid, self.cid)
 
         return thought
 
     def add_pool_member(self, pool_cid: str, member_cid: str):
         """Add a member to a pool we admin."""
-        if pool_cid not in self.pool_memberships:
-            self.pool_memberships[pool_cid] = set()
-        self.pool_memberships[pool_cid].add(member_cid)
+        self.storage.add_pool_member(pool_cid, member_cid)
+        self.peer_buckets.pop(member_cid, None)
 
     def is_pool_member(self, pool_cid: str, identity_cid: str) -> bool:
         """Check if an identity is a member of a pool."""
-        return identity_cid in self.pool_memberships.get(pool_cid, set())
+        return identity_cid in self.storage.pool_members(pool_cid)
 
     # ========================================================================
     # PEER RELATIONSHIP MANAGEMENT
     # ========================================================================
 
     def register_peer(self, peer_identity: dict):
-        """Register a peer's identity."""
+        """Register a peer's identity, storing thoughts parked on its key."""
         peer_cid = peer_identity["cid"]
         self.known_peers[peer_cid] = peer_identity
+        self.peer_buckets.pop(peer_cid, None)  # Name may add participant buckets
 
         # Store pubkey for verification
         if peer_identity["type"] == "identity":
             self.pubkeys[peer_cid] = peer_identity["content"]["pubkey"]
+            if self.receiver.parking.waiting_for(peer_cid):
+                with self.store_lock, self.storage.transaction():
+                    self.receiver.release_signer(peer_cid)
 
     def establish_peering(self, peer_cid: str, shared_pools: List[str]):
         """
@@ -252,6 +306,7 @@ class WellspringNodeV2:
         if peer_cid not in self.peer_shared_pools:
             self.peer_shared_pools[peer_cid] = set()
         self.peer_shared_pools[peer_cid].update(shared_pools)
+        self.peer_buckets.pop(peer_cid, None)
 
     def get_shared_pools(self, peer_cid: str) -> Set[str]:
         """Get pools shared with a specific peer."""
@@ -261,6 +316,65 @@ class WellspringNodeV2:
     # VISIBILITY FILTERING
     # ========================================================================
 
+    def _load_visibility_index(self):
+        """Index every stored thought once; later inserts index themselves."""
+        if self.storage.get_meta("visibility_index") == VISIBILITY_INDEX_VERSION:
+            return
+        with self.storage.transaction():
+            for thought in self.storage.iter_thoughts():
+                self.storage.index_thought(thought["cid"], visibility_buckets(thought))
+            self.storage.set_meta("visibility_index", VISIBILITY_INDEX_VERSION)
+
+    def _peer_visible_buckets(self, peer_cid: str) -> Set[str]:
+        """Buckets a peer may read, cached until its memberships or peering change."""
+        buckets = self.peer_buckets.get(peer_cid)
+        if buckets is None:
+            pools = self.storage.member_pools(peer_cid) | self.get_shared_pools(peer_cid)
+            buckets = {BUCKET_PUBLIC, f"participant:{peer_cid}"}
+            buckets.update(f"pool:{pool_cid}" for pool_cid in pools)
+            peer_name = self.known_peers.get(peer_cid, {}).get("content", {}).get("name")
+            if peer_name:
+                buckets.add(f"participant:{peer_name}")
+            self.peer_buckets[peer_cid] = buckets
+        return buckets
+
+    def _withheld_counts(self, visible: Set[str]) -> dict:
+        """Thoughts in buckets the peer may not read, by reason."""
+        sizes = self.storage.bucket_sizes()
+        participants_visible = set()  # A thought can list a peer by both name and CID
+        for bucket in visible:
+            if bucket.startswith("participant:"):
+                for page in self.storage.bucket_pages(bucket):
+                    participants_visible.update(page)
+        return {
+            "withheld_local_forever": sizes.get(BUCKET_LOCAL, 0),
+            "withheld_pool_access": sum(
+                n for b, n in sizes.items() if b.startswith("pool:") and b not in visible
+            ),
+            "withheld_participants": sizes.get(BUCKET_PARTICIPANTS, 0) - len(participants_visible),
+        }
+
+    def _bucket_digest(self, bucket: str) -> List[int]:
+        digest = self.bucket_digests.get(bucket)
+        if digest is None:
+            count = xor = 0
+            for page in self.storage.bucket_pages(bucket):
+                count += len(page)
+                for cid in page:
+                    xor ^= cid_hash(cid)
+            digest = self.bucket_digests[bucket] = [count, xor]
+        return digest
+
+    def fingerprint_for_peer(self, peer_cid: str) -> str:
+        """
+        Digest of what we would share with a peer. It changes whenever a
+        thought lands in a bucket the peer may read, so a gossiping peer
+        can skip the bloom exchange while it stays the same.
+        """
+        return set_fingerprint(
+            (bucket, *self._bucket_digest(bucket)) for bucket in self._peer_visible_buckets(peer_cid)
+        )
+
     def _can_share_with_peer(self, thought: dict, peer_cid: str) -> Tuple[bool, str]:
         """
         Determine if a thought can be shared with a specific peer.
@@ -317,6 +431,56 @@ class WellspringNodeV2:
     # THOUGHT MANAGEMENT
     # ========================================================================
 
+    def _load_identity(self, name: str, port: int):
+        key_hex = self.storage.get_meta("private_key")
+        if key_hex:
+            self.private_key = Ed25519PrivateKey.from_private_bytes(bytes.fromhex(key_hex))
+            self.public_key = self.private_key.public_key()
+            self.pubkey_hex = pubkey_to_hex(self.public_key)
+            self.cid = self.storage.get_meta("identity_cid")
+            self.identity_thought = SignedThought.from_dict(self.thoughts[self.cid])
+            return
+
+        self.private_key = Ed25519PrivateKey.generate()
+        self.public_key = self.private_key.public_key()
+        self.pubkey_hex = pubkey_to_hex(self.public_key)
+
+        self.identity_thought = SignedThought(
+            type="identity",
+            content={"name": name, "pubkey": self.pubkey_hex, "endpoint": f"http://localhost:{port}"},
+            created_by="GENESIS"
+        )
+        self.identity_thought.sign(self.private_key)
+        self.cid = self.identity_thought.cid
+
+        key_bytes = self.private_key.private_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PrivateFormat.Raw,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        self.storage.set_meta("private_key", key_bytes.hex())
+        self.storage.set_meta("identity_cid", self.cid)
+
+    def _load_bloom(self) -> BloomFilter:
+        """Reuse the bloom saved at shutdown if no thoughts arrived since; else rebuild."""
+        snapshot = self.storage.get_meta("bloom")
+        if snapshot:
+            saved = json.loads(snapshot)
+            if saved["thought_count"] == len(self.thoughts):
+                bloom = BloomFilter.from_payload(saved)
+                bloom.count = saved["thought_count"]
+                return bloom
+        return BloomFilter.from_items(self.thoughts)
+
+    def close(self):
+        """Seal pending provenance, snapshot the bloom and release storage."""
+        self.roll_up_provenance()
+        self.storage.set_meta("bloom", json.dumps({
+            **self.bloom.to_payload(),
+            "thought_count": len(self.thoughts)
+        }))
+        self.storage.close()
+
     def add_peer(self, url: str):
         if url not in self.peers:
             self.peers.append(url)
@@ -334,30 +498,82 @@ class WellspringNodeV2:
         self._store_thought(thought.to_dict())
         return thought
 
-    def _store_thought(self, thought: dict) -> bool:
-        """Store a thought if valid. Returns True if new."""
+    def _store_thought(self, thought: dict) -> Optional[bool]:
+        """Store a thought if valid. Returns True if new, None if a rotation may yet make its signature valid."""
         cid = thought["cid"]
         if cid in self.thoughts:
             return False
 
-        # Verify signature
+        # Check the row and verify the signature before anything is written
+        if thought_row_error(thought) or self._content_error(thought):
+            self.rejected_count += 1
+            return False
         if not self._verify_signature(thought):
+            if self._key_may_rotate(thought):
+                return None
             self.rejected_count += 1
             return False
 
         self.thoughts[cid] = thought
-        self.bloom.add(cid)
         self.verified_count += 1
-
-        # Track identity pubkeys
+        if self._batch_stored is not None:
+            self._batch_stored.append(cid)
+        self._index_bloom(cid)
+        buckets = visibility_buckets(thought)
+        self.storage.index_thought(cid, buckets)
+        for bucket in buckets:
+            digest = self.bucket_digests.get(bucket)
+            if digest is not None:
+                digest[0] += 1
+                digest[1] ^= cid_hash(cid)
+
+        # Track identity pubkeys and their rotations
         if thought["type"] == "identity" and thought["created_by"] == "GENESIS":
             self.pubkeys[cid] = thought["content"]["pubkey"]
+        elif self.keys.apply(thought):
+            self.storage.set_meta("key_history", self.keys.to_json())
 
         # Track pool memberships from attestations
         self._process_pool_membership(thought)
 
+        for listener in list(self.store_listeners):
+            try:
+                listener(thought)
+            except Exception as e:
+                print(f"Store listener failed: {e}")
+
         return True
 
+    @staticmethod
+    def _content_error(thought: dict) -> Optional[str]:
+        """What visibility_buckets and the sharing checks can't read in content, or None."""
+        content = thought["content"]
+        if not isinstance(content, dict):
+            return "content is not an object"
+        participants = content.get("participants", [])
+        if not isinstance(participants, list) or not all(isinstance(p, str) for p in participants):
+            return "participants is not a list of strings"
+        return None
+
+    def _forget_rolled_back(self, stored: List[str]):
+        """
+        Undo in-memory indexing of thoughts a rolled-back transaction never
+        kept. Bloom bits can't be cleared, so the filter is rebuilt from
+        storage; the rest is reloaded or rebuilt lazily.
+        """
+        self.provenance_pending = len(self.storage.pending_provenance())
+        lost = [cid for cid in stored if cid not in self.thoughts]
+        if not lost:
+            return
+        self.verified_count -= len(lost)
+        self.bloom = BloomFilter.from_items(self.thoughts)
+        self.bucket_digests.clear()
+        self.peer_buckets.clear()   # Memberships may have rolled back too
+        self.keys = KeyHistory(hex_to_pubkey)
+        history = self.storage.get_meta("key_history")
+        if history:
+            self.keys.load_json(history)
+
     def _process_pool_membership(self, thought: dict):
         """Extract pool membership info from attestation thoughts."""
         if thought["type"] != "attestation":
@@ -370,22 +586,54 @@ class WellspringNodeV2:
             pool_cid = content.get("pool")
             member_cid = content.get("member") or thought.get("created_by")
             if pool_cid and member_cid:
-                if pool_cid not in self.pool_memberships:
-                    self.pool_memberships[pool_cid] = set()
-                self.pool_memberships[pool_cid].add(member_cid)
+                self.add_pool_member(pool_cid, member_cid)
+
+    def _key_may_rotate(self, thought: dict) -> bool:
+        """A signature failing for a signer with a key history may use a key whose rotation hasn't arrived."""
+        return not (thought["type"] == "identity" and thought["created_by"] == "GENESIS") \
+            and thought["created_by"] in self.keys
+
+    def _signing_key(self, identity: str, created_at: str) -> Optional[Ed25519PublicKey]:
+        """identity's key at created_at; None if unknown, rotated out or revoked by then."""
+        if identity not in self.keys:
+            pubkey_hex = self.pubkeys.get(identity)
+            if pubkey_hex is None:
+                return None
+            self.keys.register(identity, pubkey_hex)
+        return self.keys.key(identity, created_at)
+
+    def rotate_key(self, reason: str = "Scheduled key rotation") -> SignedThought:
+        """Announce a fresh key in a thought signed by the current one, then sign with the new key."""
+        new_key = Ed25519PrivateKey.generate()
+        rotation = self.create_thought("basic", {
+            "text": "Rotating to new keypair",
+            "rotation": {
+                "new_pubkey": pubkey_to_hex(new_key.public_key()),
+                "reason": reason,
+                "old_key_status": "deprecated"
+            }
+        }, [self.cid])
+        self.private_key = new_key
+        self.public_key = new_key.public_key()
+        self.pubkey_hex = pubkey_to_hex(self.public_key)
+        self.storage.set_meta("private_key", new_key.private_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PrivateFormat.Raw,
+            encryption_algorithm=serialization.NoEncryption()
+        ).hex())
+        return rotation
 
     def _verify_signature(self, thought: dict) -> bool:
         created_by = thought["created_by"]
 
-        if thought["type"] == "identity" and created_by == "GENESIS":
-            pubkey_hex = thought["content"]["pubkey"]
-        elif created_by in self.pubkeys:
-            pubkey_hex = self.pubkeys[created_by]
-        else:
-            return False
-
         try:
-            pubkey = hex_to_pubkey(pubkey_hex)
+            if thought["type"] == "identity" and created_by == "GENESIS":
+                pubkey = hex_to_pubkey(thought["content"]["pubkey"])
+            else:
+                pubkey = self._signing_key(created_by, thought["created_at"])
+            if pubkey is None:
+                return False  # Unknown identity, or no key valid at created_at
+
             sign_data = {
                 "type": thought["type"],
                 "content": thought["content"],
@@ -403,150 +651,167 @@ class WellspringNodeV2:
         except:
             return False
 
-    def get_bloom_hex(self) -> str:
-        return self.bloom.to_hex()
+    def _index_bloom(self, cid: str):
+        """Add to the bloom, resizing once it holds more than it was sized for."""
+        self.bloom.add(cid)
+        if self.bloom.saturated:
+            self.bloom = BloomFilter.from_items(self.thoughts)
+
+    def get_bloom_payload(self) -> dict:
+        return self.bloom.to_payload()
 
     # ========================================================================
     # SYNC WITH VISIBILITY FILTERING
     # ========================================================================
 
-    def get_missing_for_peer(self, peer_bloom_hex: str, peer_cid: str) -> Tuple[List[dict], dict]:
+    def iter_missing_for_peer(self, peer_bloom: BloomFilter, peer_cid: str,
+                              stats: Optional[dict] = None) -> Iterator[dict]:
+        """
+        Yield thoughts we have that peer probably doesn't, FILTERED by visibility.
+        Only the visibility buckets the peer may read are walked. Each
+        shareable signer identity is yielded before the first thought it
+        signed. Counts accumulate into `stats` as the stream advances.
+        withheld_* counts come from bucket sizes: every thought held back
+        from this peer, whether or not the peer already had it. Unlike the
+        old filtered_* counts, they need no scan of the hidden buckets.
+        """
+        if stats is None:
+            stats = {}
+        visible = self._peer_visible_buckets(peer_cid)
+        withheld = self._withheld_counts(visible)
+        self.withheld_count += sum(withheld.values())
+        stats.update(withheld)
+        for key in ("total_checked", "missing", "shared"):
+            stats.setdefault(key, 0)
+
+        sent = set()
+        for bucket in sorted(visible):
+            for chunk in self.storage.bucket_pages(bucket, SYNC_CHUNK):
+                present = peer_bloom.contains_many(chunk)
+                stats["total_checked"] += len(chunk)
+
+                for cid, seen in zip(chunk, present):
+                    if seen or cid in sent:
+                        continue
+                    stats["missing"] += 1
+                    thought = self.thoughts[cid]
+
+                    # Resolve identity dependency, if we can share that identity
+                    created_by = thought["created_by"]
+                    if (created_by != "GENESIS" and created_by in self.thoughts
+                            and created_by not in sent and not peer_bloom.maybe_contains(created_by)):
+                        identity = self.thoughts[created_by]
+                        if visible.intersection(visibility_buckets(identity)):
+                            sent.add(created_by)
+                            stats["shared"] += 1
+                            yield identity
+
+                    sent.add(cid)
+                    stats["shared"] += 1
+                    yield thought
+
+    def get_missing_for_peer(self, peer_bloom: BloomFilter, peer_cid: str) -> Tuple[List[dict], dict]:
         """
         Return thoughts we have that peer probably doesn't, FILTERED by visibility.
         Returns (thoughts, stats).
         """
-        peer_bloom = BloomFilter.from_hex(peer_bloom_hex)
-
-        stats = {
-            "total_checked": 0,
-            "missing": 0,
-            "filtered_local_forever": 0,
-            "filtered_pool_access": 0,
-            "filtered_participants": 0,
-            "shared": 0
-        }
-
-        # First pass: find thoughts peer is missing
-        missing_cids = set()
-        for cid in self.thoughts:
-            stats["total_checked"] += 1
-            if not peer_bloom.maybe_contains(cid):
-                missing_cids.add(cid)
-                stats["missing"] += 1
-
-        # Second pass: filter by visibility
-        shareable_cids = set()
-        for cid in missing_cids:
-            thought = self.thoughts[cid]
-            can_share, reason = self._can_share_with_peer(thought, peer_cid)
-
-            if can_share:
-                shareable_cids.add(cid)
-            else:
-                self.filtered_count += 1
-                if "local_forever" in reason:
-                    stats["filtered_local_forever"] += 1
-                elif "pool_access" in reason:
-                    stats["filtered_pool_access"] += 1
-                elif "participant" in reason:
-                    stats["filtered_participants"] += 1
-
-        # Third pass: resolve identity dependencies for shareable thoughts
-        needed_identities = set()
-        for cid in shareable_cids:
-            thought = self.thoughts[cid]
-            created_by = thought["created_by"]
-            if created_by != "GENESIS" and created_by in self.thoughts:
-                if not peer_bloom.maybe_contains(created_by):
-                    # Check if we can share this identity
-                    identity_thought = self.thoughts[created_by]
-                    can_share_id, _ = self._can_share_with_peer(identity_thought, peer_cid)
-                    if can_share_id:
-                        needed_identities.add(created_by)
-
-        # Combine: identities first, then content
-        result = []
-
-        for cid in needed_identities:
-            if cid not in shareable_cids:
-                result.append(self.thoughts[cid])
-                stats["shared"] += 1
-
-        for cid in shareable_cids:
-            result.append(self.thoughts[cid])
-            stats["shared"] += 1
-
+        stats = {}
+        result = list(self.iter_missing_for_peer(peer_bloom, peer_cid, stats))
         return result, stats
 
     def receive_thoughts(self, thoughts: List[dict], sender_cid: str = None) -> dict:
-        """Receive thoughts from peer. Returns stats."""
-        # Sort: identities first
-        sorted_thoughts = sorted(thoughts, key=lambda t: (
-            0 if t["type"] == "identity" else 1,
-            t.get("created_at", "")
-        ))
-
-        new_count = 0
-        deferred = []
-
-        for thought in sorted_thoughts:
-            if self._store_thought(thought):
-                new_count += 1
-                self.received_count += 1
-
-                # Record provenance (as local_forever thought)
-                if sender_cid:
-                    self._record_received_via(thought["cid"], sender_cid)
-
-            elif thought["cid"] not in self.thoughts:
-                deferred.append(thought)
-
-        for thought in deferred:
-            if self._store_thought(thought):
-                new_count += 1
-                self.received_count += 1
-                if sender_cid:
-                    self._record_received_via(thought["cid"], sender_cid)
-
-        return {"received": len(thoughts), "new": new_count}
+        """
+        Receive thoughts from peer. Returns stats: new includes parked
+        thoughts this batch released; waiting_on lists signers still missing.
+        """
+        return self.receiver.receive(thoughts, sender_cid)
+
+    def _on_received(self, thought: dict, sender_cid: Optional[str]):
+        self.received_count += 1
+        if sender_cid:
+            self._record_received_via(thought["cid"], sender_cid)
+
+    def receive_batch(self, thoughts: List[dict], sender_cid: str = None) -> dict:
+        """receive_thoughts for a worker thread, in one storage transaction."""
+        with self.store_lock:
+            self._batch_stored = []
+            try:
+                with self.storage.transaction():
+                    result = self.receive_thoughts(thoughts, sender_cid)
+                    if self.provenance_pending >= PROVENANCE_BATCH:
+                        self.roll_up_provenance()
+            except BaseException:
+                self._forget_rolled_back(self._batch_stored)
+                raise
+            finally:
+                self._batch_stored = None
+        return result
 
     def _record_received_via(self, thought_cid: str, sender_cid: str):
         """
-        Record sync provenance as a local_forever connection thought.
-        This is never synced - it's our local record of where we got this thought.
+        Log sync provenance: where we got this thought. Never synced; signed
+        in bulk by roll_up_provenance rather than one thought per entry.
         """
-        # Quick lookup cache
-        self.received_via[thought_cid] = sender_cid
+        self.storage.append_provenance(thought_cid, sender_cid, datetime.utcnow().isoformat())
+        self.provenance_pending += 1
 
-        # Create actual thought for full audit trail
-        provenance = SignedThought(
+    def roll_up_provenance(self) -> Optional[SignedThought]:
+        """
+        Seal all pending provenance entries under one signed local_forever
+        connection thought whose content carries their Merkle root.
+        """
+        entries = self.storage.pending_provenance()
+        if not entries:
+            return None
+
+        root = merkle_levels([provenance_leaf(e) for e in entries])[-1][0]
+        batch = SignedThought(
             type="connection",
             content={
                 "connection_type": "received_via",
-                "thought": thought_cid,
-                "via": sender_cid,
-                "received_at": datetime.utcnow().isoformat()
+                "merkle_root": root.hex(),
+                "entries": len(entries),
+                "first_seq": entries[0]["seq"],
+                "last_seq": entries[-1]["seq"],
+                "sealed_at": datetime.utcnow().isoformat()
             },
             created_by=self.cid,
-            because=[thought_cid, sender_cid],
             visibility="local_forever"
         )
-        provenance.sign(self.private_key)
+        batch.sign(self.private_key)
 
-        # Store without syncing (local_forever will prevent sync anyway)
-        self.thoughts[provenance.cid] = provenance.to_dict()
-        self.bloom.add(provenance.cid)
+        with self.storage.transaction():
+            self.thoughts[batch.cid] = batch.to_dict()
+            self.storage.index_thought(batch.cid, [BUCKET_LOCAL])
+            self.storage.seal_provenance(entries[-1]["seq"], batch.cid)
+        self._index_bloom(batch.cid)
+        self.provenance_pending = 0
+        return batch
 
-    def get_provenance(self, thought_cid: str) -> Optional[str]:
-        """Get the peer we received a thought from."""
-        return self.received_via.get(thought_cid)
+    def get_provenance(self, thought_cid: str) -> Optional[dict]:
+        """
+        The peer we received a thought from, plus (once sealed) the batch
+        thought and a Merkle proof tying this entry to its root.
+        """
+        entry = self.storage.get_provenance(thought_cid)
+        if entry is None:
+            return None
+
+        result = {"received_via": entry["via"], "received_at": entry["received_at"], "batch": entry["batch"]}
+        if entry["batch"]:
+            members = self.storage.provenance_batch(entry["batch"])
+            index = next(i for i, e in enumerate(members) if e["seq"] == entry["seq"])
+            levels = merkle_levels([provenance_leaf(e) for e in members])
+            result["merkle_root"] = levels[-1][0].hex()
+            result["proof"] = merkle_proof(levels, index)
+        return result
 
     def stats(self) -> dict:
         return {
             "name": self.name,
             "cid": self.cid[:20] + "...",
             "thoughts": len(self.thoughts),
-            "pools": len(self.pool_memberships),
+            "pools": self.storage.pool_count(),
             "peers": len(self.peers),
             "known_peer_identities": len(self.known_peers),
             "peer_agreements": len(self.peer_shared_pools),
@@ -554,7 +819,9 @@ class WellspringNodeV2:
             "sent": self.sent_count,
             "verified": self.verified_count,
             "rejected": self.rejected_count,
-            "filtered": self.filtered_count
+            "withheld": self.withheld_count,
+            "parked": len(self.receiver.parking),
+            "provenance_pending": self.provenance_pending
         }
 
 # ============================================================================
@@ -564,6 +831,15 @@ class WellspringNodeV2:
 class SyncRequest(BaseModel):
     bloom_hex: str
     sender_cid: str
+    bloom_bits: Optional[int] = None     # Absent: legacy 1024-bit filter
+    bloom_hashes: Optional[int] = None
+
+    def peer_bloom(self) -> BloomFilter:
+        """The sender's filter; 400 if its parameters are malformed."""
+        try:
+            return BloomFilter.from_hex(self.bloom_hex, self.bloom_bits, self.bloom_hashes)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
 class ThoughtsPayload(BaseModel):
     thoughts: List[dict]
@@ -583,8 +859,16 @@ class PeeringRequest(BaseModel):
 # CREATE APP
 # ============================================================================
 
-def create_app(node: WellspringNodeV2) -> FastAPI:
-    app = FastAPI(title=f"Wellspring Node V2: {node.name}")
+def create_app(node: WellspringNodeV2, gossip: Optional[GossipScheduler] = None) -> FastAPI:
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        task = asyncio.create_task(gossip.run()) if gossip else None
+        yield
+        if task:
+            task.cancel()
+
+    app = FastAPI(title=f"Wellspring Node V2: {node.name}", lifespan=lifespan)
 
     @app.get("/")
     async def root():
@@ -596,24 +880,55 @@ def create_app(node: WellspringNodeV2) -> FastAPI:
 
     @app.get("/bloom")
     async def get_bloom():
-        return {"bloom_hex": node.get_bloom_hex(), "thought_count": len(node.thoughts)}
+        return {**node.get_bloom_payload(), "thought_count": len(node.thoughts)}
+
+    @app.get("/fingerprint")
+    async def get_fingerprint(peer_cid: str):
+        """Digest of what we'd share with peer_cid; unchanged means nothing new to pull."""
+        return {"fingerprint": node.fingerprint_for_peer(peer_cid)}
 
     @app.post("/sync")
     async def sync(request: SyncRequest):
         """Receive peer's bloom, return thoughts they're missing (visibility-filtered)."""
-        missing, stats = node.get_missing_for_peer(request.bloom_hex, request.sender_cid)
+        missing, stats = node.get_missing_for_peer(request.peer_bloom(), request.sender_cid)
         node.sent_count += len(missing)
         return {"thoughts": missing, "count": len(missing), "filter_stats": stats}
 
+    @app.post("/sync/stream")
+    async def sync_stream(request: SyncRequest):
+        """Streaming /sync: visibility-filtered missing thoughts as NDJSON."""
+        peer_bloom = request.peer_bloom()   # Fails with 400 before streaming starts
+
+        def missing():
+            for thought in node.iter_missing_for_peer(peer_bloom, request.sender_cid):
+                node.sent_count += 1
+                yield thought
+        return ndjson_response(missing())
+
     @app.post("/receive")
     async def receive(payload: ThoughtsPayload):
         """Receive thoughts from peer."""
-        result = node.receive_thoughts(payload.thoughts, payload.sender_cid)
-        return result
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            node.verify_pool, node.receive_batch, payload.thoughts, payload.sender_cid
+        )
+        return {"received": result["received"], "new": result["new"], "parked": result["parked"]}
+
+    @app.post("/receive/stream")
+    async def receive_stream(request: Request, sender_cid: Optional[str] = None):
+        """Streaming /receive: NDJSON body, verified in batches off the event loop."""
+        return await receive_ndjson(
+            request, lambda batch: node.receive_batch(batch, sender_cid), node.verify_pool
+        )
 
     @app.get("/thoughts")
     async def list_thoughts():
-        return {"thoughts": list(node.thoughts.values()), "count": len(node.thoughts)}
+        thoughts = list(node.storage.iter_thoughts())
+        return {"thoughts": thoughts, "count": len(thoughts)}
+
+    @app.get("/thoughts/stream")
+    async def stream_thoughts():
+        return ndjson_response(node.storage.iter_thoughts())
 
     @app.get("/thoughts/{cid}")
     async def get_thought(cid: str):
@@ -634,11 +949,11 @@ def create_app(node: WellspringNodeV2) -> FastAPI:
     @app.post("/pools/{pool_cid}/members")
     async def add_member(pool_cid: str, member_cid: str):
         node.add_pool_member(pool_cid, member_cid)
-        return {"pool": pool_cid, "members": list(node.pool_memberships.get(pool_cid, []))}
+        return {"pool": pool_cid, "members": list(node.storage.pool_members(pool_cid))}
 
     @app.get("/pools/{pool_cid}/members")
     async def list_members(pool_cid: str):
-        return {"pool": pool_cid, "members": list(node.pool_memberships.get(pool_cid, []))}
+        return {"pool": pool_cid, "members": list(node.storage.pool_members(pool_cid))}
 
     @app.post("/peering")
     async def establish_peering(request: PeeringRequest):
@@ -661,8 +976,19 @@ def create_app(node: WellspringNodeV2) -> FastAPI:
 
     @app.get("/provenance/{thought_cid}")
     async def get_provenance(thought_cid: str):
-        via = node.get_provenance(thought_cid)
-        return {"thought": thought_cid, "received_via": via}
+        provenance = node.get_provenance(thought_cid) or {"received_via": None}
+        return {"thought": thought_cid, **provenance}
+
+    @app.post("/provenance/rollup")
+    async def roll_up_provenance():
+        """Seal pending provenance entries now instead of waiting for a full batch."""
+        loop = asyncio.get_running_loop()
+
+        def roll_up():
+            with node.store_lock:
+                return node.roll_up_provenance()
+        batch = await loop.run_in_executor(node.verify_pool, roll_up)
+        return {"batch": batch.to_dict() if batch else None}
 
     @app.post("/peers")
     async def add_peer(url: str):
@@ -673,6 +999,12 @@ def create_app(node: WellspringNodeV2) -> FastAPI:
     async def list_peers():
         return {"peers": node.peers}
 
+    @app.get("/gossip")
+    async def gossip_metrics():
+        if gossip is None:
+            raise HTTPException(status_code=404, detail="Gossip not enabled")
+        return gossip.metrics()
+
     return app
 
 # ============================================================================
@@ -683,16 +1015,29 @@ def main():
     parser = argparse.ArgumentParser(description="Wellspring Node V2")
     parser.add_argument("--name", required=True, help="Node name")
     parser.add_argument("--port", type=int, required=True, help="HTTP port")
+    parser.add_argument("--db", help="SQLite path for persistent storage (default: in-memory)")
+    parser.add_argument("--cache", type=int, default=DEFAULT_CACHE_SIZE, help="Hot thoughts kept in memory")
+    parser.add_argument("--peer", action="append", default=[], help="Peer URL (repeatable)")
+    parser.add_argument("--gossip", action="store_true", help="Sync with peers in the background")
+    parser.add_argument("--fanout", type=int, default=GOSSIP_FANOUT, help="Peers each new local thought is pushed to")
     args = parser.parse_args()
 
-    node = WellspringNodeV2(args.name, args.port)
-    app = create_app(node)
+    node = WellspringNodeV2(args.name, args.port, open_storage(args.db, args.cache))
+    for url in args.peer:
+        node.add_peer(url)
+    gossip = None
+    if args.gossip:
+        gossip = GossipScheduler(node, HttpPeerClient(), fanout=args.fanout, executor=node.verify_pool)
+    app = create_app(node, gossip)
 
     print(f"Starting Wellspring node V2: {node.name}")
     print(f"Identity CID: {node.cid}")
     print(f"Endpoint: http://localhost:{args.port}")
 
-    uvicorn.run(app, host="0.0.0.0", port=args.port, log_level="warning")
+    try:
+        uvicorn.run(app, host="0.0.0.0", port=args.port, log_level="warning")
+    finally:
+        node.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+WellspringNodeV2 input-handling test.
+
+Runs an in-process node (memory storage, FastAPI TestClient) and checks
+what peers can send it:
+  - /sync and /sync/stream answer 400 for bloom_bits the hex can't back,
+    non-positive bloom_bits, bloom_hashes outside 1..MAX_HASHES and bad hex
+  - a thought SQLite can't store (visibility as a list) is rejected on its
+    own, and the rest of its batch is kept
+  - when a batch's transaction rolls back anyway, the bloom, verified
+    count and key history forget the thoughts it had stored, and the
+    resent batch is accepted
+  - a thought signed with a rotated-in key that arrives a batch before
+    its rotation waits in the parking lot and is stored with the rotation
+
+Usage:
+    python wellspring_node_v2_test.py
+"""
+
+import tempfile
+import warnings
+from pathlib import Path
+from typing import List
+
+warnings.simplefilter("ignore")   # starlette's TestClient deprecation notice
+
+from fastapi.testclient import TestClient
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from wellspring_bloom import MAX_HASHES
+from wellspring_node_v2 import SignedThought, WellspringNodeV2, create_app, pubkey_to_hex
+from wellspring_storage import open_storage
+
+
+def signed(author: WellspringNodeV2, content: dict, **fields) -> dict:
+    thought = SignedThought(type="basic", content=content, created_by=author.cid, **fields)
+    thought.sign(author.private_key)
+    return thought.to_dict()
+
+
+def check_bloom_params() -> List[str]:
+    node = WellspringNodeV2("test-node", 0)
+    client = TestClient(create_app(node))
+    good = node.get_bloom_payload()
+    hex_bits = len(good["bloom_hex"]) * 4
+    bad = [
+        {"bloom_bits": 10 ** 12},
+        {"bloom_bits": hex_bits + 8},
+        {"bloom_bits": -8},
+        {"bloom_bits": 0},
+        {"bloom_hashes": 10 ** 9},
+        {"bloom_hashes": MAX_HASHES + 1},
+        {"bloom_hashes": 0},
+        {"bloom_hex": "zz"},
+    ]
+    errors = []
+    for path in ("/sync", "/sync/stream"):
+        response = client.post(path, json={**good, "sender_cid": "cid:peer"})
+        if response.status_code != 200:
+            errors.append(f"{path}: valid filter got {response.status_code}")
+        for fields in bad:
+            response = client.post(path, json={**good, "sender_cid": "cid:peer", **fields})
+            if response.status_code != 400:
+                errors.append(f"{path} {fields}: got {response.status_code}, expected 400")
+    return errors
+
+
+def check_rolled_back_batch() -> List[str]:
+    errors = []
+    node = WellspringNodeV2("test-node", 0, open_storage(str(Path(tempfile.mkdtemp()) / "node.db")))
+    author = WellspringNodeV2("author", 0)
+    identity = author.identity_thought.to_dict()
+    kept = signed(author, {"text": "kept"})
+    pooled = signed(author, {"text": "bad row"}, visibility=["pool:x"])
+
+    node.receive_batch([identity, kept, pooled], "cid:peer")
+    if kept["cid"] not in node.thoughts or pooled["cid"] in node.thoughts:
+        errors.append("malformed row: batch not kept without the bad thought")
+    if not node.bloom.maybe_contains(kept["cid"]) or node.rejected_count != 1:
+        errors.append("malformed row: bloom or rejected count wrong")
+
+    # Fail the transaction after a valid thought and a rotation were stored
+    lost = signed(author, {"text": "rolled back"})
+    new_key = Ed25519PrivateKey.generate()
+    rotation = signed(author, {"rotation": {"new_pubkey": pubkey_to_hex(new_key.public_key())}})
+    author.private_key = new_key
+    failing = signed(author, {"text": "store fails"})
+    batch = [lost, rotation, failing]
+    verified = node.verified_count
+    index_thought = node.storage.index_thought
+
+    def fail_on(cid, buckets):
+        if cid == failing["cid"]:
+            raise RuntimeError("disk full")
+        index_thought(cid, buckets)
+
+    node.storage.index_thought = fail_on
+    try:
+        node.receive_batch(batch, "cid:peer")
+        errors.append("rollback: failing batch did not raise")
+    except RuntimeError:
+        pass
+    node.storage.index_thought = index_thought
+    for thought in batch:
+        if thought["cid"] in node.thoughts:
+            errors.append(f"rollback: {thought['content']} still stored")
+        if node.bloom.maybe_contains(thought["cid"]):
+            errors.append(f"rollback: {thought['content']} still in the bloom")
+    if node.verified_count != verified:
+        errors.append(f"rollback: verified_count {node.verified_count}, expected {verified}")
+    if len(node.keys.spans(author.cid)) > 1:
+        errors.append("rollback: rotation still in the key history")
+
+    result = node.receive_batch(batch, "cid:peer")
+    if result["new"] != len(batch) or not all(node.bloom.maybe_contains(t["cid"]) for t in batch):
+        errors.append(f"rollback: resent batch not accepted: {result}")
+    return errors
+
+
+def check_rotation_in_later_batch() -> List[str]:
+    errors = []
+    node = WellspringNodeV2("test-node", 0)
+    author = WellspringNodeV2("author", 0)
+    rotation = author.rotate_key().to_dict()
+    rekeyed = author.create_thought("basic", {"text": "signed with the new key"}).to_dict()
+
+    first = node.receive_batch([author.identity_thought.to_dict(), rekeyed], "cid:peer")
+    if first["parked"] != 1 or first["rejected"] or rekeyed["cid"] in node.thoughts:
+        errors.append(f"first batch: expected the new-key thought parked, got {first}")
+    second = node.receive_batch([rotation], "cid:peer")
+    if second["new"] != 2 or rekeyed["cid"] not in node.thoughts:
+        errors.append(f"second batch: expected rotation and parked thought stored, got {second}")
+    if node.rejected_count or len(node.receiver.parking):
+        errors.append(f"{node.rejected_count} rejected, {len(node.receiver.parking)} still parked")
+    return errors
+
+
+def main():
+    print("=" * 70)
+    print("WellspringNodeV2 input handling")
+    print("=" * 70)
+
+    failed = 0
+    for label, check in (("bloom parameters", check_bloom_params),
+                         ("rolled-back batch", check_rolled_back_batch),
+                         ("rotation in a later batch", check_rotation_in_later_batch)):
+        errors = check()
+        print(f"  {'✓' if not errors else '✗'} {label}: {len(errors)} failures")
+        for error in errors:
+            print(f"      {error}")
+        failed += len(errors)
+
+    assert not failed, f"{failed} checks failed"
+    print("\n  Malformed peer input is rejected.")
+
+
+if __name__ == "__main__":
+    main()
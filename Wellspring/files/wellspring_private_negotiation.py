@@ -89,7 +89,8 @@ class AdvancedNetworkSimulator:
 
         sync_resp = requests.post(
             f"{src_url}/sync",
-            json={"bloom_hex": bloom["bloom_hex"], "sender_cid": src_id["cid"]}
+            json={"bloom_hex": bloom["bloom_hex"], "bloom_bits": bloom["bloom_bits"],
+                  "bloom_hashes": bloom["bloom_hashes"], "sender_cid": src_id["cid"]}
         )
         sync_data = sync_resp.json()
 
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Dependency-ordered receive for the HTTP sync nodes.
+
+A received batch is sorted topologically over its in-batch edges (signer
+identity -> thought, `because` target -> thought), then stored in that
+order. A thought whose signer identity we don't hold yet is not verified
+at all: it waits in a ParkingLot keyed by that signer, and is released
+the moment the identity is stored, in this batch or a later sync, or its
+key is learned some other way (release_signer). A thought whose signer is
+known but whose signature fails under the key valid at its created_at
+may be signed with a rotated-in key whose rotation hasn't arrived yet.
+The node's store says so by returning None, and the thought is parked
+under its signer until a thought that changes the signer's keys is
+stored (rekeyed), then verified again.
+
+`because` edges only order the batch. They never park a thought, since
+a cited thought may be one the sender is not allowed to share with us.
+"""
+
+import heapq
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+PARKING_MAX = 10_000      # Parked thoughts kept; the oldest go first
+PARKING_TTL = 3600.0      # Seconds a thought waits for its signer
+
+# ============================================================================
+# ORDERING
+# ============================================================================
+
+def signer_of(thought: dict) -> Optional[str]:
+    """Identity CID whose pubkey verifies this thought (None: self-signed)."""
+    if thought["type"] == "identity" and thought["created_by"] == "GENESIS":
+        return None
+    return thought["created_by"]
+
+
+def dependency_order(thoughts: List[dict]) -> List[dict]:
+    """
+    Topological order over edges within the batch; otherwise identities
+    first, then by created_at. Duplicates are dropped. Anything left in a
+    cycle (only possible for forged CIDs) goes last and fails verification.
+    """
+    by_cid: Dict[str, dict] = {}
+    for thought in thoughts:
+        by_cid.setdefault(thought["cid"], thought)
+
+    dependents: Dict[str, List[str]] = {cid: [] for cid in by_cid}
+    pending: Dict[str, int] = {}
+    for cid, thought in by_cid.items():
+        deps = set(thought.get("because") or [])
+        signer = signer_of(thought)
+        if signer:
+            deps.add(signer)
+        deps = [d for d in deps if d in by_cid and d != cid]
+        pending[cid] = len(deps)
+        for dep in deps:
+            dependents[dep].append(cid)
+
+    def key(cid: str):
+        thought = by_cid[cid]
+        return (0 if signer_of(thought) is None else 1, thought.get("created_at", ""), cid)
+
+    ready = [key(cid) for cid, n in pending.items() if n == 0]
+    heapq.heapify(ready)
+    ordered = []
+    while ready:
+        cid = heapq.heappop(ready)[-1]
+        ordered.append(by_cid[cid])
+        for dependent in dependents[cid]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                heapq.heappush(ready, key(dependent))
+
+    if len(ordered) < len(by_cid):
+        done = {t["cid"] for t in ordered}
+        ordered.extend(t for cid, t in by_cid.items() if cid not in done)
+    return ordered
+
+# ============================================================================
+# PARKING LOT
+# ============================================================================
+
+class ParkingLot:
+    """Thoughts waiting for their signer's identity, bounded by size and age."""
+
+    def __init__(self, max_size: int = PARKING_MAX, ttl: float = PARKING_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        # cid -> (thought, signer, sender_cid, parked_at), oldest first
+        self._entries: "OrderedDict[str, Tuple[dict, str, Optional[str], float]]" = OrderedDict()
+        self._waiting: Dict[str, Set[str]] = {}   # signer -> parked cids
+        self.parked = 0
+        self.released = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self._entries
+
+    def _drop(self, cid: str):
+        _, signer, _, _ = self._entries.pop(cid)
+        waiting = self._waiting[signer]
+        waiting.discard(cid)
+        if not waiting:
+            del self._waiting[signer]
+
+    def park(self, thought: dict, signer: str, sender_cid: Optional[str] = None) -> bool:
+        """Park a thought until `signer` is known. False if already parked."""
+        cid = thought["cid"]
+        if cid in self._entries:
+            return False
+        while len(self._entries) >= self.max_size:
+            self._drop(next(iter(self._entries)))
+            self.evicted += 1
+        self._entries[cid] = (thought, signer, sender_cid, self.clock())
+        self._waiting.setdefault(signer, set()).add(cid)
+        self.parked += 1
+        return True
+
+    def release(self, signer: str) -> List[Tuple[dict, Optional[str]]]:
+        """Remove and return (thought, sender_cid) for everything waiting on signer."""
+        released = []
+        for cid in sorted(self._waiting.get(signer, ()), key=lambda c: self._entries[c][3]):
+            thought, _, sender_cid, _ = self._entries[cid]
+            released.append((thought, sender_cid))
+            self._drop(cid)
+        self.released += len(released)
+        return released
+
+    def expire(self) -> int:
+        """Drop thoughts parked longer than ttl. Returns how many."""
+        cutoff = self.clock() - self.ttl
+        count = 0
+        while self._entries:
+            cid, (_, _, _, parked_at) = next(iter(self._entries.items()))
+            if parked_at > cutoff:
+                break
+            self._drop(cid)
+            count += 1
+        self.expired += count
+        return count
+
+    def waiting_on(self) -> List[str]:
+        return sorted(self._waiting)
+
+    def waiting_for(self, signer: str) -> int:
+        """Thoughts parked on signer."""
+        return len(self._waiting.get(signer, ()))
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "signers": len(self._waiting),
+            "parked": self.parked,
+            "released": self.released,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+class ReceivePipeline:
+    """
+    Orders, parks and stores received thoughts for a node.
+
+    store(thought) verifies and stores, returning True if new, None if
+    its signer's key at created_at may still arrive;
+    has_thought(cid) and has_signer(cid) query the node;
+    on_new(thought, sender_cid) runs for each stored thought;
+    rekeyed(thought) says whether a stored thought changed its signer's keys.
+    """
+
+    def __init__(self, store: Callable[[dict], Optional[bool]], has_thought: Callable[[str], bool],
+                 has_signer: Callable[[str], bool],
+                 on_new: Callable[[dict, Optional[str]], None] = lambda t, s: None,
+                 parking: Optional[ParkingLot] = None,
+                 rekeyed: Callable[[dict], bool] = lambda t: False):
+        self.store = store
+        self.has_thought = has_thought
+        self.has_signer = has_signer
+        self.on_new = on_new
+        self.parking = parking or ParkingLot()
+        self.rekeyed = rekeyed
+
+    def receive(self, thoughts: List[dict], sender_cid: Optional[str] = None) -> dict:
+        """
+        Store what can be verified now, park the rest. Thoughts parked
+        earlier and released by this batch count towards "new".
+        """
+        self.parking.expire()
+        result = {"received": len(thoughts), "new": 0, "parked": 0, "rejected": 0}
+        waiting: Set[str] = set()
+        resolved: Set[str] = set()
+        self._process([(t, sender_cid) for t in dependency_order(thoughts)], result, waiting, resolved)
+        result["waiting_on"] = sorted(waiting)      # Signers parked for in this batch
+        result["resolved"] = sorted(resolved)       # Signers whose parked thoughts it released
+        return result
+
+    def release_signer(self, signer: str) -> dict:
+        """A signer's key was learned outside a batch: store what was parked on it."""
+        result = {"received": 0, "new": 0, "parked": 0, "rejected": 0}
+        waiting: Set[str] = set()
+        resolved: Set[str] = set()
+        self._release(signer, result, waiting, resolved)
+        result["waiting_on"] = sorted(waiting)
+        result["resolved"] = sorted(resolved)
+        return result
+
+    def _release(self, signer: str, result: dict, waiting: Set[str], resolved: Set[str]):
+        released = self.parking.release(signer)
+        if released:
+            waiting.discard(signer)
+            resolved.add(signer)
+            ordered = dependency_order([t for t, _ in released])
+            senders = {t["cid"]: s for t, s in released}
+            self._process([(t, senders[t["cid"]]) for t in ordered], result, waiting, resolved)
+
+    def _process(self, queue: Iterable[Tuple[dict, Optional[str]]], result: dict,
+                 waiting: Set[str], resolved: Set[str]):
+        for thought, sender_cid in queue:
+            cid = thought["cid"]
+            if self.has_thought(cid) or cid in self.parking:
+                continue
+
+            signer = signer_of(thought)
+            if signer and not self.has_signer(signer):
+                self.parking.park(thought, signer, sender_cid)
+                result["parked"] += 1
+                waiting.add(signer)
+                continue
+
+            stored = self.store(thought)
+            if stored is None:
+                self.parking.park(thought, signer, sender_cid)
+                result["parked"] += 1
+                waiting.add(signer)
+                continue
+            if not stored:
+                result["rejected"] += 1
+                continue
+            result["new"] += 1
+            self.on_new(thought, sender_cid)
+
+            if signer is None:
+                self._release(cid, result, waiting, resolved)
+            elif self.rekeyed(thought):
+                self._release(signer, result, waiting, resolved)
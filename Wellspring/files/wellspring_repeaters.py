@@ -9,7 +9,7 @@ import hashlib
 import numpy as np
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Tuple
+from typing import List, Optional, Tuple
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
 from cryptography.hazmat.primitives import serialization
 import base64
@@ -17,6 +17,8 @@ import base64
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from wellspring_trust import TrustEngine, RepeaterIndex
+
 # ============================================================================
 # CRYPTO UTILITIES
 # ============================================================================
@@ -123,32 +125,20 @@ class CryptoIdentity:
 # TRUST GRAPH WITH REPEATERS
 # ============================================================================
 
-class TrustGraphWithRepeaters:
+class TrustGraphWithRepeaters(TrustEngine):
     """Trust computation that respects repeater designations."""
 
     def __init__(self):
-        self.edges: Dict[str, Dict[str, float]] = {}  # from -> {to -> weight}
-        self.repeaters: Dict[str, Dict[str, List[str]]] = {}  # designator -> {repeater_cid -> [domains]}
-        self.cache: Dict[Tuple[str, str, bool], float] = {}
-
-    def add_edge(self, from_cid: str, to_cid: str, weight: float):
-        if from_cid not in self.edges:
-            self.edges[from_cid] = {}
-        self.edges[from_cid][to_cid] = weight
-        self.cache.clear()
+        super().__init__(max_hops=10)
+        self.repeaters = RepeaterIndex(self)
 
     def designate_repeater(self, designator_cid: str, repeater_cid: str, domains: List[str]):
         """Mark an identity as a repeater (trust anchor) for specific domains."""
-        if designator_cid not in self.repeaters:
-            self.repeaters[designator_cid] = {}
-        self.repeaters[designator_cid][repeater_cid] = domains
+        self.repeaters.designate(designator_cid, repeater_cid, domains)
 
     def compute_trust(self, from_cid: str, to_cid: str,
                       use_repeaters: bool = True,
-                      domain: str = None,
-                      visited: Set[str] = None,
-                      depth: int = 0,
-                      decay: float = 0.8) -> Tuple[float, List[str]]:
+                      domain: str = None) -> Tuple[float, List[str]]:
         """
         Compute trust with optional repeater shortcuts.
         Returns (trust_score, path_description).
@@ -156,103 +146,18 @@ class TrustGraphWithRepeaters:
         if from_cid == to_cid:
             return 1.0, ["self"]
 
-        cache_key = (from_cid, to_cid, use_repeaters)
-        if cache_key in self.cache:
-            return self.cache[cache_key], ["cached"]
-
-        if visited is None:
-            visited = set()
-
-        if from_cid in visited or depth > 10:
-            return 0.0, ["cycle/depth limit"]
-
-        visited.add(from_cid)
-
-        # Check for repeater shortcuts first
-        if use_repeaters and from_cid in self.repeaters:
-            for repeater_cid, domains in self.repeaters[from_cid].items():
-                if domain is None or domain in domains or "*" in domains:
-                    # My trust in the repeater (full transitive, but without repeater recursion)
-                    my_trust_in_repeater, _ = self.compute_trust(
-                        from_cid, repeater_cid,
-                        use_repeaters=False,  # Don't use repeaters to reach repeater
-                        visited=set(),
-                        depth=0,
-                        decay=decay
-                    )
-                    if my_trust_in_repeater > 0:
-                        # Repeater's trust in target (RESETS chain - no decay from me to repeater)
-                        repeater_trust, _ = self.compute_trust(
-                            repeater_cid, to_cid,
-                            use_repeaters=False,  # Don't recurse repeaters
-                            visited=set(),  # Fresh visited set
-                            depth=0,  # Reset depth
-                            decay=decay
-                        )
-                        if repeater_trust > 0:
-                            # KEY: No decay multiplication between me→repeater and repeater→target
-                            # Just: my_trust_in_repeater × repeater's_trust_in_target
-                            final = my_trust_in_repeater * repeater_trust
-                            path = [f"via repeater {repeater_cid[:12]} (trust={my_trust_in_repeater:.3f})"]
-                            self.cache[cache_key] = final
-                            return final, path
-
-        # Standard transitive trust with decay
-        if from_cid not in self.edges:
-            return 0.0, ["no edges"]
-
-        # Direct edge?
-        if to_cid in self.edges[from_cid]:
-            trust = self.edges[from_cid][to_cid]
-            self.cache[cache_key] = trust
-            return trust, ["direct"]
-
-        # Transitive
-        best_trust = 0.0
-        best_path = ["no path"]
-
-        for intermediate, weight in self.edges[from_cid].items():
-            if weight > 0 and intermediate not in visited:
-                transitive, sub_path = self.compute_trust(
-                    intermediate, to_cid,
-                    use_repeaters=use_repeaters,
-                    domain=domain,
-                    visited=visited.copy(),
-                    depth=depth + 1,
-                    decay=decay
-                )
-                path_trust = weight * transitive * decay
-                if path_trust > best_trust:
-                    best_trust = path_trust
-                    best_path = [f"{intermediate[:12]}→"] + sub_path
-
-        self.cache[cache_key] = best_trust
-        return best_trust, best_path
-
-    def _direct_or_short_path(self, from_cid: str, to_cid: str, visited: Set[str], max_depth: int) -> float:
-        """Quick check for direct or very short path (for repeater reachability)."""
-        if from_cid == to_cid:
-            return 1.0
-        if max_depth <= 0:
-            return 0.0
-        if from_cid in visited:
-            return 0.0
-
-        visited.add(from_cid)
+        trust, path = self.best_path(from_cid, to_cid)
+        description = [f"{cid[:12]}→" for cid in path[1:-1]] + ["direct"] if path else ["no path"]
 
-        if from_cid not in self.edges:
-            return 0.0
+        if use_repeaters:
+            # KEY: No decay multiplication between me→repeater and repeater→target
+            # Just: my_trust_in_repeater × repeater's_trust_in_target
+            final, repeater_cid = self.repeaters.shortcut(from_cid, to_cid, domain)
+            if final > trust:
+                trust = final
+                description = [f"via repeater {repeater_cid[:12]} (trust={self.trust(from_cid, repeater_cid):.3f})"]
 
-        if to_cid in self.edges[from_cid]:
-            return self.edges[from_cid][to_cid]
-
-        best = 0.0
-        for intermediate, weight in self.edges[from_cid].items():
-            if weight > 0:
-                sub = self._direct_or_short_path(intermediate, to_cid, visited.copy(), max_depth - 1)
-                best = max(best, weight * sub * 0.8)
-
-        return best
+        return trust, description
 
 # ============================================================================
 # MAIN TEST
@@ -477,8 +382,6 @@ def main():
     print("PHASE 6: Trust computation WITH repeaters")
     print("=" * 70)
 
-    graph.cache.clear()  # Clear cache to recompute
-
     print("\n  Computing trust to Dr. Chen (legitimate author):")
     print("  " + "-" * 50)
 
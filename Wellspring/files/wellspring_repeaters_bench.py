@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Repeater trust benchmark: RepeaterIndex vs the recursive compute_trust it replaced.
+
+Rebuilds the dogfood 018 scenario (wellspring_repeaters.py): publishers,
+authors, domain experts and a chain of users who designate Prof Climate as
+their climate repeater. --chain extends the user chain past Dave, and
+--scale adds that many more publishers, each with its own authors, trusted
+by both experts. Each user
+asks for trust in every identity in the "climate" and "physics" domains,
+and with no domain.
+
+  legacy  the old TrustGraphWithRepeaters.compute_trust: recursion with a
+          fresh visited set per repeater leg and visited.copy() per edge,
+          cached by (from, to, use_repeaters) without the domain
+  index   TrustEngine.best_path plus RepeaterIndex.shortcut, cached per
+          (designator, domain) and graph epoch
+
+Correctness lists the answers that differ and why. Speed times the full
+query set with every cache dropped, and again warm.
+
+Usage:
+    python wellspring_repeaters_bench.py [--chain 8] [--scale 0] [--rounds 20]
+"""
+
+import argparse
+import time
+from typing import Dict, List, Set, Tuple
+
+from wellspring_trust import TrustEngine, RepeaterIndex
+
+DOMAINS = ["climate", "physics", None]
+
+# ============================================================================
+# LEGACY (as it was in wellspring_repeaters.py)
+# ============================================================================
+
+class LegacyRepeaterGraph:
+    def __init__(self):
+        self.edges: Dict[str, Dict[str, float]] = {}
+        self.repeaters: Dict[str, Dict[str, List[str]]] = {}
+        self.cache: Dict[Tuple[str, str, bool], float] = {}
+
+    def add_edge(self, from_cid: str, to_cid: str, weight: float):
+        self.edges.setdefault(from_cid, {})[to_cid] = weight
+        self.cache.clear()
+
+    def designate_repeater(self, designator_cid: str, repeater_cid: str, domains: List[str]):
+        self.repeaters.setdefault(designator_cid, {})[repeater_cid] = domains
+
+    def compute_trust(self, from_cid: str, to_cid: str, use_repeaters: bool = True, domain: str = None,
+                      visited: Set[str] = None, depth: int = 0, decay: float = 0.8) -> float:
+        if from_cid == to_cid:
+            return 1.0
+        cache_key = (from_cid, to_cid, use_repeaters)
+        if cache_key in self.cache:
+            return self.cache[cache_key]
+        if visited is None:
+            visited = set()
+        if from_cid in visited or depth > 10:
+            return 0.0
+        visited.add(from_cid)
+
+        if use_repeaters and from_cid in self.repeaters:
+            for repeater_cid, domains in self.repeaters[from_cid].items():
+                if domain is None or domain in domains or "*" in domains:
+                    mine = self.compute_trust(from_cid, repeater_cid, False, None, set(), 0, decay)
+                    if mine > 0:
+                        theirs = self.compute_trust(repeater_cid, to_cid, False, None, set(), 0, decay)
+                        if theirs > 0:
+                            self.cache[cache_key] = mine * theirs
+                            return mine * theirs
+
+        if from_cid not in self.edges:
+            return 0.0
+        if to_cid in self.edges[from_cid]:
+            self.cache[cache_key] = self.edges[from_cid][to_cid]
+            return self.edges[from_cid][to_cid]
+
+        best = 0.0
+        for intermediate, weight in self.edges[from_cid].items():
+            if weight > 0 and intermediate not in visited:
+                transitive = self.compute_trust(intermediate, to_cid, use_repeaters, domain,
+                                                visited.copy(), depth + 1, decay)
+                best = max(best, weight * transitive * decay)
+        self.cache[cache_key] = best
+        return best
+
+# ============================================================================
+# INDEXED
+# ============================================================================
+
+class IndexedRepeaterGraph(TrustEngine):
+    def __init__(self):
+        super().__init__(max_hops=10)
+        self.repeaters = RepeaterIndex(self)
+
+    def designate_repeater(self, designator_cid: str, repeater_cid: str, domains: List[str]):
+        self.repeaters.designate(designator_cid, repeater_cid, domains)
+
+    def compute_trust(self, from_cid: str, to_cid: str, use_repeaters: bool = True, domain: str = None) -> float:
+        trust = self.trust(from_cid, to_cid)
+        if use_repeaters:
+            trust = max(trust, self.repeaters.shortcut(from_cid, to_cid, domain)[0])
+        return trust
+
+# ============================================================================
+# SCENARIO
+# ============================================================================
+
+def build(graph, chain: int, scale: int) -> List[str]:
+    """Dogfood 018's graph and designations; returns the users."""
+    edges = [
+        ("nature", "dr_chen", 1.0), ("nature", "dr_patel", 1.0),
+        ("new_scientist", "dr_chen", 0.9), ("new_scientist", "dr_patel", 0.9),
+        ("crystal_woo", "mystic_moon", 1.0),
+        ("prof_climate", "nature", 1.0), ("prof_climate", "new_scientist", 0.7),
+        ("prof_climate", "crystal_woo", 0.0),
+        ("prof_physics", "nature", 1.0), ("prof_physics", "new_scientist", 0.8),
+        ("prof_physics", "crystal_woo", 0.0),
+        ("alice", "prof_climate", 0.9), ("alice", "prof_physics", 0.8),
+        ("bob", "alice", 0.8), ("carol", "bob", 0.7), ("dave", "carol", 0.6),
+        ("dave", "crystal_woo", 0.8),
+    ]
+    for i in range(scale):
+        edges += [(f"pub{i}", f"author{i}_{j}", 0.9) for j in range(4)]
+        edges += [("prof_climate", f"pub{i}", 0.8), ("prof_physics", f"pub{i}", 0.7)]
+    users = ["alice", "bob", "carol", "dave"] + [f"user{i}" for i in range(chain)]
+    for i in range(4, len(users)):
+        edges.append((users[i], users[i - 1], 0.9))
+    for src, dst, weight in edges:
+        graph.add_edge(src, dst, weight)
+    for user in users:
+        graph.designate_repeater(user, "prof_climate", ["climate", "environment"])
+    return users
+
+
+def queries(users: List[str], identities: List[str]) -> List[Tuple[str, str, str]]:
+    return [(user, target, domain) for user in users for target in identities for domain in DOMAINS]
+
+
+def run(graph, qs) -> List[float]:
+    return [graph.compute_trust(user, target, use_repeaters=True, domain=domain) for user, target, domain in qs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repeater trust benchmark")
+    parser.add_argument("--chain", type=int, default=8, help="Extra users past Dave")
+    parser.add_argument("--scale", type=int, default=0, help="Extra publishers with 4 authors each")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    legacy, indexed = LegacyRepeaterGraph(), IndexedRepeaterGraph()
+    users = build(legacy, args.chain, args.scale)
+    build(indexed, args.chain, args.scale)
+    identities = sorted(set(legacy.edges) | {t for out in legacy.edges.values() for t in out})
+    qs = queries(users, identities)
+
+    print("=" * 78)
+    print(f"Repeater trust: {len(users)} users × {len(identities)} targets × {len(DOMAINS)} domains "
+          f"= {len(qs)} queries")
+    print("=" * 78)
+
+    # Correctness: the legacy answers in query order, so its domain-blind cache shows
+    old, new = run(legacy, qs), run(indexed, qs)
+    fresh = []
+    for user, target, domain in qs:
+        legacy.cache.clear()
+        fresh.append(legacy.compute_trust(user, target, use_repeaters=True, domain=domain))
+    differ = [(q, o, f, n) for q, o, f, n in zip(qs, old, fresh, new) if abs(o - n) > 1e-9]
+    stale = sum(1 for _, o, f, _ in differ if abs(o - f) > 1e-9)
+    print(f"\n  Agree: {len(qs) - len(differ)}/{len(qs)}")
+    print(f"  Differ: {len(differ)}  ({stale} from the legacy cache ignoring domain, "
+          f"{len(differ) - stale} from its depth > 10 check allowing 12 hops, or first repeater wins)")
+    for (user, target, domain), o, f, n in differ[:8]:
+        print(f"    {user:>8} → {target:<14} {str(domain):<8} legacy={o:.4f} (uncached {f:.4f})  index={n:.4f}")
+
+    timings = {}
+    for name, graph, reset in (("legacy", legacy, legacy.cache.clear), ("index", indexed, indexed.invalidate)):
+        cold = warm = 0.0
+        for _ in range(args.rounds):
+            reset()
+            start = time.perf_counter()
+            run(graph, qs)
+            cold += time.perf_counter() - start
+            start = time.perf_counter()
+            run(graph, qs)
+            warm += time.perf_counter() - start
+        timings[name] = (cold / args.rounds, warm / args.rounds)
+
+    print(f"\n  {'':>8} {'cold round':>12} {'warm round':>12}")
+    for name, (cold, warm) in timings.items():
+        print(f"  {name:>8} {cold * 1000:>9.2f} ms {warm * 1000:>9.2f} ms")
+    print(f"  {'speedup':>8} {timings['legacy'][0] / timings['index'][0]:>11.1f}x "
+          f"{timings['legacy'][1] / timings['index'][1]:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,704 @@
+#!/usr/bin/env python3
+"""
+In-process network simulator for WellspringNodeV2.
+
+Runs hundreds to thousands of nodes as asyncio tasks against a virtual
+clock: tasks only ever wait on the clock, so the driver lets every task
+run until it blocks, then jumps time to the next scheduled wake-up. A run
+is reproducible for a given seed (scheduling, topology, latency, loss);
+node keys and timestamps are still fresh each run.
+
+The transport models per-node uplink bandwidth, one-way latency with
+jitter, and message loss (a lost request or reply costs the caller a
+timeout). Sync strategies are pluggable:
+
+    bloom       - pull: send our bloom, peer returns what it misses (/sync)
+    rbsr        - pull: range-based set reconciliation over sorted CIDs with
+                  XOR fingerprints, recursing only into mismatched ranges
+    gossip      - push: rumor mongering, each new thought pushed to `fanout`
+                  random peers
+    antientropy - wellspring_gossip.GossipScheduler on every node
+    roundrobin  - NetworkSimulator.sync_all_peers: every peering pair,
+                  both ways, round after round until one moves nothing
+
+Nodes can keep creating thoughts for --workload seconds after the start.
+Reports convergence time, bytes transferred and CPU time per node.
+
+Usage:
+    python wellspring_sim.py --nodes 200 --strategy bloom
+    python wellspring_sim.py --nodes 200 --compare
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import statistics
+import time
+from bisect import bisect_left
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from wellspring_bloom import BloomFilter
+from wellspring_gossip import GossipScheduler, PeerClient, cid_hash
+from wellspring_node_v2 import WellspringNodeV2, visibility_buckets, BUCKET_PUBLIC
+
+# ============================================================================
+# VIRTUAL CLOCK
+# ============================================================================
+
+class VirtualClock:
+    """Discrete-event time for asyncio tasks that only wait via sleep()."""
+
+    def __init__(self):
+        self.now = 0.0
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._live = 0
+        self._sleeping = 0
+
+    def sleep(self, delay: float) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (self.now + max(delay, 0.0), next(self._seq), fut))
+        self._sleeping += 1
+        return fut
+
+    def spawn(self, coro):
+        """Start a task. It must only block on sleep(), never on other tasks."""
+        async def run():
+            try:
+                await coro
+            finally:
+                self._live -= 1
+        self._live += 1
+        task = asyncio.get_running_loop().create_task(run())
+        self._tasks.append(task)
+        return task
+
+    async def _settle(self):
+        """Yield until every live task is blocked on the clock."""
+        while self._sleeping < self._live:
+            await asyncio.sleep(0)
+
+    async def run(self, until: float, stop: Callable[[], bool] = lambda: False):
+        """Advance time until `until` or until stop() holds between events."""
+        while True:
+            await self._settle()
+            if stop():
+                return
+            if not self._heap or self._heap[0][0] > until:
+                self.now = max(self.now, until)
+                return
+            self.now, _, fut = heapq.heappop(self._heap)
+            self._sleeping -= 1
+            if not fut.cancelled():
+                fut.set_result(None)
+
+    async def close(self):
+        """Cancel every task, re-raising the first one that failed."""
+        for task in self._tasks:
+            task.cancel()
+        results = await asyncio.gather(*self._tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, asyncio.CancelledError):
+                raise result
+
+
+# ============================================================================
+# TRANSPORT
+# ============================================================================
+
+@dataclass
+class LinkModel:
+    latency_s: float = 0.05
+    jitter_s: float = 0.01
+    bandwidth_bps: float = 10_000_000   # Per-node uplink
+    loss: float = 0.0
+    timeout_s: float = 2.0
+
+
+class SimTransport:
+    """Request/response delivery between simulated nodes."""
+
+    def __init__(self, clock: VirtualClock, link: LinkModel, rng: random.Random, n_nodes: int):
+        self.clock = clock
+        self.link = link
+        self.rng = rng
+        self.busy_until = [0.0] * n_nodes
+        self.bytes_sent = [0] * n_nodes
+        self.bytes_received = [0] * n_nodes
+        self.messages = 0
+        self.lost = 0
+
+    def _transmit(self, src: int, dst: int, size: int) -> Optional[float]:
+        """Delay until `size` bytes from src reach dst, or None if lost."""
+        self.messages += 1
+        self.bytes_sent[src] += size
+        start = max(self.clock.now, self.busy_until[src])
+        self.busy_until[src] = start + size * 8 / self.link.bandwidth_bps
+        if self.rng.random() < self.link.loss:
+            self.lost += 1
+            return None
+        self.bytes_received[dst] += size
+        jitter = self.rng.uniform(-self.link.jitter_s, self.link.jitter_s)
+        return self.busy_until[src] - self.clock.now + max(0.0, self.link.latency_s + jitter)
+
+    async def rpc(self, src: int, dst: int, request_size: int, handler: Callable[[], Tuple[object, int]]):
+        """Send a request, run handler at dst, return its result (None on loss)."""
+        delay = self._transmit(src, dst, request_size)
+        if delay is None:
+            await self.clock.sleep(self.link.timeout_s)
+            return None
+        await self.clock.sleep(delay)
+        result, response_size = handler()
+        delay = self._transmit(dst, src, response_size)
+        if delay is None:
+            await self.clock.sleep(self.link.timeout_s)
+            return None
+        await self.clock.sleep(delay)
+        return result
+
+
+def json_size(obj) -> int:
+    return len(json.dumps(obj, separators=(',', ':')))
+
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+@dataclass
+class SimConfig:
+    nodes: int = 100
+    degree: int = 4                 # Random links per node (plus a ring)
+    thoughts_per_node: int = 2
+    workload_s: float = 0.0         # Keep creating thoughts this long...
+    workload_rate: float = 0.0      # ...at this many per second, network-wide
+    interval_s: float = 1.0         # Mean time between a node's sync attempts
+    max_time_s: float = 600.0
+    idle_s: float = 0.0             # Keep running this long after convergence
+    seed: int = 1
+    link: LinkModel = field(default_factory=LinkModel)
+
+
+class NetworkSimulation:
+    def __init__(self, config: SimConfig, strategy: 'SyncStrategy'):
+        self.config = config
+        self.strategy = strategy
+        self.rng = random.Random(config.seed)
+        self.clock = VirtualClock()
+        self.transport = SimTransport(self.clock, config.link, self.rng, config.nodes)
+        self.cpu_s = [0.0] * config.nodes
+
+        self.nodes = [WellspringNodeV2(f"sim-{i}", 0) for i in range(config.nodes)]
+        self.neighbors = self._topology()
+        for i, node in enumerate(self.nodes):
+            for j in self.neighbors[i]:
+                node.add_peer(f"sim://{j}")
+
+        # Convergence target: every public thought created during the run,
+        # identities included. A thought's first sighting is its creation.
+        self.target: Set[str] = set()
+        self.held = [0] * config.nodes
+        self.missing = 0            # Sum over nodes of target thoughts not held
+        self.workload_done = config.workload_s <= 0
+        self.converged_s: Optional[float] = None
+        self.bytes_converged = 0
+        for i, node in enumerate(self.nodes):
+            node.store_listeners.append(lambda thought, i=i: self._on_store(i, thought))
+
+    def _topology(self) -> List[List[int]]:
+        n = self.config.nodes
+        links = [set() for _ in range(n)]
+        for i in range(n):
+            links[i].add((i + 1) % n)
+            links[(i + 1) % n].add(i)
+            for j in self.rng.sample(range(n), min(self.config.degree, n - 1)):
+                if j != i:
+                    links[i].add(j)
+                    links[j].add(i)
+        return [sorted(peers) for peers in links]
+
+    @contextmanager
+    def cpu(self, i: int):
+        start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.cpu_s[i] += time.thread_time() - start
+
+    def random_peer(self, i: int) -> int:
+        return self.rng.choice(self.neighbors[i])
+
+    def _on_store(self, i: int, thought: dict):
+        if BUCKET_PUBLIC not in visibility_buckets(thought):
+            return
+        if thought["cid"] not in self.target:
+            self.target.add(thought["cid"])
+            self.missing += len(self.nodes)
+        self.held[i] += 1
+        self.missing -= 1
+        self.strategy.on_new(self, i, thought)
+
+    def create(self, i: int, text: str):
+        with self.cpu(i):
+            self.nodes[i].create_thought("basic", {"text": text})
+
+    def _seed(self):
+        for i, node in enumerate(self.nodes):
+            self._on_store(i, node.identity_thought.to_dict())
+            for k in range(self.config.thoughts_per_node):
+                self.create(i, f"thought {k} from node {i}")
+
+    async def _workload(self):
+        k = 0
+        while True:
+            await self.clock.sleep(self.rng.expovariate(self.config.workload_rate))
+            if self.clock.now >= self.config.workload_s:
+                break
+            self.create(self.rng.randrange(len(self.nodes)), f"workload thought {k}")
+            k += 1
+        self.workload_done = True
+
+    def deliver(self, i: int, sender: int, thoughts: List[dict]) -> int:
+        """Store thoughts at node i; returns how many were new."""
+        with self.cpu(i):
+            return self.nodes[i].receive_batch(thoughts, self.nodes[sender].cid)["new"]
+
+    def converged(self) -> bool:
+        if self.workload_done and self.missing == 0:
+            if self.converged_s is None:
+                self.converged_s = self.clock.now
+            return True
+        return False
+
+    async def _run(self):
+        self._seed()
+        if not self.workload_done:
+            self.clock.spawn(self._workload())
+        self.strategy.start(self)
+        await self.clock.run(self.config.max_time_s, stop=self.converged)
+        self.bytes_converged = sum(self.transport.bytes_sent)
+        if self.converged_s is not None and self.config.idle_s > 0:
+            await self.clock.run(self.clock.now + self.config.idle_s)
+        await self.clock.close()
+
+    def run(self) -> dict:
+        wall = time.perf_counter()
+        asyncio.run(self._run())
+        return self.report(time.perf_counter() - wall)
+
+    def report(self, wall_s: float) -> dict:
+        n = self.config.nodes
+        total_bytes = self.bytes_converged
+        idle_bytes = sum(self.transport.bytes_sent) - total_bytes
+        return {
+            "strategy": self.strategy.name,
+            "nodes": n,
+            "thoughts": len(self.target),
+            "converged_nodes": sum(1 for h in self.held if h == len(self.target)),
+            "convergence_s": self.converged_s,
+            "coverage": sum(self.held) / (n * len(self.target)),
+            "bytes_total": total_bytes,
+            "idle_bytes_per_node_min": (idle_bytes / n / self.config.idle_s * 60
+                                        if self.config.idle_s and self.converged_s is not None else None),
+            "bytes_per_node": total_bytes / n,
+            "bytes_max_node": max(self.transport.bytes_sent[i] + self.transport.bytes_received[i] for i in range(n)),
+            "messages": self.transport.messages,
+            "lost": self.transport.lost,
+            "cpu_ms_per_node": statistics.mean(self.cpu_s) * 1000,
+            "cpu_ms_max_node": max(self.cpu_s) * 1000,
+            "sim_time_s": self.clock.now,
+            "wall_s": wall_s,
+        }
+
+
+# ============================================================================
+# SYNC STRATEGIES
+# ============================================================================
+
+class SyncStrategy:
+    name = ""
+
+    def start(self, sim: NetworkSimulation):
+        """Spawn the strategy's tasks; by default a tick() loop per node."""
+        for i in range(sim.config.nodes):
+            sim.clock.spawn(self._node_loop(sim, i))
+
+    async def _node_loop(self, sim: NetworkSimulation, i: int):
+        interval = sim.config.interval_s
+        await sim.clock.sleep(sim.rng.uniform(0, interval))
+        while True:
+            await self.tick(sim, i)
+            await sim.clock.sleep(interval * sim.rng.uniform(0.5, 1.5))
+
+    def on_new(self, sim: NetworkSimulation, i: int, thought: dict):
+        """A public thought was created at, or newly received by, node i."""
+
+    async def tick(self, sim: NetworkSimulation, i: int):
+        raise NotImplementedError
+
+
+async def bloom_sync(sim: NetworkSimulation, src: int, dst: int) -> int:
+    """dst pulls from src with its bloom. Returns new thoughts at dst."""
+    node, peer = sim.nodes[dst], sim.nodes[src]
+    with sim.cpu(dst):
+        payload = node.get_bloom_payload()
+
+    def handle():
+        with sim.cpu(src):
+            bloom = BloomFilter.from_payload(payload)
+            thoughts = list(peer.iter_missing_for_peer(bloom, node.cid))
+        return thoughts, json_size(thoughts)
+
+    thoughts = await sim.transport.rpc(dst, src, json_size(payload), handle)
+    return sim.deliver(dst, src, thoughts) if thoughts else 0
+
+
+class BloomSync(SyncStrategy):
+    """Pull: our bloom to a random peer, it returns thoughts we probably lack."""
+
+    name = "bloom"
+
+    async def tick(self, sim: NetworkSimulation, i: int):
+        await bloom_sync(sim, sim.random_peer(i), i)
+
+
+class RangeReconciliation(SyncStrategy):
+    """
+    Pull via range-based set reconciliation. Each round sends (range,
+    fingerprint, count) for mismatched ranges; the peer answers small
+    ranges with its CID list and splits large ones into `branch` subranges
+    with their fingerprints. Wanted thoughts are fetched in a final call.
+    """
+
+    name = "rbsr"
+
+    def __init__(self, branch: int = 16, leaf: int = 32):
+        self.branch = branch
+        self.leaf = leaf
+
+    @staticmethod
+    def _slice(cids: List[str], lo: str, hi: Optional[str]) -> List[str]:
+        start = bisect_left(cids, lo)
+        end = len(cids) if hi is None else bisect_left(cids, hi)
+        return cids[start:end]
+
+    @staticmethod
+    def _fingerprint(cids: List[str]) -> int:
+        fp = 0
+        for cid in cids:
+            fp ^= cid_hash(cid)
+        return fp
+
+    @staticmethod
+    def _shareable(sim: NetworkSimulation, j: int, i: int) -> List[str]:
+        """CIDs peer j may share with node i, sorted."""
+        peer = sim.nodes[j]
+        visible = peer._peer_visible_buckets(sim.nodes[i].cid)
+        cids = set()
+        for bucket in visible:
+            for page in peer.storage.bucket_pages(bucket):
+                cids.update(page)
+        return sorted(cids)
+
+    async def tick(self, sim: NetworkSimulation, i: int):
+        j = sim.random_peer(i)
+        node, peer = sim.nodes[i], sim.nodes[j]
+        with sim.cpu(i):
+            mine = sorted(node.thoughts)
+        ranges = [("", None)]
+        wanted: List[str] = []
+
+        while ranges:
+            with sim.cpu(i):
+                request = []
+                for lo, hi in ranges:
+                    part = self._slice(mine, lo, hi)
+                    request.append((lo, hi, self._fingerprint(part), len(part)))
+
+            def handle(request=request):
+                with sim.cpu(j):
+                    theirs = self._shareable(sim, j, i)
+                    reply = []
+                    for lo, hi, fp, count in request:
+                        part = self._slice(theirs, lo, hi)
+                        if count == len(part) and fp == self._fingerprint(part):
+                            continue
+                        if len(part) <= self.leaf:
+                            reply.append(("ids", part))
+                            continue
+                        step = -(-len(part) // self.branch)
+                        bounds = [part[k] for k in range(0, len(part), step)]
+                        bounds[0] = lo
+                        subs = []
+                        for b, sub_lo in enumerate(bounds):
+                            sub_hi = bounds[b + 1] if b + 1 < len(bounds) else hi
+                            sub = self._slice(part, sub_lo, sub_hi)
+                            subs.append((sub_lo, sub_hi, self._fingerprint(sub), len(sub)))
+                        reply.append(("split", subs))
+                return reply, json_size(reply)
+
+            reply = await sim.transport.rpc(i, j, json_size(request), handle)
+            if reply is None:
+                return
+
+            ranges = []
+            with sim.cpu(i):
+                for kind, body in reply:
+                    if kind == "ids":
+                        wanted.extend(cid for cid in body if cid not in node.thoughts)
+                        continue
+                    for lo, hi, fp, count in body:
+                        part = self._slice(mine, lo, hi)
+                        if count != len(part) or fp != self._fingerprint(part):
+                            ranges.append((lo, hi))
+
+        if not wanted:
+            return
+
+        def fetch():
+            with sim.cpu(j):
+                thoughts = [peer.thoughts[cid] for cid in wanted if cid in peer.thoughts]
+            return thoughts, json_size(thoughts)
+
+        thoughts = await sim.transport.rpc(i, j, json_size(wanted), fetch)
+        if thoughts:
+            sim.deliver(i, j, thoughts)
+
+
+class PushGossip(SyncStrategy):
+    """
+    Push: each node forwards every new public thought to `fanout` random
+    peers (one per tick), with signer identities attached. No pull, so
+    coverage is probabilistic.
+    """
+
+    name = "gossip"
+
+    def __init__(self, fanout: int = 3):
+        self.fanout = fanout
+        self.hot: Dict[int, Dict[str, int]] = {}
+
+    def on_new(self, sim: NetworkSimulation, i: int, thought: dict):
+        if "public" in visibility_buckets(thought):
+            self.hot.setdefault(i, {})[thought["cid"]] = self.fanout
+
+    async def tick(self, sim: NetworkSimulation, i: int):
+        hot = self.hot.get(i)
+        if not hot:
+            return
+        j = sim.random_peer(i)
+        node = sim.nodes[i]
+        with sim.cpu(i):
+            cids = list(hot)
+            for cid in cids:
+                hot[cid] -= 1
+                if hot[cid] <= 0:
+                    del hot[cid]
+            batch = [node.thoughts[cid] for cid in cids]
+            signers = {t["created_by"] for t in batch} - set(cids) - {"GENESIS"}
+            batch = [node.thoughts[c] for c in signers if c in node.thoughts] + batch
+
+        def handle():
+            sim.deliver(j, i, batch)
+            return True, 16
+
+        await sim.transport.rpc(i, j, json_size(batch), handle)
+
+
+class RoundRobin(SyncStrategy):
+    """
+    The subprocess simulator's sync_all_peers, repeated every interval:
+    bidirectional bloom sync of every peering pair in turn, rounds
+    continuing until one moves nothing.
+    """
+
+    name = "roundrobin"
+
+    def start(self, sim: NetworkSimulation):
+        sim.clock.spawn(self._driver(sim))
+
+    async def _driver(self, sim: NetworkSimulation):
+        pairs = [(a, b) for a in range(sim.config.nodes) for b in sim.neighbors[a] if a < b]
+        while True:
+            moved = 1
+            while moved:
+                moved = 0
+                for a, b in pairs:
+                    moved += await bloom_sync(sim, a, b)
+                    moved += await bloom_sync(sim, b, a)
+            await sim.clock.sleep(sim.config.interval_s)
+
+
+class SimPeerClient(PeerClient):
+    """wellspring_gossip.PeerClient over the simulated transport."""
+
+    def __init__(self, sim: NetworkSimulation, i: int):
+        self.sim = sim
+        self.i = i
+
+    @property
+    def bytes_sent(self):
+        return self.sim.transport.bytes_sent[self.i]
+
+    @property
+    def bytes_received(self):
+        return self.sim.transport.bytes_received[self.i]
+
+    async def _rpc(self, address: str, request_size: int, handler):
+        return await self.sim.transport.rpc(self.i, int(address.rsplit("/", 1)[1]), request_size, handler)
+
+    async def identity(self, address):
+        identity = self.sim.nodes[int(address.rsplit("/", 1)[1])].identity_thought.to_dict()
+        return await self._rpc(address, 64, lambda: (identity, json_size(identity)))
+
+    async def fingerprint(self, address, requester_cid):
+        j = int(address.rsplit("/", 1)[1])
+
+        def handle():
+            with self.sim.cpu(j):
+                return self.sim.nodes[j].fingerprint_for_peer(requester_cid), 48
+        return await self._rpc(address, 64 + len(requester_cid), handle)
+
+    async def pull(self, address, bloom_payload, requester_cid):
+        j = int(address.rsplit("/", 1)[1])
+
+        def handle():
+            with self.sim.cpu(j):
+                bloom = BloomFilter.from_payload(bloom_payload)
+                thoughts = list(self.sim.nodes[j].iter_missing_for_peer(bloom, requester_cid))
+            return thoughts, json_size(thoughts)
+        return await self._rpc(address, json_size(bloom_payload), handle)
+
+    async def push(self, address, thoughts, sender_cid):
+        j = int(address.rsplit("/", 1)[1])
+        return await self._rpc(address, json_size(thoughts),
+                               lambda: ({"new": self.sim.deliver(j, self.i, thoughts)}, 32))
+
+    async def fetch(self, address, cids):
+        j = int(address.rsplit("/", 1)[1])
+        peer = self.sim.nodes[j]
+
+        def handle():
+            with self.sim.cpu(j):
+                thoughts = [peer.thoughts[cid] for cid in cids if cid in peer.thoughts]
+            return thoughts, json_size(thoughts)
+        return await self._rpc(address, json_size(cids), handle)
+
+
+class SimExecutor(Executor):
+    """Runs a scheduler's offloaded work inline, charged to node i's CPU time."""
+
+    def __init__(self, sim: NetworkSimulation, i: int):
+        self.sim = sim
+        self.i = i
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        with self.sim.cpu(self.i):
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        return future
+
+
+class AntiEntropy(SyncStrategy):
+    """wellspring_gossip.GossipScheduler on every node."""
+
+    name = "antientropy"
+
+    def __init__(self, fanout: int = 3, max_interval: float = 30.0):
+        self.fanout = fanout
+        self.max_interval = max_interval
+
+    def start(self, sim: NetworkSimulation):
+        for i, node in enumerate(sim.nodes):
+            scheduler = GossipScheduler(
+                node, SimPeerClient(sim, i), fanout=self.fanout,
+                min_interval=sim.config.interval_s, max_interval=self.max_interval,
+                clock=sim.clock, rng=random.Random(sim.rng.random()), executor=SimExecutor(sim, i)
+            )
+            sim.clock.spawn(self._run(sim, scheduler))
+
+    async def _run(self, sim: NetworkSimulation, scheduler: GossipScheduler):
+        await sim.clock.sleep(sim.rng.uniform(0, sim.config.interval_s))
+        await scheduler.run()
+
+
+STRATEGIES = {
+    "bloom": BloomSync,
+    "rbsr": RangeReconciliation,
+    "gossip": PushGossip,
+    "antientropy": AntiEntropy,
+    "roundrobin": RoundRobin,
+}
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def print_report(r: dict):
+    conv = f"{r['convergence_s']:.1f}s" if r["convergence_s"] is not None else "—"
+    print(f"  {r['strategy']:<11} {r['nodes']:>6} {r['thoughts']:>8} {conv:>9} {r['coverage']:>8.1%} "
+          f"{r['bytes_per_node'] / 1024:>10.1f} {r['bytes_max_node'] / 1024:>10.1f} {r['messages']:>9} "
+          f"{r['lost']:>6} {r['cpu_ms_per_node']:>8.1f} {r['wall_s']:>7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process Wellspring network simulator")
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--degree", type=int, default=4)
+    parser.add_argument("--thoughts", type=int, default=2, help="Thoughts created per node")
+    parser.add_argument("--workload", type=float, default=0, help="Seconds to keep creating thoughts")
+    parser.add_argument("--rate", type=float, default=10, help="Thoughts per second during --workload")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="bloom")
+    parser.add_argument("--compare", action="store_true", help="Run every strategy")
+    parser.add_argument("--interval", type=float, default=1.0, help="Mean seconds between syncs")
+    parser.add_argument("--latency", type=float, default=50, help="One-way latency (ms)")
+    parser.add_argument("--jitter", type=float, default=10, help="Latency jitter (ms)")
+    parser.add_argument("--bandwidth", type=float, default=10, help="Uplink (Mbit/s)")
+    parser.add_argument("--loss", type=float, default=0.0, help="Message loss probability")
+    parser.add_argument("--max-time", type=float, default=600, help="Simulated seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    link = LinkModel(
+        latency_s=args.latency / 1000,
+        jitter_s=args.jitter / 1000,
+        bandwidth_bps=args.bandwidth * 1_000_000,
+        loss=args.loss
+    )
+    config = SimConfig(
+        nodes=args.nodes,
+        degree=args.degree,
+        thoughts_per_node=args.thoughts,
+        workload_s=args.workload,
+        workload_rate=args.rate,
+        interval_s=args.interval,
+        max_time_s=args.max_time,
+        seed=args.seed,
+        link=link
+    )
+
+    print("=" * 100)
+    print(f"Wellspring network simulation: {args.nodes} nodes, degree {args.degree}, "
+          f"{args.latency:.0f}±{args.jitter:.0f} ms, {args.bandwidth:g} Mbit/s, loss {args.loss:.1%}")
+    print("=" * 100)
+    print(f"  {'strategy':<11} {'nodes':>6} {'thoughts':>8} {'converge':>9} {'coverage':>8} "
+          f"{'KB/node':>10} {'KB max':>10} {'messages':>9} {'lost':>6} {'cpu ms':>8} {'wall s':>7}")
+
+    names = sorted(STRATEGIES) if args.compare else [args.strategy]
+    for name in names:
+        print_report(NetworkSimulation(config, STRATEGIES[name]()).run())
+
+
+if __name__ == "__main__":
+    main()
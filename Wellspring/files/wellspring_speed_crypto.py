@@ -10,12 +10,14 @@ import time
 import random
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, List, Optional
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
 from cryptography.hazmat.primitives import serialization
 from cryptography.exceptions import InvalidSignature
 import base64
 
+from wellspring_trust import TrustEngine
+
 # ============================================================================
 # CRYPTO UTILITIES
 # ============================================================================
@@ -153,57 +155,11 @@ def verify_signature(thought: dict, pubkey_registry: Dict[str, str]) -> bool:
 # TRUST GRAPH
 # ============================================================================
 
-class TrustGraph:
-    def __init__(self):
-        self.edges: Dict[str, Dict[str, float]] = {}  # from -> {to -> weight}
-        self.cache: Dict[Tuple[str, str], float] = {}
-        self.cache_hits = 0
-        self.cache_misses = 0
-
-    def add_edge(self, from_cid: str, to_cid: str, weight: float):
-        if from_cid not in self.edges:
-            self.edges[from_cid] = {}
-        self.edges[from_cid][to_cid] = weight
-        self.cache.clear()  # Invalidate on change
-
-    def compute_trust(self, from_cid: str, to_cid: str, visited: Set[str] = None, depth: int = 0) -> float:
-        if from_cid == to_cid:
-            return 1.0
-
-        cache_key = (from_cid, to_cid)
-        if cache_key in self.cache:
-            self.cache_hits += 1
-            return self.cache[cache_key]
-        self.cache_misses += 1
-
-        if visited is None:
-            visited = set()
-
-        if from_cid in visited or depth > 5:
-            return 0.0
-
-        visited.add(from_cid)
-
-        # Direct edge?
-        if from_cid in self.edges and to_cid in self.edges[from_cid]:
-            trust = self.edges[from_cid][to_cid]
-            self.cache[cache_key] = trust
-            return trust
-
-        # Transitive
-        if from_cid not in self.edges:
-            self.cache[cache_key] = 0.0
-            return 0.0
-
-        max_trust = 0.0
-        for intermediate, weight in self.edges[from_cid].items():
-            if weight > 0:
-                transitive = self.compute_trust(intermediate, to_cid, visited.copy(), depth + 1)
-                path_trust = weight * transitive * 0.8  # Decay
-                max_trust = max(max_trust, path_trust)
-
-        self.cache[cache_key] = max_trust
-        return max_trust
+class TrustGraph(TrustEngine):
+    """Attestation graph; one cached best-path search per viewer (wellspring_trust)."""
+
+    def compute_trust(self, from_cid: str, to_cid: str) -> float:
+        return self.trust(from_cid, to_cid)
 
 # ============================================================================
 # MAIN TEST
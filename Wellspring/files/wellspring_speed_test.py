@@ -22,10 +22,11 @@ import time
 from datetime import datetime
 from dataclasses import dataclass, field
 from typing import Optional, Dict, List, Set, Tuple
-from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
 import threading
 
+from wellspring_trust import TrustEngine
+
 def compute_cid(content: dict) -> str:
     canonical = json.dumps(content, sort_keys=True, separators=(',', ':'))
     return f"baf_{hashlib.sha256(canonical.encode()).hexdigest()[:16]}"
@@ -65,79 +66,15 @@ class Thought:
         return d
 
 
-class TrustGraph:
-    """Thread-safe trust graph with cycle detection"""
-
-    def __init__(self):
-        self.direct_trust: Dict[str, Dict[str, float]] = defaultdict(dict)
-        self.decay = 0.8
-        self.lock = threading.RLock()
-        self._cache: Dict[Tuple[str, str], Tuple[float, List[str]]] = {}
-        self.cache_hits = 0
-        self.cache_misses = 0
+class TrustGraph(TrustEngine):
+    """Thread-safe trust graph; best paths come from wellspring_trust"""
 
     def add_trust(self, from_id: str, to_id: str, weight: float):
-        with self.lock:
-            self.direct_trust[from_id][to_id] = weight
-            # Invalidate cache entries involving these identities
-            self._cache = {k: v for k, v in self._cache.items()
-                         if from_id not in k and to_id not in k}
+        self.add_edge(from_id, to_id, weight)
 
     def compute_trust(self, viewer: str, target: str, max_hops: int = 4) -> Tuple[float, List[str]]:
-        """Compute trust with cycle detection and caching"""
-        cache_key = (viewer, target)
-
-        with self.lock:
-            if cache_key in self._cache:
-                self.cache_hits += 1
-                return self._cache[cache_key]
-            self.cache_misses += 1
-
-        if viewer == target:
-            return (1.0, [viewer])
-
-        # Direct trust
-        with self.lock:
-            if target in self.direct_trust.get(viewer, {}):
-                weight = self.direct_trust[viewer][target]
-                result = (weight, [viewer, target])
-                self._cache[cache_key] = result
-                return result
-
-        # BFS with cycle detection
-        visited = {viewer}
-        queue = [(viewer, 1.0, [viewer])]
-        best_score = 0.0
-        best_path = []
-
-        while queue:
-            current, trust_so_far, path = queue.pop(0)
-
-            if len(path) > max_hops + 1:
-                continue
-
-            with self.lock:
-                edges = list(self.direct_trust.get(current, {}).items())
-
-            for next_id, weight in edges:
-                if next_id in visited:
-                    continue  # Cycle detected, skip
-
-                new_trust = trust_so_far * weight * self.decay
-                new_path = path + [next_id]
-
-                if next_id == target:
-                    if new_trust > best_score:
-                        best_score = new_trust
-                        best_path = new_path
-                else:
-                    visited.add(next_id)
-                    queue.append((next_id, new_trust, new_path))
-
-        result = (best_score, best_path)
-        with self.lock:
-            self._cache[cache_key] = result
-        return result
+        """Best trust and path within max_hops (one cached search per viewer)"""
+        return self.best_path(viewer, target, max_hops)
 
 
 class PeerConfig:
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+Storage backends for the HTTP sync nodes.
+
+A node keeps four kinds of state: thoughts (cid -> thought dict), pubkeys
+(identity cid -> hex pubkey), pool memberships and a received_via
+provenance log. ThoughtStorage (the storage interface of the v0.12
+proposal, §9.1) exposes thoughts/pubkeys as mappings so node code reads the
+same whether they live in memory or on disk.
+
+    MemoryStorage  - plain dicts; state is lost on restart
+    SQLiteStorage  - WAL-mode SQLite with an LRU hot set in front of the
+                     thoughts table. The thoughts table has the same columns
+                     and indexes as thread-3/core.py, so the same DB file
+                     can be read by either.
+
+One divergence: the HTTP nodes stamp created_at as an ISO-8601 string, and
+it is signed, so it is stored verbatim. SQLite keeps such a value as TEXT
+even in core.py's INTEGER column. A core.py reader of a node DB sees those
+strings, and they do not order against millisecond stamps.
+
+Thoughts can also be filed under named index buckets (the V2 node files
+them by visibility class) so a scan can read one bucket instead of every
+thought. Small node settings (identity key, bloom snapshot) go in a meta
+table so a restart can reuse them instead of rebuilding.
+"""
+
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+DEFAULT_CACHE_SIZE = 10_000   # Hot thoughts kept decoded in memory
+PAGE_SIZE = 1024              # Rows per page when scanning
+
+# ============================================================================
+# BASE
+# ============================================================================
+
+class ThoughtStorage:
+    """Interface shared by the backends."""
+
+    thoughts: MutableMapping
+    pubkeys: MutableMapping
+
+    def cid_pages(self, page_size: int = PAGE_SIZE) -> Iterator[List[str]]:
+        """All thought CIDs in insertion order, a page at a time."""
+        raise NotImplementedError
+
+    def iter_thoughts(self) -> Iterator[dict]:
+        for page in self.cid_pages():
+            for cid in page:
+                yield self.thoughts[cid]
+
+    def add_pool_member(self, pool_cid: str, member_cid: str):
+        raise NotImplementedError
+
+    def pool_members(self, pool_cid: str) -> Set[str]:
+        raise NotImplementedError
+
+    def member_pools(self, member_cid: str) -> Set[str]:
+        raise NotImplementedError
+
+    def pool_count(self) -> int:
+        raise NotImplementedError
+
+    def index_thought(self, cid: str, buckets: List[str]):
+        """File a thought CID under one or more index buckets."""
+        raise NotImplementedError
+
+    def bucket_pages(self, bucket: str, page_size: int = PAGE_SIZE) -> Iterator[List[str]]:
+        raise NotImplementedError
+
+    def bucket_sizes(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def append_provenance(self, thought_cid: str, via: str, received_at: str):
+        """Log where a thought came from. Entries start unsealed (batch None)."""
+        raise NotImplementedError
+
+    def get_provenance(self, thought_cid: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def pending_provenance(self) -> List[dict]:
+        """Unsealed entries, oldest first."""
+        raise NotImplementedError
+
+    def seal_provenance(self, last_seq: int, batch_cid: str):
+        """Mark unsealed entries up to last_seq as rolled into batch_cid."""
+        raise NotImplementedError
+
+    def provenance_batch(self, batch_cid: str) -> List[dict]:
+        raise NotImplementedError
+
+    def get_meta(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set_meta(self, key: str, value: str):
+        raise NotImplementedError
+
+    @contextmanager
+    def transaction(self):
+        """Group writes. A no-op where writes are not durable anyway."""
+        yield
+
+    def close(self):
+        pass
+
+
+# ============================================================================
+# MEMORY BACKEND
+# ============================================================================
+
+class MemoryStorage(ThoughtStorage):
+    def __init__(self):
+        self.thoughts: Dict[str, dict] = {}
+        self.pubkeys: Dict[str, str] = {}
+        self._provenance: List[dict] = []
+        self._provenance_by_cid: Dict[str, dict] = {}
+        self._pools: Dict[str, Set[str]] = {}
+        self._buckets: Dict[str, Dict[str, None]] = {}  # bucket -> ordered set of CIDs
+        self._meta: Dict[str, str] = {}
+
+    def cid_pages(self, page_size: int = PAGE_SIZE) -> Iterator[List[str]]:
+        cids = list(self.thoughts)
+        for start in range(0, len(cids), page_size):
+            yield cids[start:start + page_size]
+
+    def iter_thoughts(self) -> Iterator[dict]:
+        return iter(list(self.thoughts.values()))
+
+    def add_pool_member(self, pool_cid: str, member_cid: str):
+        self._pools.setdefault(pool_cid, set()).add(member_cid)
+
+    def pool_members(self, pool_cid: str) -> Set[str]:
+        return set(self._pools.get(pool_cid, set()))
+
+    def member_pools(self, member_cid: str) -> Set[str]:
+        return {pool for pool, members in self._pools.items() if member_cid in members}
+
+    def pool_count(self) -> int:
+        return len(self._pools)
+
+    def index_thought(self, cid: str, buckets: List[str]):
+        for bucket in buckets:
+            self._buckets.setdefault(bucket, {})[cid] = None
+
+    def bucket_pages(self, bucket: str, page_size: int = PAGE_SIZE) -> Iterator[List[str]]:
+        cids = list(self._buckets.get(bucket, ()))
+        for start in range(0, len(cids), page_size):
+            yield cids[start:start + page_size]
+
+    def bucket_sizes(self) -> Dict[str, int]:
+        return {bucket: len(cids) for bucket, cids in list(self._buckets.items())}
+
+    def append_provenance(self, thought_cid: str, via: str, received_at: str):
+        entry = {
+            "seq": len(self._provenance) + 1,
+            "thought": thought_cid,
+            "via": via,
+            "received_at": received_at,
+            "batch": None,
+        }
+        self._provenance.append(entry)
+        self._provenance_by_cid.setdefault(thought_cid, entry)
+
+    def get_provenance(self, thought_cid: str) -> Optional[dict]:
+        entry = self._provenance_by_cid.get(thought_cid)
+        return dict(entry) if entry else None
+
+    def pending_provenance(self) -> List[dict]:
+        return [dict(e) for e in self._provenance if e["batch"] is None]
+
+    def seal_provenance(self, last_seq: int, batch_cid: str):
+        for entry in self._provenance[:last_seq]:
+            if entry["batch"] is None:
+                entry["batch"] = batch_cid
+
+    def provenance_batch(self, batch_cid: str) -> List[dict]:
+        return [dict(e) for e in self._provenance if e["batch"] == batch_cid]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        return self._meta.get(key)
+
+    def set_meta(self, key: str, value: str):
+        self._meta[key] = value
+
+
+# ============================================================================
+# SQLITE BACKEND
+# ============================================================================
+
+SCHEMA = [
+    # Same table as thread-3/core.py init_db; created_at holds the nodes' ISO strings
+    """
+    CREATE TABLE IF NOT EXISTS thoughts (
+        cid TEXT PRIMARY KEY,
+        type TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_by TEXT NOT NULL,
+        created_at INTEGER NOT NULL,
+        because TEXT NOT NULL,
+        signature TEXT NOT NULL,
+        visibility TEXT,
+        source TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_type ON thoughts(type)",
+    "CREATE INDEX IF NOT EXISTS idx_created_by_at ON thoughts(created_by, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_created_at ON thoughts(created_at)",
+    "CREATE TABLE IF NOT EXISTS node_pubkeys (cid TEXT PRIMARY KEY, pubkey TEXT NOT NULL)",
+    """
+    CREATE TABLE IF NOT EXISTS provenance_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        thought_cid TEXT NOT NULL,
+        via TEXT NOT NULL,
+        received_at TEXT NOT NULL,
+        batch_cid TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_provenance_thought ON provenance_log(thought_cid)",
+    "CREATE INDEX IF NOT EXISTS idx_provenance_batch ON provenance_log(batch_cid)",
+    """
+    CREATE TABLE IF NOT EXISTS pool_members (
+        pool_cid TEXT NOT NULL,
+        member_cid TEXT NOT NULL,
+        PRIMARY KEY (pool_cid, member_cid)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS thought_index (
+        bucket TEXT NOT NULL,
+        cid TEXT NOT NULL,
+        PRIMARY KEY (bucket, cid)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_pool_members_member ON pool_members(member_cid)",
+    "CREATE TABLE IF NOT EXISTS node_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+]
+
+
+class _Database:
+    """
+    One connection per thread (WAL lets readers run beside the writer),
+    writes serialized by a lock. Inside transaction() writes commit once
+    at the end instead of per statement, or roll back together if an
+    exception leaves any level of the transaction.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.RLock()
+        conn = self.conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.depth = 0
+            self._local.failed = False
+        return conn
+
+    def query(self, sql: str, params: tuple = ()) -> list:
+        return self.conn().execute(sql, params).fetchall()
+
+    def write(self, sql: str, params: tuple = ()):
+        with self._write_lock:
+            conn = self.conn()
+            conn.execute(sql, params)
+            if not self._local.depth:
+                conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        with self._write_lock:
+            conn = self.conn()
+            self._local.depth += 1
+            try:
+                yield
+            except BaseException:
+                self._local.failed = True
+                raise
+            finally:
+                self._local.depth -= 1
+                if not self._local.depth:
+                    if self._local.failed:
+                        self._local.failed = False
+                        conn.rollback()
+                    else:
+                        conn.commit()
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def thought_row_error(thought: dict) -> Optional[str]:
+    """
+    Why thought can't be stored as a thoughts row, or None. Nodes check
+    this before writing anything, so one malformed thought is rejected on
+    its own instead of failing, and rolling back, the batch it came in.
+    """
+    for key in ("cid", "type", "created_by", "created_at", "signature"):
+        if not isinstance(thought.get(key), str):
+            return f"{key} is not a string"
+    for key in ("visibility", "source"):
+        if thought.get(key) is not None and not isinstance(thought[key], str):
+            return f"{key} is not a string"
+    because = thought.get("because", [])
+    if not isinstance(because, list) or not all(isinstance(ref, str) for ref in because):
+        return "because is not a list of CIDs"
+    if "content" not in thought:
+        return "no content"
+    try:
+        json.dumps(thought["content"])
+    except (TypeError, ValueError):
+        return "content is not JSON"
+    return None
+
+
+def _thought_to_row(thought: dict) -> tuple:
+    return (
+        thought["cid"],
+        thought["type"],
+        json.dumps(thought["content"]),
+        thought["created_by"],
+        thought["created_at"],
+        json.dumps(thought.get("because", [])),
+        thought["signature"],
+        thought.get("visibility"),
+        thought.get("source"),
+    )
+
+
+def _row_to_thought(row) -> dict:
+    thought = {
+        "cid": row[0],
+        "type": row[1],
+        "content": json.loads(row[2]),
+        "created_by": row[3],
+        "because": json.loads(row[5]),
+        "created_at": row[4],
+        "signature": row[6],
+    }
+    if row[7]:
+        thought["visibility"] = row[7]
+    if row[8]:
+        thought["source"] = row[8]
+    return thought
+
+
+class SQLiteThoughts(MutableMapping):
+    """cid -> thought dict, backed by the thoughts table."""
+
+    COLUMNS = "cid, type, content, created_by, created_at, because, signature, visibility, source"
+
+    def __init__(self, db: _Database):
+        self.db = db
+
+    def __getitem__(self, cid: str) -> dict:
+        rows = self.db.query(f"SELECT {self.COLUMNS} FROM thoughts WHERE cid = ?", (cid,))
+        if not rows:
+            raise KeyError(cid)
+        return _row_to_thought(rows[0])
+
+    def __setitem__(self, cid: str, thought: dict):
+        self.db.write(
+            f"INSERT OR REPLACE INTO thoughts ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _thought_to_row(thought)
+        )
+
+    def __delitem__(self, cid: str):
+        self.db.write("DELETE FROM thoughts WHERE cid = ?", (cid,))
+
+    def __contains__(self, cid) -> bool:
+        return bool(self.db.query("SELECT 1 FROM thoughts WHERE cid = ?", (cid,)))
+
+    def __len__(self) -> int:
+        return self.db.query("SELECT COUNT(*) FROM thoughts")[0][0]
+
+    def __iter__(self) -> Iterator[str]:
+        for page in self.cid_pages():
+            yield from page
+
+    def cid_pages(self, page_size: int = PAGE_SIZE) -> Iterator[List[str]]:
+        last = 0
+        while True:
+            rows = self.db.query(
+                "SELECT rowid, cid FROM thoughts WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last, page_size)
+            )
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [cid for _, cid in rows]
+
+    def iter_values(self, page_size: int = PAGE_SIZE) -> Iterator[dict]:
+        last = 0
+        while True:
+            rows = self.db.query(
+                f"SELECT rowid, {self.COLUMNS} FROM thoughts WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last, page_size)
+            )
+            if not rows:
+                return
+            last = rows[-1][0]
+            for row in rows:
+                yield _row_to_thought(row[1:])
+
+
+class SQLiteMapping(MutableMapping):
+    """A two-column table as a str -> str mapping."""
+
+    def __init__(self, db: _Database, table: str, key: str, value: str):
+        self.db = db
+        self.table, self.key, self.value = table, key, value
+
+    def __getitem__(self, k: str) -> str:
+        rows = self.db.query(f"SELECT {self.value} FROM {self.table} WHERE {self.key} = ?", (k,))
+        if not rows:
+            raise KeyError(k)
+        return rows[0][0]
+
+    def __setitem__(self, k: str, v: str):
+        self.db.write(f"INSERT OR REPLACE INTO {self.table} ({self.key}, {self.value}) VALUES (?, ?)", (k, v))
+
+    def __delitem__(self, k: str):
+        self.db.write(f"DELETE FROM {self.table} WHERE {self.key} = ?", (k,))
+
+    def __contains__(self, k) -> bool:
+        return bool(self.db.query(f"SELECT 1 FROM {self.table} WHERE {self.key} = ?", (k,)))
+
+    def __len__(self) -> int:
+        return self.db.query(f"SELECT COUNT(*) FROM {self.table}")[0][0]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([row[0] for row in self.db.query(f"SELECT {self.key} FROM {self.table}")])
+
+
+class LRUCache(MutableMapping):
+    """
+    Write-through LRU in front of a mapping. Hits skip the backend entirely;
+    misses fall through and are cached. Only present keys are cached.
+    """
+
+    def __init__(self, backend: MutableMapping, capacity: int = DEFAULT_CACHE_SIZE):
+        self.backend = backend
+        self.capacity = capacity
+        self._hot: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, value):
+        with self._lock:
+            self._hot[key] = value
+            self._hot.move_to_end(key)
+            while len(self._hot) > self.capacity:
+                self._hot.popitem(last=False)
+
+    def __getitem__(self, key: str):
+        with self._lock:
+            if key in self._hot:
+                self._hot.move_to_end(key)
+                self.hits += 1
+                return self._hot[key]
+            self.misses += 1
+        value = self.backend[key]
+        self._remember(key, value)
+        return value
+
+    def __setitem__(self, key: str, value):
+        self.backend[key] = value
+        self._remember(key, value)
+
+    def __delitem__(self, key: str):
+        with self._lock:
+            self._hot.pop(key, None)
+        del self.backend[key]
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            if key in self._hot:
+                return True
+        return key in self.backend
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.backend)
+
+    def forget(self):
+        """Drop the hot set, e.g. after the backend rolled back cached writes."""
+        with self._lock:
+            self._hot.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "cached": len(self._hot),
+            "capacity": self.capacity,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class SQLiteStorage(ThoughtStorage):
+    def __init__(self, path: Path, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.db = _Database(path)
+        self._thoughts = SQLiteThoughts(self.db)
+        self.thoughts = LRUCache(self._thoughts, cache_size)
+        self.pubkeys = SQLiteMapping(self.db, "node_pubkeys", "cid", "pubkey")
+        self._meta = SQLiteMapping(self.db, "node_meta", "key", "value")
+
+    def cid_pages(self, page_size: int = PAGE_SIZE) -> Iterator[List[str]]:
+        return self._thoughts.cid_pages(page_size)
+
+    def iter_thoughts(self) -> Iterator[dict]:
+        return self._thoughts.iter_values()
+
+    def add_pool_member(self, pool_cid: str, member_cid: str):
+        self.db.write(
+            "INSERT OR IGNORE INTO pool_members (pool_cid, member_cid) VALUES (?, ?)",
+            (pool_cid, member_cid)
+        )
+
+    def pool_members(self, pool_cid: str) -> Set[str]:
+        rows = self.db.query("SELECT member_cid FROM pool_members WHERE pool_cid = ?", (pool_cid,))
+        return {row[0] for row in rows}
+
+    def member_pools(self, member_cid: str) -> Set[str]:
+        rows = self.db.query("SELECT pool_cid FROM pool_members WHERE member_cid = ?", (member_cid,))
+        return {row[0] for row in rows}
+
+    def pool_count(self) -> int:
+        return self.db.query("SELECT COUNT(DISTINCT pool_cid) FROM pool_members")[0][0]
+
+    def index_thought(self, cid: str, buckets: List[str]):
+        with self.db.transaction():
+            for bucket in buckets:
+                self.db.write("INSERT OR IGNORE INTO thought_index (bucket, cid) VALUES (?, ?)", (bucket, cid))
+
+    def bucket_pages(self, bucket: str, page_size: int = PAGE_SIZE) -> Iterator[List[str]]:
+        last = ""
+        while True:
+            rows = self.db.query(
+                "SELECT cid FROM thought_index WHERE bucket = ? AND cid > ? ORDER BY cid LIMIT ?",
+                (bucket, last, page_size)
+            )
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [row[0] for row in rows]
+
+    def bucket_sizes(self) -> Dict[str, int]:
+        return dict(self.db.query("SELECT bucket, COUNT(*) FROM thought_index GROUP BY bucket"))
+
+    PROVENANCE_COLUMNS = "seq, thought_cid, via, received_at, batch_cid"
+
+    @staticmethod
+    def _provenance_entry(row) -> dict:
+        return {"seq": row[0], "thought": row[1], "via": row[2], "received_at": row[3], "batch": row[4]}
+
+    def append_provenance(self, thought_cid: str, via: str, received_at: str):
+        self.db.write(
+            "INSERT INTO provenance_log (thought_cid, via, received_at) VALUES (?, ?, ?)",
+            (thought_cid, via, received_at)
+        )
+
+    def get_provenance(self, thought_cid: str) -> Optional[dict]:
+        rows = self.db.query(
+            f"SELECT {self.PROVENANCE_COLUMNS} FROM provenance_log WHERE thought_cid = ? ORDER BY seq LIMIT 1",
+            (thought_cid,)
+        )
+        return self._provenance_entry(rows[0]) if rows else None
+
+    def pending_provenance(self) -> List[dict]:
+        rows = self.db.query(
+            f"SELECT {self.PROVENANCE_COLUMNS} FROM provenance_log WHERE batch_cid IS NULL ORDER BY seq"
+        )
+        return [self._provenance_entry(row) for row in rows]
+
+    def seal_provenance(self, last_seq: int, batch_cid: str):
+        self.db.write(
+            "UPDATE provenance_log SET batch_cid = ? WHERE batch_cid IS NULL AND seq <= ?",
+            (batch_cid, last_seq)
+        )
+
+    def provenance_batch(self, batch_cid: str) -> List[dict]:
+        rows = self.db.query(
+            f"SELECT {self.PROVENANCE_COLUMNS} FROM provenance_log WHERE batch_cid = ? ORDER BY seq",
+            (batch_cid,)
+        )
+        return [self._provenance_entry(row) for row in rows]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        return self._meta.get(key)
+
+    def set_meta(self, key: str, value: str):
+        self._meta[key] = value
+
+    @contextmanager
+    def transaction(self):
+        try:
+            with self.db.transaction():
+                yield
+        except BaseException:
+            # Rolled back: thoughts cached inside it may not exist
+            self.thoughts.forget()
+            raise
+
+    def close(self):
+        self.db.close()
+
+
+def open_storage(db_path: Optional[str] = None, cache_size: int = DEFAULT_CACHE_SIZE) -> ThoughtStorage:
+    """SQLite storage at db_path, or in-memory storage if no path is given."""
+    if db_path is None:
+        return MemoryStorage()
+    return SQLiteStorage(Path(db_path), cache_size)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Restart benchmark for SQLite-backed nodes.
+
+Fills a SQLite store with synthetic thoughts, then measures what a node
+restart costs: opening the DB, rebuilding the bloom by scanning every CID
+versus loading the snapshot saved at shutdown, and cold vs hot lookups
+through the LRU cache.
+
+Usage:
+    python wellspring_storage_bench.py [--count 1000000] [--db /tmp/bench.db]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from wellspring_node import WellspringNode
+from wellspring_storage import SQLiteStorage, DEFAULT_CACHE_SIZE
+
+
+def fill(path: str, count: int, batch: int = 10_000):
+    storage = SQLiteStorage(path)
+    node = WellspringNode("bench", 0, storage)
+    start = time.perf_counter()
+    for base in range(0, count, batch):
+        with storage.transaction():
+            for i in range(base, min(base + batch, count)):
+                cid = f"baf_{i:032x}"
+                storage.thoughts[cid] = {
+                    "cid": cid,
+                    "type": "basic",
+                    "content": {"text": f"synthetic thought {i}"},
+                    "created_by": node.cid,
+                    "because": [],
+                    "created_at": f"2026-01-01T00:00:{i % 60:02d}",
+                    "signature": "x" * 88,
+                }
+    elapsed = time.perf_counter() - start
+    storage.close()  # No bloom snapshot: these rows bypassed the node
+    return elapsed
+
+
+def restart(path: str, snapshot: bool) -> dict:
+    start = time.perf_counter()
+    storage = SQLiteStorage(path)
+    open_s = time.perf_counter() - start
+    if not snapshot:
+        storage.set_meta("bloom", "")
+    start = time.perf_counter()
+    node = WellspringNode("bench", 0, storage)
+    node_s = time.perf_counter() - start
+    return {"node": node, "open_s": open_s, "node_s": node_s}
+
+
+def lookups(node: WellspringNode, cids: list) -> float:
+    start = time.perf_counter()
+    for cid in cids:
+        node.thoughts[cid]
+    return (time.perf_counter() - start) / len(cids) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage restart benchmark")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--db", default=os.path.join(tempfile.mkdtemp(), "bench.db"))
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"Storage restart benchmark: {args.count:,} thoughts at {args.db}")
+    print("=" * 70)
+
+    fill_s = fill(args.db, args.count)
+    size_mb = os.path.getsize(args.db) / 1e6
+    print(f"\n  Fill: {fill_s:.1f} s ({args.count / fill_s:,.0f} thoughts/s), {size_mb:.0f} MB on disk")
+
+    cold = restart(args.db, snapshot=False)
+    print("\n  Restart, bloom rebuilt from storage:")
+    print(f"    open {cold['open_s'] * 1000:.1f} ms, node ready {cold['node_s']:.2f} s")
+    cold["node"].close()
+
+    warm = restart(args.db, snapshot=True)
+    print("  Restart, bloom snapshot loaded:")
+    print(f"    open {warm['open_s'] * 1000:.1f} ms, node ready {warm['node_s']:.2f} s")
+
+    node = warm["node"]
+    sample = [f"baf_{random.randrange(args.count):032x}" for _ in range(min(DEFAULT_CACHE_SIZE, 5000))]
+    cold_us = lookups(node, sample)
+    hot_us = lookups(node, sample)
+    print(f"\n  Lookup: cold {cold_us:.1f} µs, hot (LRU) {hot_us:.2f} µs per thought")
+    print(f"  Cache: {node.thoughts.stats()}")
+    node.close()
+
+
+if __name__ == "__main__":
+    main()
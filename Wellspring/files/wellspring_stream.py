@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+NDJSON streaming for the HTTP sync nodes.
+
+/sync/stream and /thoughts/stream write one thought per line as they are
+produced; /receive/stream parses lines as chunks arrive and hands batches
+to a worker pool for signature verification, so neither side holds the
+whole transfer in memory and the event loop never runs ed25519. A thought
+that arrives before its signer's identity is parked by the node's receive
+pipeline and stored once the identity lands, wherever it is in the stream.
+
+stream_sync() pipes one node's /sync/stream straight into another's
+/receive/stream without buffering the thoughts in between.
+"""
+
+import asyncio
+import json
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Set
+
+import requests
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH = 256       # Thoughts per verification batch
+MAX_LINE_BYTES = 1 << 20  # Reject a single thought larger than this
+
+# ============================================================================
+# SERVER SIDE
+# ============================================================================
+
+def ndjson_response(thoughts: Iterable[dict]) -> StreamingResponse:
+    """Stream thoughts as NDJSON. Sync iterables run in Starlette's threadpool."""
+    def lines():
+        for thought in thoughts:
+            yield json.dumps(thought, separators=(',', ':')).encode() + b"\n"
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+async def read_ndjson(request: Request) -> AsyncIterator[dict]:
+    """Parse an NDJSON request body incrementally."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > MAX_LINE_BYTES:
+            raise ValueError("NDJSON line too long")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+async def receive_ndjson(
+    request: Request,
+    receive_batch: Callable[[List[dict]], dict],
+    executor: Optional[Executor] = None,
+    batch_size: int = STREAM_BATCH
+) -> dict:
+    """
+    Feed an NDJSON body to `receive_batch` in batches on `executor`.
+
+    receive_batch returns {"new": int, "waiting_on": [signer CIDs parked
+    for], "resolved": [signer CIDs released]}. The result lists signers
+    whose thoughts from this stream are still parked when it ends.
+    """
+    loop = asyncio.get_running_loop()
+    received = new = 0
+    waiting: Set[str] = set()
+    batch: List[dict] = []
+
+    async def flush(thoughts: List[dict]):
+        nonlocal new
+        result = await loop.run_in_executor(executor, receive_batch, thoughts)
+        new += result["new"]
+        waiting.update(result["waiting_on"])
+        waiting.difference_update(result["resolved"])
+
+    async for thought in read_ndjson(request):
+        batch.append(thought)
+        received += 1
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    return {"received": received, "new": new, "waiting_on": sorted(waiting)}
+
+
+# ============================================================================
+# CLIENT SIDE
+# ============================================================================
+
+def stream_sync(src_url: str, dst_url: str, sender_cid: str,
+                requester_cid: Optional[str] = None, timeout: float = 300) -> dict:
+    """
+    Sync src -> dst: dst's bloom goes to src's /sync/stream, and the
+    response lines are forwarded to dst's /receive/stream as they arrive.
+
+    requester_cid is who src filters visibility for (defaults to sender_cid,
+    matching the non-streaming simulators); sender_cid is recorded at dst.
+    """
+    bloom = requests.get(f"{dst_url}/bloom", timeout=timeout).json()
+    with requests.post(
+        f"{src_url}/sync/stream",
+        json={
+            "bloom_hex": bloom["bloom_hex"],
+            "bloom_bits": bloom["bloom_bits"],
+            "bloom_hashes": bloom["bloom_hashes"],
+            "sender_cid": requester_cid or sender_cid
+        },
+        stream=True,
+        timeout=timeout
+    ) as sync_resp:
+        sync_resp.raise_for_status()
+        body = (line + b"\n" for line in sync_resp.iter_lines() if line)
+        recv_resp = requests.post(
+            f"{dst_url}/receive/stream",
+            params={"sender_cid": sender_cid},
+            data=body,
+            headers={"Content-Type": NDJSON_MEDIA_TYPE},
+            timeout=timeout
+        )
+    recv_resp.raise_for_status()
+    return recv_resp.json()
+
+
+def iter_thoughts(url: str, timeout: float = 300) -> Iterable[dict]:
+    """Every thought on a node, read from /thoughts/stream."""
+    with requests.get(f"{url}/thoughts/stream", stream=True, timeout=timeout) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines():
+            if line:
+                yield json.loads(line)
@@ -12,6 +12,8 @@ import sys
 import signal
 import os
 
+from wellspring_stream import stream_sync, iter_thoughts
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 NODE_SCRIPT = os.path.join(BASE_DIR, "wellspring_node.py")
 
@@ -62,30 +64,13 @@ class NodeManager:
 # ============================================================================
 
 def sync_nodes(src_url: str, dst_url: str) -> dict:
-    """Sync from src to dst using bloom filter exchange."""
-    # Get dst's bloom filter
-    bloom_resp = requests.get(f"{dst_url}/bloom")
-    bloom_data = bloom_resp.json()
-
+    """Sync from src to dst: dst's bloom in, missing thoughts streamed through."""
     # Get src's identity
     id_resp = requests.get(f"{src_url}/identity")
     src_identity = id_resp.json()
 
-    # Ask src for thoughts dst is missing
-    sync_resp = requests.post(
-        f"{src_url}/sync",
-        json={"bloom_hex": bloom_data["bloom_hex"], "sender_cid": src_identity["cid"]}
-    )
-    sync_data = sync_resp.json()
-
-    if sync_data["count"] > 0:
-        # Send missing thoughts to dst
-        recv_resp = requests.post(
-            f"{dst_url}/receive",
-            json={"thoughts": sync_data["thoughts"], "sender_cid": src_identity["cid"]}
-        )
-        return recv_resp.json()
-    return {"received": 0, "new": 0}
+    # Stream src's /sync/stream into dst's /receive/stream
+    return stream_sync(src_url, dst_url, src_identity["cid"])
 
 def get_stats(url: str) -> dict:
     return requests.get(f"{url}/").json()
@@ -100,7 +85,7 @@ def get_identity(url: str) -> dict:
     return requests.get(f"{url}/identity").json()
 
 def get_thoughts(url: str) -> list:
-    return requests.get(f"{url}/thoughts").json()["thoughts"]
+    return list(iter_thoughts(url))
 
 # ============================================================================
 # MAIN TEST
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Best-path trust for the Wellspring dogfoods.
+
+Trust from a viewer to a target is the best product of vouch weights along
+any chain of at most max_hops edges, decayed at each intermediary:
+
+    trust = w1 × w2 × ... × wn × decay^(n-1)
+
+So a direct edge counts at full weight. The viewer's own direct attestation
+of a target is final, even a negative one. Edges with weight <= 0 are never
+followed.
+
+TrustEngine.trust_from(viewer) scores every target in one Dijkstra pass,
+using a heap over edge costs -log(weight × decay). Labels are kept per
+(identity, hops), so the hop limit stays exact. A node is re-expanded only
+when it is reached in fewer hops than before.
+
+Scores and explanations are kept apart. Scores are a plain dict. The
+explanation is a compact predecessor array: each accepted label is a slot
+in two int arrays, holding the identity's interned id and the predecessor
+label's slot. Paths are rebuilt from those arrays on demand. An engine
+built with explain=False keeps no arrays, and best_path runs one uncached
+explained search.
+
+Cached maps are invalidated per edge. Each search records which identities
+it expanded, that is, whose out-edges it read, and which edges its best
+paths use. Adding or raising a followable edge src -> dst can only change
+the maps that expanded src. Removing or lowering one can only change the
+maps whose best paths use it (without explanations: the maps that
+expanded src). Every other map is left cached. With
+max_cached set, the least recently used map is evicted past that many.
+
+RepeaterIndex adds repeater shortcuts on top of the engine. A repeater is
+an identity that a designator trusts as an anchor for some domains. Trust
+through a repeater is trust(designator, R) × trust(R, target), with no
+decay between the two legs.
+"""
+
+import heapq
+import math
+import threading
+from array import array
+from itertools import chain, count
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+TRUST_DECAY = 0.8   # Multiplier per intermediary
+MAX_HOPS = 6        # Longest vouch chain considered
+
+CacheKey = Tuple[str, int]   # (viewer, max_hops)
+
+# ============================================================================
+# TRUST MAP
+# ============================================================================
+
+@dataclass
+class TrustMap:
+    """One viewer's best trust to every identity it can reach."""
+    viewer: str
+    trust: Dict[str, float] = field(default_factory=dict)
+    direct: Dict[str, float] = field(default_factory=dict)   # Viewer's own attestations
+    expanded: Set[str] = field(default_factory=set)          # Identities whose edges were read
+    # Explanation: label i is identity names[node[i]], reached from label pred[i] (-1: none)
+    explained: bool = True
+    best: Dict[str, int] = field(default_factory=dict)       # Target -> label of its best path
+    node: array = field(default_factory=lambda: array("i"))
+    pred: array = field(default_factory=lambda: array("i"))
+    names: List[str] = field(default_factory=list)           # The engine's interned identities
+
+    def get(self, target: str, default: float = 0.0) -> float:
+        if target == self.viewer:
+            return 1.0
+        if target in self.direct:
+            return self.direct[target]
+        return self.trust.get(target, default)
+
+    def path(self, target: str) -> List[str]:
+        """Identities from viewer to target on the best path ([] if none)."""
+        if target == self.viewer:
+            return [self.viewer]
+        if target in self.direct:
+            return [self.viewer, target]
+        if target not in self.trust:
+            return []
+        if not self.explained:
+            raise ValueError("trust map was computed without explanations")
+        path = []
+        label = self.best[target]
+        while label >= 0:
+            path.append(self.names[self.node[label]])
+            label = self.pred[label]
+        return path[::-1]
+
+    def edges_used(self) -> Set[Tuple[str, str]]:
+        """(src, dst) edges on any best-path label."""
+        names, node, pred = self.names, self.node, self.pred
+        return {(names[node[p]], names[node[i]]) for i, p in enumerate(pred) if p >= 0}
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+class TrustEngine:
+    """Directed vouch graph with cached single-source best-trust maps."""
+
+    def __init__(self, decay: float = TRUST_DECAY, max_hops: int = MAX_HOPS,
+                 max_cached: Optional[int] = None, explain: bool = True):
+        if not 0 < decay <= 1:
+            raise ValueError(f"decay must be in (0, 1], got {decay}")
+        self.decay = decay
+        self.max_hops = max_hops
+        self.max_cached = max_cached   # None: keep every map
+        self.explain = explain         # Keep predecessor arrays for best_path
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self.edges: Dict[str, Dict[str, float]] = {}
+        self._maps: Dict[CacheKey, TrustMap] = {}
+        self._last_used: Dict[CacheKey, int] = {}
+        self._ticks = count()
+        self._expanded_by: Dict[str, Set[CacheKey]] = {}             # Identity -> maps that read its edges
+        self._used_by: Dict[Tuple[str, str], Set[CacheKey]] = {}     # Edge -> maps whose paths use it
+        self._lock = threading.RLock()
+        self.epoch = 0   # Bumped on every graph change
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.evictions = 0
+
+    def add_edge(self, src: str, dst: str, weight: float):
+        """Record src's trust in dst. Weights above 1 would break best-path search."""
+        if weight > 1:
+            raise ValueError(f"trust weight must be <= 1, got {weight}")
+        with self._lock:
+            old = self.edges.setdefault(src, {}).get(dst)
+            self.edges[src][dst] = weight
+            self._edge_changed(src, dst, old, weight)
+
+    def remove_edge(self, src: str, dst: str):
+        with self._lock:
+            old = self.edges.get(src, {}).pop(dst, None)
+            if old is not None:
+                self._edge_changed(src, dst, old, None)
+
+    def invalidate(self):
+        """Drop every cached trust map and start a new epoch."""
+        with self._lock:
+            self._maps.clear()
+            self._last_used.clear()
+            self._expanded_by.clear()
+            self._used_by.clear()
+            self.epoch += 1
+
+    def _edge_changed(self, src: str, dst: str, old: Optional[float], new: Optional[float]):
+        """Drop only the cached maps that the change of src -> dst can affect."""
+        self.epoch += 1
+        if old == new:
+            return
+        if new is not None and new > 0 and (old is None or new > old):
+            stale = self._expanded_by.get(src, set())    # New or better path through src
+        elif old is not None and old > 0:
+            # A best path may have used it; unexplained maps only know they read src
+            stale = self._used_by.get((src, dst), set()) if self.explain else self._expanded_by.get(src, set())
+        else:
+            stale = set()
+        # The viewer's own attestations are read directly, whatever their weight
+        for key in stale | {key for key in self._expanded_by.get(src, ()) if key[0] == src}:
+            self._drop(key)
+
+    def _drop(self, key: CacheKey):
+        result = self._maps.pop(key, None)
+        self._last_used.pop(key, None)
+        if result is None:
+            return
+        for node in result.expanded:
+            self._expanded_by[node].discard(key)
+        if result.explained:
+            for edge in result.edges_used():
+                self._used_by[edge].discard(key)
+
+    def _track(self, key: CacheKey, result: TrustMap):
+        for node in result.expanded:
+            self._expanded_by.setdefault(node, set()).add(key)
+        if result.explained:
+            for edge in result.edges_used():
+                self._used_by.setdefault(edge, set()).add(key)
+
+    def snapshot(self) -> Tuple[int, List[Tuple[str, str, float]]]:
+        """(epoch, [(src, dst, weight), ...]) read consistently under the lock."""
+        with self._lock:
+            return self.epoch, [(src, dst, w) for src, out in self.edges.items() for dst, w in out.items()]
+
+    def trust_from(self, viewer: str, max_hops: Optional[int] = None) -> TrustMap:
+        """Best trust from viewer to everything within max_hops (cached until the graph changes)."""
+        key = (viewer, self.max_hops if max_hops is None else max_hops)
+        cached = self._maps.get(key)   # Lock-free read: dict.get is atomic
+        if cached is not None:
+            self.cache_hits += 1
+            self._last_used[key] = next(self._ticks)
+            return cached
+        with self._lock:
+            cached = self._maps.get(key)
+            if cached is not None:
+                self.cache_hits += 1
+                self._last_used[key] = next(self._ticks)
+                return cached
+            self.cache_misses += 1
+            result = self._search(viewer, key[1], self.explain)
+            if self.max_cached is not None and len(self._maps) >= self.max_cached:
+                self._evict(len(self._maps) - self.max_cached + 1)
+            self._maps[key] = result
+            self._last_used[key] = next(self._ticks)
+            self._track(key, result)
+            return result
+
+    def _evict(self, n: int):
+        """Drop the n least recently used maps. A scan, but only after a search."""
+        for key in heapq.nsmallest(n, self._maps, key=lambda k: self._last_used.get(k, -1)):
+            self._drop(key)
+            self.evictions += 1
+
+    def trust(self, viewer: str, target: str, max_hops: Optional[int] = None) -> float:
+        return self.trust_from(viewer, max_hops).get(target)
+
+    def best_path(self, viewer: str, target: str, max_hops: Optional[int] = None) -> Tuple[float, List[str]]:
+        result = self.trust_from(viewer, max_hops)
+        if not result.explained:
+            with self._lock:
+                result = self._search(viewer, self.max_hops if max_hops is None else max_hops, True)
+        return result.get(target), result.path(target)
+
+    def _search(self, viewer: str, max_hops: int, explain: bool) -> TrustMap:
+        result = TrustMap(viewer, direct=dict(self.edges.get(viewer, {})), expanded={viewer},
+                          explained=explain, names=self._names)
+        ids, names, node_ids, preds = self._ids, self._names, result.node, result.pred
+        hop_cost = -math.log(self.decay)
+        fewest_hops: Dict[str, int] = {}   # Fewest hops at which each node was expanded
+        heap = [(0.0, 0, viewer, -1)]      # (cost, hops, node, predecessor label)
+
+        while heap:
+            cost, hops, node, pred = heapq.heappop(heap)
+            if fewest_hops.get(node, max_hops + 1) <= hops:
+                continue   # Already expanded cheaper and in no more hops
+            label = -1
+            if explain:
+                label = len(preds)
+                node_id = ids.get(node)
+                if node_id is None:
+                    node_id = ids[node] = len(names)
+                    names.append(node)
+                node_ids.append(node_id)
+                preds.append(pred)
+            if node not in fewest_hops and node != viewer:
+                # First pop is the cheapest: the node's best trust
+                result.trust[node] = math.exp(hop_cost - cost)
+                if explain:
+                    result.best[node] = label
+            fewest_hops[node] = hops
+            if hops == max_hops:
+                continue
+            result.expanded.add(node)
+            for nxt, weight in self.edges.get(node, {}).items():
+                if weight <= 0 or fewest_hops.get(nxt, max_hops + 1) <= hops + 1:
+                    continue
+                heapq.heappush(heap, (cost + hop_cost - math.log(weight), hops + 1, nxt, label))
+
+        return result
+
+# ============================================================================
+# REPEATERS
+# ============================================================================
+
+class RepeaterIndex:
+    """
+    Repeater designations indexed by (designator, domain), with shortcut maps.
+
+    A designation for "*" matches every domain, and a lookup with domain None
+    uses all of a designator's repeaters. Each (designator, domain) gets one
+    shortcut map: the elementwise max, over its repeaters, of the designator's
+    trust in the repeater times the repeater's cached outbound trust map. The
+    shortcut maps are kept until the graph epoch or the designator's
+    repeaters change.
+    """
+
+    WILDCARD = "*"
+
+    def __init__(self, engine: TrustEngine):
+        self.engine = engine
+        self.domains: Dict[str, Dict[str, List[str]]] = {}   # designator -> {repeater -> domains}
+        self._index: Dict[Tuple[str, str], Set[str]] = {}    # (designator, domain) -> repeaters
+        self._shortcuts: Dict[Tuple[str, Optional[str]], Dict[str, Tuple[float, str]]] = {}
+        self._epoch = None
+        self._lock = threading.Lock()
+
+    def designate(self, designator: str, repeater: str, domains: List[str]):
+        with self._lock:
+            self._unindex(designator, repeater)
+            self.domains.setdefault(designator, {})[repeater] = list(domains)
+            for domain in domains:
+                self._index.setdefault((designator, domain), set()).add(repeater)
+            self._forget(designator)
+
+    def revoke(self, designator: str, repeater: str):
+        with self._lock:
+            self._unindex(designator, repeater)
+            self.domains.get(designator, {}).pop(repeater, None)
+            self._forget(designator)
+
+    def repeaters(self, designator: str, domain: Optional[str] = None) -> Set[str]:
+        if domain is None:
+            return set(self.domains.get(designator, {}))
+        return self._index.get((designator, domain), set()) | self._index.get((designator, self.WILDCARD), set())
+
+    def shortcuts(self, designator: str, domain: Optional[str] = None) -> Dict[str, Tuple[float, str]]:
+        """Best trust via any repeater to every target: target -> (trust, repeater)."""
+        key = (designator, domain)
+        if self._epoch == self.engine.epoch:
+            cached = self._shortcuts.get(key)   # Lock-free read, as in trust_from
+            if cached is not None:
+                return cached
+        with self._lock:
+            if self._epoch != self.engine.epoch:
+                self._shortcuts.clear()
+                self._epoch = self.engine.epoch
+            cached = self._shortcuts.get(key)
+            if cached is None:
+                cached = self._shortcuts[key] = self._compose(designator, domain)
+            return cached
+
+    def shortcut(self, designator: str, target: str, domain: Optional[str] = None) -> Tuple[float, Optional[str]]:
+        return self.shortcuts(designator, domain).get(target, (0.0, None))
+
+    def _compose(self, designator: str, domain: Optional[str]) -> Dict[str, Tuple[float, str]]:
+        mine = self.engine.trust_from(designator)
+        best: Dict[str, Tuple[float, str]] = {}
+        for repeater in sorted(self.repeaters(designator, domain)):
+            anchor = mine.get(repeater)
+            if anchor <= 0:
+                continue
+            outbound = self.engine.trust_from(repeater)
+            for target in chain(outbound.trust, outbound.direct, [repeater]):
+                trust = anchor * outbound.get(target)
+                if trust > best.get(target, (0.0,))[0]:
+                    best[target] = (trust, repeater)
+        return best
+
+    def _unindex(self, designator: str, repeater: str):
+        for domain in self.domains.get(designator, {}).get(repeater, []):
+            self._index.get((designator, domain), set()).discard(repeater)
+
+    def _forget(self, designator: str):
+        for key in [key for key in self._shortcuts if key[0] == designator]:
+            del self._shortcuts[key]
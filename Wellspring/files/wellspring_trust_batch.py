@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Batch trust over a sparse attestation matrix.
+
+BatchTrust holds a TrustEngine's graph as a scipy.sparse CSR matrix W with
+W[i, j] = weight × decay for every positive edge. Trust for a set of viewers
+is the max-product closure of W bounded to max_hops. It is computed one hop
+at a time for all viewers together:
+
+    T1     = W[viewers]
+    T(h+1) = max(Th, Fh ⊗ W)
+
+Here ⊗ is the (max, ×) semiring product, done as numpy gathers over W's
+rows. Fh holds only the entries that improved at hop h; an entry that did
+not change was already expanded. The scores then follow the engine's rules:
+one decay is divided back out, the viewer's own direct attestations
+override, and a viewer trusts itself fully. So BatchTrust agrees with
+TrustEngine.trust_from.
+
+Viewer rows are cached until the engine's epoch changes, so BatchTrust
+suits many viewers over a settled graph: pool-wide matrices, offline
+ranking. The daemon ranks each Query for one viewer with
+thread-3/trust.TrustService, whose per-viewer maps survive unrelated edge
+changes. Needs scipy, an optional dependency of thread-2 and thread-3.
+"""
+
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError as e:
+    raise ImportError("wellspring_trust_batch needs scipy: pip install scipy") from e
+
+from wellspring_trust import TrustEngine
+
+# ============================================================================
+# SEMIRING PRODUCT
+# ============================================================================
+
+def _max_reduce(rows: np.ndarray, cols: np.ndarray, vals: np.ndarray, shape) -> sparse.csr_matrix:
+    """CSR matrix keeping the largest value for each duplicated (row, col)."""
+    keys = rows.astype(np.int64) * shape[1] + cols
+    order = np.lexsort((-vals, keys))
+    keys, vals = keys[order], vals[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    keys, vals = keys[first], vals[first]
+    return sparse.csr_matrix((vals, (keys // shape[1], keys % shape[1])), shape=shape)
+
+
+def max_times(left: sparse.csr_matrix, right: sparse.csr_matrix) -> sparse.csr_matrix:
+    """(max, ×) product: out[i, j] = max over k of left[i, k] × right[k, j]."""
+    coo = left.tocoo()
+    starts = right.indptr[coo.col]
+    lengths = right.indptr[coo.col + 1] - starts
+    total = int(lengths.sum())
+    shape = (left.shape[0], right.shape[1])
+    if total == 0:
+        return sparse.csr_matrix(shape)
+    # Index into right.data/indices for every entry of every gathered row
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+    return _max_reduce(
+        np.repeat(coo.row, lengths),
+        right.indices[offsets],
+        np.repeat(coo.data, lengths) * right.data[offsets],
+        shape
+    )
+
+# ============================================================================
+# RESULTS
+# ============================================================================
+
+class TrustVector(Mapping):
+    """One viewer's trust in every identity. Identities it can't reach are absent."""
+
+    def __init__(self, viewer: str, index: Dict[str, int], identities: List[str], row: sparse.csr_matrix):
+        self.viewer = viewer
+        self._index = index
+        self._identities = identities
+        self._values = np.zeros(len(identities))
+        self._values[row.indices] = row.data
+        self._stored = set(row.indices.tolist())
+
+    def __getitem__(self, identity: str) -> float:
+        if identity == self.viewer:
+            return 1.0
+        i = self._index.get(identity)
+        if i is None or i not in self._stored:
+            raise KeyError(identity)
+        return float(self._values[i])
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._identities[i] for i in sorted(self._stored))
+
+    def __len__(self) -> int:
+        return len(self._stored)
+
+
+class TrustMatrix:
+    """Trust from each viewer (rows) to every identity in the graph (columns)."""
+
+    def __init__(self, viewers: List[str], index: Dict[str, int], identities: List[str],
+                 matrix: sparse.csr_matrix):
+        self.viewers = viewers
+        self.index = index
+        self.identities = identities
+        self.matrix = matrix
+        self._rows = {viewer: i for i, viewer in enumerate(viewers)}
+
+    def get(self, viewer: str, target: str) -> float:
+        if viewer == target:
+            return 1.0
+        col = self.index.get(target)
+        return 0.0 if col is None else float(self.matrix[self._rows[viewer], col])
+
+    def row(self, viewer: str) -> TrustVector:
+        return TrustVector(viewer, self.index, self.identities, self.matrix[self._rows[viewer]])
+
+    def dense(self, targets: Sequence[str]) -> np.ndarray:
+        """len(viewers) × len(targets) array, e.g. pool members × pool members."""
+        cols = np.array([self.index.get(t, -1) for t in targets], dtype=np.int64)
+        out = np.zeros((len(self.viewers), len(targets)))
+        known = cols >= 0
+        if known.any():
+            out[:, known] = self.matrix[:, cols[known]].toarray()
+        for i, viewer in enumerate(self.viewers):
+            out[i, [j for j, t in enumerate(targets) if t == viewer]] = 1.0
+        return out
+
+# ============================================================================
+# BATCH TRUST
+# ============================================================================
+
+class BatchTrust:
+    """Sparse-matrix trust for many viewers at once, sharing a TrustEngine's graph."""
+
+    def __init__(self, engine: TrustEngine, max_hops: int = None):
+        self.engine = engine
+        self.max_hops = engine.max_hops if max_hops is None else max_hops
+        self._lock = threading.Lock()
+        self._epoch = None
+        self._rows: Dict[str, sparse.csr_matrix] = {}
+
+    def _refresh(self):
+        epoch, edges = self.engine.snapshot()
+        if epoch == self._epoch:
+            return
+        identities = sorted({e[0] for e in edges} | {e[1] for e in edges})
+        self.index = {identity: i for i, identity in enumerate(identities)}
+        self.identities = identities
+        n = len(identities)
+
+        src = np.array([self.index[e[0]] for e in edges], dtype=np.int64)
+        dst = np.array([self.index[e[1]] for e in edges], dtype=np.int64)
+        weight = np.array([e[2] for e in edges], dtype=np.float64)
+        positive = weight > 0
+        self._W = sparse.csr_matrix(
+            (weight[positive] * self.engine.decay, (src[positive], dst[positive])), shape=(n, n)
+        )
+        self._direct = sparse.csr_matrix((weight, (src, dst)), shape=(n, n))   # Keeps <= 0 too
+        self._rows.clear()
+        self._epoch = epoch
+
+    def _closure(self, rows: np.ndarray) -> sparse.csr_matrix:
+        W = self._W
+        trust = W[rows]
+        frontier = trust
+        for _ in range(self.max_hops - 1):
+            if frontier.nnz == 0:
+                break
+            reached = max_times(frontier, W)
+            frontier = reached.multiply(reached > trust).tocsr()
+            frontier.eliminate_zeros()
+            trust = trust.maximum(reached).tocsr()
+        return trust
+
+    def _score(self, rows: np.ndarray, closure: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Undo one decay, then let direct attestations and self-trust override."""
+        n = len(self.identities)
+        closure = closure.tocoo()
+        direct = self._direct[rows].tocoo()
+        keys = closure.row.astype(np.int64) * n + closure.col
+        fixed = np.concatenate([
+            direct.row.astype(np.int64) * n + direct.col,
+            np.arange(len(rows), dtype=np.int64) * n + rows
+        ])
+        keep = ~np.isin(keys, fixed)
+        return sparse.csr_matrix((
+            np.concatenate([closure.data[keep] / self.engine.decay, direct.data, np.ones(len(rows))]),
+            (np.concatenate([closure.row[keep], direct.row, np.arange(len(rows))]),
+             np.concatenate([closure.col[keep], direct.col, rows]))
+        ), shape=(len(rows), n))
+
+    def matrix(self, viewers: Sequence[str]) -> TrustMatrix:
+        """Trust rows for every viewer, computing the uncached ones in one batch."""
+        viewers = list(dict.fromkeys(viewers))
+        with self._lock:
+            self._refresh()
+            n = len(self.identities)
+            todo = [v for v in viewers if v not in self._rows and v in self.index]
+            if todo:
+                rows = np.array([self.index[v] for v in todo], dtype=np.int64)
+                scored = self._score(rows, self._closure(rows))
+                for i, viewer in enumerate(todo):
+                    self._rows[viewer] = scored[i]
+            empty = sparse.csr_matrix((1, n))
+            stacked = sparse.vstack([self._rows.get(v, empty) for v in viewers], format="csr") \
+                if viewers else sparse.csr_matrix((0, n))
+            return TrustMatrix(viewers, self.index, self.identities, stacked)
+
+    def vector(self, viewer: str) -> TrustVector:
+        """Creator-trust vector for EmbeddingPipeline.query(creator_trust=...)."""
+        return self.matrix([viewer]).row(viewer)
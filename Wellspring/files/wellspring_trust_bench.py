@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Trust benchmark: one Dijkstra pass per viewer vs the per-pair searches it replaced.
+
+Builds a random vouch graph (each identity trusts --degree others) and, for a
+sample of viewers, times:
+  engine     TrustEngine.trust_from(viewer): best trust to every target at once
+  bfs        per-(viewer, target) FIFO BFS with queue.pop(0), as TrustGraph in
+             wellspring_speed_test.py / wellspring_trust_network.py did
+  recursive  per-(viewer, target) recursion with visited.copy() per edge, as
+             wellspring_speed_crypto.py / TrustGraphWithRepeaters did
+
+The legacy searches are timed on --pairs targets per viewer and scaled up to
+"every reachable target" for the comparison column.
+
+A second table times BatchTrust.matrix() for --batch-viewers viewers at once
+against the same number of cold trust_from() calls.
+
+A third replays a continuous attestation stream: --stream new edges, each
+followed by --queries lookups from a hot set of --hot viewers. It compares
+the steady-state cache hit rate of per-edge invalidation with the old
+clear-everything policy.
+
+A fourth caches --explain-viewers trust maps with explanations on and
+off, and reports the memory each map holds, including what the old
+(identity, hops) parent dicts would take. It also times trust() and
+best_path() per 1M queries. With explanations off, best_path runs a
+search per call, so it is timed on --explain-paths calls and scaled.
+
+Usage:
+    python wellspring_trust_bench.py [--sizes 10000 100000] [--degree 8 --hops 4]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from functools import partial
+from typing import Dict, List, Set, Tuple, Type
+
+from wellspring_trust import TrustEngine, TRUST_DECAY
+
+try:
+    from wellspring_trust_batch import BatchTrust
+except ImportError:   # scipy not installed: the batch table is skipped
+    BatchTrust = None
+
+# ============================================================================
+# LEGACY SEARCHES (as they were in the dogfoods)
+# ============================================================================
+
+def bfs_trust(edges: Dict[str, Dict[str, float]], viewer: str, target: str, max_hops: int) -> float:
+    if target in edges.get(viewer, {}):
+        return edges[viewer][target]
+    visited = {viewer}
+    queue = [(viewer, 1.0, [viewer])]
+    best = 0.0
+    while queue:
+        current, trust_so_far, path = queue.pop(0)
+        if len(path) > max_hops + 1:
+            continue
+        for next_id, weight in edges.get(current, {}).items():
+            if next_id in visited:
+                continue
+            new_trust = trust_so_far * weight * TRUST_DECAY
+            if next_id == target:
+                best = max(best, new_trust)
+            else:
+                visited.add(next_id)
+                queue.append((next_id, new_trust, path + [next_id]))
+    return best
+
+
+def recursive_trust(edges: Dict[str, Dict[str, float]], src: str, dst: str,
+                    visited: Set[str] = None, depth: int = 0, max_depth: int = 4) -> float:
+    if src == dst:
+        return 1.0
+    visited = visited or set()
+    if src in visited or depth >= max_depth:
+        return 0.0
+    visited.add(src)
+    if dst in edges.get(src, {}):
+        return edges[src][dst]
+    best = 0.0
+    for intermediate, weight in edges.get(src, {}).items():
+        if weight > 0:
+            best = max(best, weight * recursive_trust(edges, intermediate, dst, visited.copy(),
+                                                      depth + 1, max_depth) * TRUST_DECAY)
+    return best
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def build_graph(n: int, degree: int, seed: int, cls: Type[TrustEngine] = TrustEngine) -> TrustEngine:
+    rng = random.Random(seed)
+    engine = cls()
+    ids = [f"id{i}" for i in range(n)]
+    for src in ids:
+        for dst in rng.sample(ids, degree + 1):
+            if dst != src:
+                engine.edges.setdefault(src, {})[dst] = rng.uniform(0.3, 1.0)
+    return engine
+
+
+class ClearAllEngine(TrustEngine):
+    """The old policy: any edge change drops every cached map."""
+
+    def _edge_changed(self, src, dst, old, new):
+        self.invalidate()
+
+
+def replay(engine: TrustEngine, ops: list, hops: int) -> Tuple[float, float]:
+    """Apply the stream; returns (hit rate over its second half, seconds)."""
+    start = time.perf_counter()
+    for i, op in enumerate(ops):
+        if i == len(ops) // 2:
+            engine.cache_hits = engine.cache_misses = 0
+        if op[0] == "query":
+            engine.trust_from(op[1], hops)
+        else:
+            engine.add_edge(*op[1:])
+    elapsed = time.perf_counter() - start
+    return engine.cache_hits / max(1, engine.cache_hits + engine.cache_misses), elapsed
+
+
+def dict_labels(result) -> Tuple[dict, dict]:
+    """An explained map's labels as the old parent and hops dicts stored them."""
+    hops, parent, best_hops = [], {}, {}
+    for i, p in enumerate(result.pred):
+        hops.append(hops[p] + 1 if p >= 0 else 0)
+        if p >= 0:
+            parent[(result.names[result.node[i]], hops[i])] = (result.names[result.node[p]], hops[p])
+    for target, label in result.best.items():
+        best_hops[target] = hops[label]
+    return parent, best_hops
+
+
+def map_bytes(engine: TrustEngine, viewers: List[str], hops: int) -> Tuple[float, float]:
+    """(bytes retained per cached map, bytes the old dict labels would add per map)."""
+    engine.invalidate()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for viewer in viewers:
+        engine.trust_from(viewer, hops)
+    per_map = (tracemalloc.get_traced_memory()[0] - before) / len(viewers)
+    legacy = 0.0
+    if engine.explain:
+        before = tracemalloc.get_traced_memory()[0]
+        old = [dict_labels(engine.trust_from(viewer, hops)) for viewer in viewers]
+        legacy = (tracemalloc.get_traced_memory()[0] - before) / len(old)
+    tracemalloc.stop()
+    return per_map, legacy
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trust engine benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--degree", type=int, default=8)
+    parser.add_argument("--hops", type=int, default=4)
+    parser.add_argument("--viewers", type=int, default=20)
+    parser.add_argument("--pairs", type=int, default=20, help="Targets per viewer for the legacy searches")
+    parser.add_argument("--batch-viewers", type=int, default=500)
+    parser.add_argument("--stream", type=int, default=300, help="Attestations in the stream")
+    parser.add_argument("--queries", type=int, default=10, help="Lookups between attestations")
+    parser.add_argument("--hot", type=int, default=50, help="Viewers the lookups come from")
+    parser.add_argument("--explain-viewers", type=int, default=200)
+    parser.add_argument("--explain-queries", type=int, default=200_000, help="Timed, then scaled to 1M")
+    parser.add_argument("--explain-paths", type=int, default=200, help="best_path calls timed without explanations")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("=" * 92)
+    print(f"Trust search: out-degree {args.degree}, {args.hops} hops, {args.viewers} viewers")
+    print("=" * 92)
+    print(f"  {'identities':>10} {'edges':>9} {'reached':>8} {'engine/viewer':>14} "
+          f"{'bfs/pair':>10} {'recursive/pair':>15} {'bfs all':>10} {'speedup':>8}")
+
+    for n in args.sizes:
+        engine = build_graph(n, args.degree, args.seed)
+        rng = random.Random(args.seed)
+        ids = list(engine.edges)
+        viewers = rng.sample(ids, args.viewers)
+
+        engine_s, reached = 0.0, 0
+        for viewer in viewers:
+            engine.invalidate()
+            engine_s += timed(engine.trust_from, viewer, args.hops)
+            reached += len(engine.trust_from(viewer, args.hops).trust)
+        engine_s /= len(viewers)
+        reached //= len(viewers)
+
+        bfs_s = recursive_s = 0.0
+        samples = 0
+        for viewer in viewers:
+            for target in rng.sample(list(engine.trust_from(viewer, args.hops).trust), args.pairs):
+                bfs_s += timed(bfs_trust, engine.edges, viewer, target, args.hops - 1)
+                recursive_s += timed(recursive_trust, engine.edges, viewer, target, None, 0, args.hops)
+                samples += 1
+        bfs_s /= samples
+        recursive_s /= samples
+
+        edge_count = sum(len(e) for e in engine.edges.values())
+        print(f"  {n:>10,} {edge_count:>9,} {reached:>8,} {engine_s * 1000:>11.1f} ms "
+              f"{bfs_s * 1000:>7.2f} ms {recursive_s * 1000:>12.2f} ms "
+              f"{bfs_s * reached:>8.1f} s {bfs_s * reached / engine_s:>7.0f}x")
+
+    print("\n  'bfs all' is one viewer's trust to every reached identity via per-pair BFS;")
+    print("  the engine gets the same set (with exact best paths) from one search.")
+
+    print("\n" + "=" * 92)
+    print(f"Batch trust: {args.batch_viewers} viewers in one sparse closure vs one search each")
+    print("=" * 92)
+    if BatchTrust is None:
+        print("  Skipped: BatchTrust needs scipy (pip install scipy)")
+    else:
+        print(f"  {'identities':>10} {'per-viewer':>12} {'batch':>10} {'speedup':>8} {'trust entries':>14}")
+
+    for n in (args.sizes if BatchTrust is not None else ()):
+        engine = build_graph(n, args.degree, args.seed)
+        viewers = random.Random(args.seed).sample(list(engine.edges), args.batch_viewers)
+
+        start = time.perf_counter()
+        for viewer in viewers:
+            engine.trust_from(viewer, args.hops)
+        engine_s = time.perf_counter() - start
+
+        batch = BatchTrust(engine, max_hops=args.hops)
+        start = time.perf_counter()
+        result = batch.matrix(viewers)
+        batch_s = time.perf_counter() - start
+
+        print(f"  {n:>10,} {engine_s:>10.2f} s {batch_s:>8.2f} s {engine_s / batch_s:>7.1f}x "
+              f"{result.matrix.nnz:>14,}")
+
+    print("\n" + "=" * 92)
+    print(f"Attestation stream: {args.stream} new edges, {args.queries} lookups each from {args.hot} viewers")
+    print("=" * 92)
+    print(f"  {'identities':>10} {'policy':>12} {'hit rate':>9} {'time':>9}")
+
+    for n in args.sizes:
+        rng = random.Random(args.seed)
+        ids = [f"id{i}" for i in range(n)]
+        hot = rng.sample(ids, args.hot)
+        ops = []
+        for _ in range(args.stream):
+            ops.extend(("query", rng.choice(hot)) for _ in range(args.queries))
+            src, dst = rng.sample(ids, 2)
+            ops.append(("edge", src, dst, rng.uniform(0.3, 1.0)))
+
+        for policy, cls in (("per-edge", TrustEngine), ("clear-all", ClearAllEngine)):
+            engine = build_graph(n, args.degree, args.seed, cls)
+            hit_rate, elapsed = replay(engine, ops, args.hops)
+            print(f"  {n:>10,} {policy:>12} {hit_rate * 100:>8.1f}% {elapsed:>7.1f} s")
+
+    print("\n" + "=" * 92)
+    print(f"Explanations: {args.explain_viewers} cached viewer maps, time per 1M queries")
+    print("=" * 92)
+    print(f"  {'identities':>10} {'explain':>8} {'search/viewer':>14} {'map size':>10} "
+          f"{'old dicts':>10} {'trust() x1M':>12} {'best_path x1M':>14}")
+
+    scale = 1_000_000 / args.explain_queries
+    for n in args.sizes:
+        for explain in (True, False):
+            engine = build_graph(n, args.degree, args.seed, partial(TrustEngine, explain=explain))
+            rng = random.Random(args.seed)
+            viewers = rng.sample(list(engine.edges), args.explain_viewers)
+            per_map, legacy = map_bytes(engine, viewers, args.hops)
+
+            engine.invalidate()
+            search_s = sum(timed(engine.trust_from, viewer, args.hops) for viewer in viewers) / len(viewers)
+            reached = {viewer: list(engine.trust_from(viewer, args.hops).trust) for viewer in viewers}
+            qs = [(v, rng.choice(reached[v])) for v in rng.choices(viewers, k=args.explain_queries)
+                  if reached[v]]
+
+            start = time.perf_counter()
+            for viewer, target in qs:
+                engine.trust(viewer, target, args.hops)
+            trust_s = (time.perf_counter() - start) * scale
+
+            paths = qs if explain else qs[:args.explain_paths]
+            start = time.perf_counter()
+            for viewer, target in paths:
+                engine.best_path(viewer, target, args.hops)
+            path_s = (time.perf_counter() - start) * 1_000_000 / len(paths)
+
+            old = f"{legacy / 1024:>7.0f} KB" if explain else f"{'-':>10}"
+            print(f"  {n:>10,} {'on' if explain else 'off':>8} {search_s * 1000:>11.1f} ms "
+                  f"{per_map / 1024:>7.0f} KB {old} {trust_s:>10.2f} s {path_s:>12.1f} s")
+
+    print("\n  'old dicts' is what the (identity, hops) parent and hops dicts held for the same")
+    print("  labels; an explained map used to take about 'off' plus 'old dicts'. Without")
+    print("  explanations best_path searches per call, so explain=False suits score-only")
+    print("  engines (ranking, creator_trust) and explain=True those that show paths.")
+
+if __name__ == "__main__":
+    main()
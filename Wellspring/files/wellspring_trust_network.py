@@ -24,8 +24,9 @@ import json
 import hashlib
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Set, Tuple
-from collections import defaultdict
+from typing import Optional, List, Set, Tuple
+
+from wellspring_trust import TrustEngine
 
 def compute_cid(content: dict) -> str:
     canonical = json.dumps(content, sort_keys=True, separators=(',', ':'))
@@ -66,63 +67,23 @@ class Thought:
         return d
 
 
-class TrustGraph:
+class TrustGraph(TrustEngine):
     """
     Computes trust scores from attestations.
     Each identity computes trust from THEIR perspective.
+    Vouch decay is applied per intermediary (see wellspring_trust).
     """
 
-    def __init__(self):
-        # direct_trust[from_id][to_id] = weight
-        self.direct_trust: Dict[str, Dict[str, float]] = defaultdict(dict)
-        # vouch decay per hop
-        self.decay = 0.8
-
     def add_trust(self, from_id: str, to_id: str, weight: float):
         """Record a direct trust attestation"""
-        self.direct_trust[from_id][to_id] = weight
+        self.add_edge(from_id, to_id, weight)
 
     def compute_trust(self, viewer: str, target: str, max_hops: int = 3) -> Tuple[float, List[str]]:
         """
         Compute trust score from viewer's perspective.
         Returns (score, path) where path shows how trust was derived.
         """
-        if viewer == target:
-            return (1.0, [viewer])
-
-        # Direct trust
-        if target in self.direct_trust.get(viewer, {}):
-            weight = self.direct_trust[viewer][target]
-            return (weight, [viewer, target])
-
-        # BFS for transitive trust
-        visited = {viewer}
-        queue = [(viewer, 1.0, [viewer])]  # (current, accumulated_trust, path)
-        best_score = 0.0
-        best_path = []
-
-        while queue:
-            current, trust_so_far, path = queue.pop(0)
-
-            if len(path) > max_hops + 1:
-                continue
-
-            for next_id, weight in self.direct_trust.get(current, {}).items():
-                if next_id in visited:
-                    continue
-
-                new_trust = trust_so_far * weight * self.decay
-                new_path = path + [next_id]
-
-                if next_id == target:
-                    if new_trust > best_score:
-                        best_score = new_trust
-                        best_path = new_path
-                else:
-                    visited.add(next_id)
-                    queue.append((next_id, new_trust, new_path))
-
-        return (best_score, best_path)
+        return self.best_path(viewer, target, max_hops)
 
 
 class Identity:
@@ -464,7 +425,7 @@ After E spams crypto:
   - B still trusts E: 0.8 (hasn't seen/cared)
 
 A's transitive trust for E:
-  - Via B → E: 1.0 × 0.8 × 0.8 = 0.512
+  - Via B → E: 1.0 × 0.8 × 0.8 (one intermediary) = 0.640
   - But A's threshold is 0.3, so E still surfaces for A
   - (In real network, A might weight C's downrate into path computation)
 
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+TrustEngine cache invalidation test.
+
+Per-edge invalidation keeps a cached trust map unless an edge change can
+reach it. This fuzz drives random graphs through edge additions, raises,
+lowerings, zero and negative weights, and removals. After every change it
+checks each map still cached against a fresh search over the same graph:
+  - every score must match
+  - an explained map's path must be a real chain whose score is the trust
+Engines run with explanations on and off, and with a small max_cached,
+so LRU eviction and re-search are exercised too.
+
+Usage:
+    python wellspring_trust_test.py [--trials 300] [--seed 0]
+"""
+
+import argparse
+import math
+import random
+from typing import List
+
+from wellspring_trust import TrustEngine, TrustMap
+
+STEPS = 40   # Edge changes per trial
+
+
+def fresh_copy(engine: TrustEngine) -> TrustEngine:
+    fresh = TrustEngine(decay=engine.decay, max_hops=engine.max_hops)
+    fresh.edges = {src: dict(out) for src, out in engine.edges.items()}
+    return fresh
+
+
+def path_errors(engine: TrustEngine, result: TrustMap, hops: int) -> List[str]:
+    """Paths in an explained map that are not chains scoring the map's trust."""
+    errors = []
+    for target, score in result.trust.items():
+        if target in result.direct:
+            continue
+        path = result.path(target)
+        weights = [engine.edges.get(a, {}).get(b, 0.0) for a, b in zip(path, path[1:])]
+        if path[0] != result.viewer or path[-1] != target or len(weights) > hops \
+                or min(weights) <= 0:
+            errors.append(f"{result.viewer}->{target}: bad path {path}")
+        elif not math.isclose(math.prod(weights) * engine.decay ** (len(weights) - 1), score):
+            errors.append(f"{result.viewer}->{target}: path scores differently from {score}")
+    return errors
+
+
+def trial(seed: int, explain: bool, max_cached) -> List[str]:
+    rng = random.Random(seed)
+    n = rng.randint(2, 20)
+    ids = [f"n{i}" for i in range(n)]
+    engine = TrustEngine(max_hops=rng.randint(0, 5), explain=explain, max_cached=max_cached)
+    for _ in range(rng.randint(0, n * 2)):
+        a, b = rng.sample(ids, 2)
+        engine.add_edge(a, b, rng.uniform(0.1, 1))
+
+    errors = []
+    for step in range(STEPS):
+        for viewer in rng.sample(ids, min(4, n)):
+            engine.trust_from(viewer)
+            engine.trust_from(viewer, 2)
+
+        a, b = rng.sample(ids, 2)
+        r = rng.random()
+        if r < 0.3:
+            engine.remove_edge(a, b)
+        elif r < 0.5:
+            engine.add_edge(a, b, rng.choice([0.0, -0.5]))
+        else:
+            engine.add_edge(a, b, rng.uniform(0.05, 1))
+
+        if max_cached is not None and len(engine._maps) > max_cached:
+            errors.append(f"step {step}: {len(engine._maps)} maps cached, max {max_cached}")
+        fresh = fresh_copy(engine)
+        for (viewer, hops), cached in list(engine._maps.items()):
+            expected = fresh.trust_from(viewer, hops)
+            for target in ids:
+                if not math.isclose(cached.get(target), expected.get(target), abs_tol=1e-12):
+                    errors.append(f"step {step}: {viewer}->{target} within {hops} hops is "
+                                  f"{cached.get(target)}, fresh search says {expected.get(target)}")
+            if cached.explained:
+                errors += [f"step {step}: {e}" for e in path_errors(engine, cached, hops)]
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TrustEngine cache invalidation fuzz")
+    parser.add_argument("--trials", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"TrustEngine cached maps vs fresh searches: {args.trials} trials × {STEPS} edge changes")
+    print("=" * 70)
+
+    failed = 0
+    for explain in (True, False):
+        for max_cached in (None, 3):
+            errors = []
+            for seed in range(args.seed, args.seed + args.trials):
+                errors += [f"seed {seed}: {e}" for e in trial(seed, explain, max_cached)]
+            label = f"explain={'on' if explain else 'off'}, max_cached={max_cached}"
+            print(f"  {'✓' if not errors else '✗'} {label}: {len(errors)} mismatches")
+            for error in errors[:5]:
+                print(f"      {error}")
+            failed += len(errors)
+
+    assert not failed, f"{failed} cached maps disagree with fresh searches"
+    print("\n  All cached maps match fresh searches.")
+
+
+if __name__ == "__main__":
+    main()
@@ -102,7 +102,8 @@ class VisibilityTester:
         # Request missing thoughts from src (filtered by visibility based on WHO'S ASKING)
         sync_resp = requests.post(
             f"{src_url}/sync",
-            json={"bloom_hex": bloom["bloom_hex"], "sender_cid": dst_id["cid"]}  # dst is requesting
+            json={"bloom_hex": bloom["bloom_hex"], "bloom_bits": bloom["bloom_bits"],
+                  "bloom_hashes": bloom["bloom_hashes"], "sender_cid": dst_id["cid"]}  # dst is requesting
         )
         sync_data = sync_resp.json()
 
@@ -270,9 +271,9 @@ def main():
         stats = result.get("filter_stats", {})
         print(f"    Thoughts checked: {stats.get('total_checked', '?')}")
         print(f"    Missing (pre-filter): {stats.get('missing', '?')}")
-        print(f"    Filtered (local_forever): {stats.get('filtered_local_forever', '?')}")
-        print(f"    Filtered (no pool access): {stats.get('filtered_pool_access', '?')}")
-        print(f"    Filtered (not participant): {stats.get('filtered_participants', '?')}")
+        print(f"    Withheld (local_forever): {stats.get('withheld_local_forever', '?')}")
+        print(f"    Withheld (no pool access): {stats.get('withheld_pool_access', '?')}")
+        print(f"    Withheld (not participant): {stats.get('withheld_participants', '?')}")
         print(f"    Actually shared: {stats.get('shared', '?')}")
         print(f"    Bob received: {result.get('new', '?')} new thoughts")
 
@@ -282,9 +283,9 @@ def main():
         stats = result.get("filter_stats", {})
         print(f"    Thoughts checked: {stats.get('total_checked', '?')}")
         print(f"    Missing (pre-filter): {stats.get('missing', '?')}")
-        print(f"    Filtered (local_forever): {stats.get('filtered_local_forever', '?')}")
-        print(f"    Filtered (no pool access): {stats.get('filtered_pool_access', '?')}")
-        print(f"    Filtered (not participant): {stats.get('filtered_participants', '?')}")
+        print(f"    Withheld (local_forever): {stats.get('withheld_local_forever', '?')}")
+        print(f"    Withheld (no pool access): {stats.get('withheld_pool_access', '?')}")
+        print(f"    Withheld (not participant): {stats.get('withheld_participants', '?')}")
         print(f"    Actually shared: {stats.get('shared', '?')}")
         print(f"    Carol received: {result.get('new', '?')} new thoughts")
 
@@ -294,9 +295,9 @@ def main():
         stats = result.get("filter_stats", {})
         print(f"    Thoughts checked: {stats.get('total_checked', '?')}")
         print(f"    Missing (pre-filter): {stats.get('missing', '?')}")
-        print(f"    Filtered (local_forever): {stats.get('filtered_local_forever', '?')}")
-        print(f"    Filtered (no pool access): {stats.get('filtered_pool_access', '?')}")
-        print(f"    Filtered (not participant): {stats.get('filtered_participants', '?')}")
+        print(f"    Withheld (local_forever): {stats.get('withheld_local_forever', '?')}")
+        print(f"    Withheld (no pool access): {stats.get('withheld_pool_access', '?')}")
+        print(f"    Withheld (not participant): {stats.get('withheld_participants', '?')}")
         print(f"    Actually shared: {stats.get('shared', '?')}")
         print(f"    Eve received: {result.get('new', '?')} new thoughts")
 
@@ -403,7 +404,7 @@ def main():
 """)
 
         for name, stats in all_stats.items():
-            print(f"    {name}: {stats['thoughts']} thoughts, {stats.get('filtered', 0)} filtered")
+            print(f"    {name}: {stats['thoughts']} thoughts, {stats.get('withheld', 0)} withheld over all syncs")
 
         print(f"""
   Key verifications:
@@ -415,7 +416,7 @@ def main():
 
         # Write output
         output = {
-            "nodes": {name: {"thoughts": stats["thoughts"], "filtered": stats.get("filtered", 0)}
+            "nodes": {name: {"thoughts": stats["thoughts"], "withheld": stats.get("withheld", 0)}
                       for name, stats in all_stats.items()},
             "pools": {
                 "public": public_pool["cid"],
@@ -23,6 +23,8 @@ from typing import Optional
 import nacl.signing
 import nacl.encoding
 
+from wellspring_vouch_trust import VouchTrustStore
+
 
 @dataclass
 class Thought:
@@ -77,54 +79,12 @@ class Identity:
         return t
 
 
-class TrustGraph:
-    """Compute trust from vouch chains."""
-
-    def __init__(self):
-        self.vouches: dict[str, list[tuple[str, float]]] = {}  # target -> [(voucher, weight)]
-        self.base_trust: dict[str, float] = {}  # identity -> base trust
-        self.spam_penalties: dict[str, float] = {}  # identity -> penalty
-        self.judgement_penalties: dict[str, float] = {}  # voucher -> penalty for bad vouches
-
-    def add_vouch(self, voucher: str, target: str, weight: float):
-        if target not in self.vouches:
-            self.vouches[target] = []
-        self.vouches[target].append((voucher, weight))
-
-    def set_base_trust(self, identity: str, trust: float):
-        self.base_trust[identity] = trust
-
-    def add_spam_penalty(self, identity: str, penalty: float):
-        self.spam_penalties[identity] = self.spam_penalties.get(identity, 0) + penalty
-
-    def add_judgement_penalty(self, voucher: str, penalty: float):
-        self.judgement_penalties[voucher] = self.judgement_penalties.get(voucher, 0) + penalty
+class TrustGraph(VouchTrustStore):
+    """Compute trust from vouch chains (materialized, see wellspring_vouch_trust)."""
 
-    def compute_trust(self, identity: str, observer: str, depth: int = 0, visited: set = None) -> float:
+    def compute_trust(self, identity: str, observer: str) -> float:
         """Compute trust from observer's perspective."""
-        if visited is None:
-            visited = set()
-        if identity in visited or depth > 5:
-            return 0.0
-        visited.add(identity)
-
-        # Base trust (core members)
-        base = self.base_trust.get(identity, 0.0)
-
-        # Vouch-derived trust
-        vouch_trust = 0.0
-        if identity in self.vouches:
-            for voucher, weight in self.vouches[identity]:
-                voucher_trust = self.compute_trust(voucher, observer, depth + 1, visited.copy())
-                # Judgement penalty reduces voucher's vouching power
-                judgement_factor = 1.0 - self.judgement_penalties.get(voucher, 0.0)
-                vouch_trust = max(vouch_trust, voucher_trust * weight * max(0, judgement_factor))
-
-        raw_trust = max(base, vouch_trust)
-
-        # Apply spam penalty
-        penalty = self.spam_penalties.get(identity, 0.0)
-        return max(0, raw_trust - penalty)
+        return self.trust(identity)
 
 
 def main():
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Incremental vouch-chain trust.
+
+An identity's trust is its base trust or its best vouch, less its spam
+penalty:
+
+    trust(x) = max(0, max(base(x), max over vouchers v of
+                   trust(v) × weight(v → x) × (1 − judgement(v))) − spam(x))
+
+Chains are limited to MAX_VOUCH_DEPTH vouches, as in wellspring_vouch_sybil.
+
+VouchTrustStore materializes this formula one level per depth. Level k is
+trust over chains of at most k vouches, and it reads only level k − 1. The
+levels therefore form a DAG even when vouches form cycles. A change to a
+vouch, a base trust or a penalty marks the identities it touches as dirty.
+Levels are then recomputed in order. When an identity's value changes, the
+identities it vouches for are marked for the next level. So only the
+downstream vouch subtree is recomputed.
+
+Each update reports the identities whose trust changed to subscribers, as
+a list of TrustChange events. Vouch trust is a viewer-independent score,
+not attestation-driven creator trust, so it is never written into the RAG
+index's creator_trust table. The store is itself a creator_trust mapping
+instead: pass it as EmbeddingPipeline.query(creator_trust=store), where an
+identity nobody vouches for weighs 0.
+"""
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Set
+
+MAX_VOUCH_DEPTH = 5   # Vouches in the longest chain considered
+
+
+@dataclass
+class TrustChange:
+    identity: str
+    old: float
+    new: float
+
+
+class VouchTrustStore:
+    """Materialized vouch-chain trust, recomputed downstream of each change."""
+
+    def __init__(self, max_depth: int = MAX_VOUCH_DEPTH):
+        self.max_depth = max_depth
+        self.base_trust: Dict[str, float] = {}
+        self.spam_penalties: Dict[str, float] = {}
+        self.judgement_penalties: Dict[str, float] = {}
+        self.vouchers: Dict[str, Dict[str, float]] = {}   # target -> {voucher: weight}
+        self.vouchees: Dict[str, Set[str]] = {}           # voucher -> targets
+        self._levels: Dict[str, List[float]] = {}         # identity -> trust at each depth
+        self._dirty: List[Set[str]] = [set() for _ in range(max_depth + 1)]
+        self._batching = 0
+        self._listeners: List[Callable[[List[TrustChange]], None]] = []
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def add_vouch(self, voucher: str, target: str, weight: float):
+        if weight > 1:
+            raise ValueError(f"vouch weight must be <= 1, got {weight}")
+        with self._lock:
+            self.vouchers.setdefault(target, {})[voucher] = weight
+            self.vouchees.setdefault(voucher, set()).add(target)
+            self._mark([target], 1)
+
+    def remove_vouch(self, voucher: str, target: str):
+        with self._lock:
+            if self.vouchers.get(target, {}).pop(voucher, None) is not None:
+                self.vouchees[voucher].discard(target)
+                self._mark([target], 1)
+
+    def set_base_trust(self, identity: str, trust: float):
+        with self._lock:
+            self.base_trust[identity] = trust
+            self._mark([identity], 0)
+
+    def add_spam_penalty(self, identity: str, penalty: float):
+        with self._lock:
+            self.spam_penalties[identity] = self.spam_penalties.get(identity, 0) + penalty
+            self._mark([identity], 0)
+
+    def add_judgement_penalty(self, voucher: str, penalty: float):
+        """Weaken every vouch `voucher` has given; its own trust is unchanged."""
+        with self._lock:
+            self.judgement_penalties[voucher] = self.judgement_penalties.get(voucher, 0) + penalty
+            self._mark(self.vouchees.get(voucher, ()), 1)
+
+    @contextmanager
+    def batch(self):
+        """Apply several updates with one propagation and one event list."""
+        with self._lock:
+            self._batching += 1
+            try:
+                yield self
+            finally:
+                self._batching -= 1
+                if not self._batching:
+                    self._propagate()
+
+    def subscribe(self, listener: Callable[[List[TrustChange]], None]):
+        self._listeners.append(listener)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def trust(self, identity: str) -> float:
+        levels = self._levels.get(identity)
+        return levels[-1] if levels else 0.0
+
+    def get(self, identity: str, default: float = 0.0) -> float:
+        """Mapping-style trust for EmbeddingPipeline.query(creator_trust=...)."""
+        levels = self._levels.get(identity)
+        return levels[-1] if levels else default
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {identity: levels[-1] for identity, levels in self._levels.items() if levels[-1] > 0}
+
+    # ------------------------------------------------------------------
+    # Propagation
+    # ------------------------------------------------------------------
+
+    def _mark(self, identities, lowest: int):
+        """Inputs of `identities` changed at level `lowest` and everything above it."""
+        for identity in identities:
+            for level in range(lowest, self.max_depth + 1):
+                self._dirty[level].add(identity)
+        if not self._batching:
+            self._propagate()
+
+    def _value(self, identity: str, level: int) -> float:
+        raw = self.base_trust.get(identity, 0.0)
+        if level > 0:
+            for voucher, weight in self.vouchers.get(identity, {}).items():
+                levels = self._levels.get(voucher)
+                if levels and levels[level - 1] > 0:
+                    judgement = max(0.0, 1.0 - self.judgement_penalties.get(voucher, 0.0))
+                    raw = max(raw, levels[level - 1] * weight * judgement)
+        return max(0.0, raw - self.spam_penalties.get(identity, 0.0))
+
+    def _propagate(self):
+        before: Dict[str, float] = {}
+        for level in range(self.max_depth + 1):
+            dirty, self._dirty[level] = self._dirty[level], set()
+            for identity in dirty:
+                levels = self._levels.setdefault(identity, [0.0] * (self.max_depth + 1))
+                value = self._value(identity, level)
+                if value == levels[level]:
+                    continue
+                if level == self.max_depth:
+                    before.setdefault(identity, levels[level])
+                levels[level] = value
+                if level < self.max_depth:
+                    self._dirty[level + 1].update(self.vouchees.get(identity, ()))
+
+        changes = [TrustChange(identity, old, self.trust(identity)) for identity, old in before.items()]
+        if changes:
+            for listener in self._listeners:
+                listener(changes)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+VouchTrustStore equivalence test.
+
+VouchTrustStore replaced wellspring_vouch_sybil's recursive
+TrustGraph.compute_trust with levels recomputed downstream of each change.
+This fuzz applies random vouches (including re-weights and removals), base
+trusts, spam penalties and judgement penalties, one at a time and in
+batches. After each update it checks two things:
+  - every identity's trust matches the recursion
+  - replaying the TrustChange events a subscriber got gives the same values
+
+Usage:
+    python wellspring_vouch_trust_test.py [--trials 300] [--seed 0]
+"""
+
+import argparse
+import math
+import random
+from typing import Dict, List
+
+from wellspring_vouch_trust import MAX_VOUCH_DEPTH, VouchTrustStore
+
+STEPS = 30   # Updates per trial
+
+# ============================================================================
+# LEGACY (TrustGraph.compute_trust as it was in wellspring_vouch_sybil.py)
+# ============================================================================
+
+class RecursiveTrust:
+    def __init__(self):
+        self.vouches: Dict[str, Dict[str, float]] = {}   # target -> {voucher: weight}
+        self.base_trust: Dict[str, float] = {}
+        self.spam_penalties: Dict[str, float] = {}
+        self.judgement_penalties: Dict[str, float] = {}
+
+    def compute_trust(self, identity: str, depth: int = 0, visited: set = None) -> float:
+        if visited is None:
+            visited = set()
+        if identity in visited or depth > MAX_VOUCH_DEPTH:
+            return 0.0
+        visited.add(identity)
+
+        base = self.base_trust.get(identity, 0.0)
+        vouch_trust = 0.0
+        for voucher, weight in self.vouches.get(identity, {}).items():
+            voucher_trust = self.compute_trust(voucher, depth + 1, visited.copy())
+            judgement_factor = 1.0 - self.judgement_penalties.get(voucher, 0.0)
+            vouch_trust = max(vouch_trust, voucher_trust * weight * max(0, judgement_factor))
+
+        raw_trust = max(base, vouch_trust)
+        return max(0, raw_trust - self.spam_penalties.get(identity, 0.0))
+
+# ============================================================================
+# FUZZ
+# ============================================================================
+
+def update(rng: random.Random, ids: List[str], legacy: RecursiveTrust, store: VouchTrustStore):
+    """One random update, applied to both."""
+    a, b = rng.sample(ids, 2)
+    r = rng.random()
+    if r < 0.35:
+        weight = round(rng.uniform(0.1, 1), 3)
+        legacy.vouches.setdefault(b, {})[a] = weight
+        store.add_vouch(a, b, weight)
+    elif r < 0.45:
+        legacy.vouches.get(b, {}).pop(a, None)
+        store.remove_vouch(a, b)
+    elif r < 0.65:
+        trust = rng.random()
+        legacy.base_trust[a] = trust
+        store.set_base_trust(a, trust)
+    elif r < 0.8:
+        penalty = rng.uniform(0, 0.3)
+        legacy.spam_penalties[a] = legacy.spam_penalties.get(a, 0) + penalty
+        store.add_spam_penalty(a, penalty)
+    else:
+        penalty = rng.uniform(0, 0.5)
+        legacy.judgement_penalties[a] = legacy.judgement_penalties.get(a, 0) + penalty
+        store.add_judgement_penalty(a, penalty)
+
+
+def trial(seed: int) -> List[str]:
+    rng = random.Random(seed)
+    ids = [f"n{i}" for i in range(rng.randint(2, 14))]
+    legacy, store = RecursiveTrust(), VouchTrustStore()
+    seen: Dict[str, float] = {}
+    store.subscribe(lambda changes: seen.update((c.identity, c.new) for c in changes))
+
+    errors = []
+    for step in range(STEPS):
+        if rng.random() < 0.2:
+            with store.batch():
+                for _ in range(rng.randint(2, 5)):
+                    update(rng, ids, legacy, store)
+        else:
+            update(rng, ids, legacy, store)
+
+        for identity in ids:
+            expected = legacy.compute_trust(identity)
+            if not math.isclose(store.trust(identity), expected, abs_tol=1e-12):
+                errors.append(f"step {step}: {identity} is {store.trust(identity)}, recursion says {expected}")
+            if not math.isclose(seen.get(identity, 0.0), store.trust(identity), abs_tol=1e-12):
+                errors.append(f"step {step}: events left {identity} at {seen.get(identity, 0.0)}, "
+                              f"store has {store.trust(identity)}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VouchTrustStore vs recursive trust fuzz")
+    parser.add_argument("--trials", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"VouchTrustStore vs recursive compute_trust: {args.trials} trials × {STEPS} updates")
+    print("=" * 70)
+
+    errors = []
+    for seed in range(args.seed, args.seed + args.trials):
+        errors += [f"seed {seed}: {e}" for e in trial(seed)]
+    print(f"  {'✓' if not errors else '✗'} {len(errors)} mismatches")
+    for error in errors[:5]:
+        print(f"      {error}")
+
+    assert not errors, f"{len(errors)} trust values disagree with the recursion"
+    print("\n  Materialized trust and change events match the recursion.")
+
+
+if __name__ == "__main__":
+    main()